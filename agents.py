@@ -1,43 +1,110 @@
-from crewai import Agent
-from tools import FlightSearchTool, HotelSearchTool, NearbyPlacesTool, ExchangeRateTool
-
-coordinator_agent = Agent(
-    role="여행 일정 코디네이터",
-    goal="여행자의 요청과 선호사항에 맞추어 최적의 여행 일정을 계획하고 조정합니다.",
-    backstory="당신은 여행자의 다양한 요청 사항과 선호도를 파악하여 효과적이고 만족스러운 여행 일정을 구성하는 전문가입니다. "
-              "다른 에이전트의 작업을 조정하고 최적화하여 전체 여행 계획이 원활하게 진행되도록 합니다.",
-    verbose=True
-)
-
-travel_info_agent = Agent(
-    role="여행 전문가",
-    goal="여행 목적지와 관련된 최신의 유용한 정보를 수집하여 제공합니다.",
-    backstory="당신은 여행자에게 꼭 필요한 최신 정보를 찾아내는 데 탁월한 능력을 지닌 전문가입니다. "
-              "목적지의 항공편(왕복), 숙소와 같은 필수 정보를 정확하고 "
-              "신속하게 제공하여 여행자의 의사 결정을 돕습니다.",
-    tools=[
-        FlightSearchTool(),
-        HotelSearchTool(),
-        ExchangeRateTool()
-    ],
-    verbose=True
-)
-
-local_recommendation_agent = Agent(
-    role="현지 전문가",
-    goal="여행 목적지에서 현지인이 선호하는 장소와 특별한 경험을 추천하여 여행을 풍성하게 합니다.",
-    # backstory="당신은 현지 문화와 지역 정보를 잘 이해하며, 현지 맛집, "
-    #           "숨은 명소 등을 추천하는 전문가입니다. "
-    #           "여행자가 현지에서 더욱 특별하고 기억에 남는 경험을 할 수 있도록 도와줍니다.",
-    backstory="당신은 현지 문화와 지역 정보를 잘 이해하며, 현지 맛집, "
-              "숨은 명소 등을 추천하는 전문가입니다. "
-              "여행자가 현지에서 더욱 특별하고 기억에 남는 경험을 할 수 있도록 도와줍니다. "
-              "또한 현지의 실제 데이터와 환율 정보를 참고하여 현실적인 예산 계획을 제시합니다.",
-    tools=[
-        NearbyPlacesTool(),
-        ExchangeRateTool()
-    ],
-    verbose=True
-)
+import threading
 
+# 에이전트(와 도구)는 crewai 를 불러와야 만들 수 있어 시간이 오래 걸리므로, 처음 사용할 때 한 번만 만듭니다.
+# `from agents import coordinator_agent` 처럼 모듈 속성으로 접근하면 그때 get_agents() 가 호출됩니다.
+_agents = None
+_agents_lock = threading.Lock()
 
+
+def _build_agents():
+    from crewai import Agent
+    from tools import (
+        FlightSearchTool, FlexibleFlightSearchTool, HotelSearchTool, NearbyPlacesTool,
+        ExchangeRateTool, ExchangeRateBatchTool, BudgetCalculatorTool
+    )
+
+    coordinator_agent = Agent(
+        role="여행 일정 코디네이터",
+        goal="여행자의 요청과 선호사항에 맞추어 최적의 여행 일정을 계획하고 조정합니다.",
+        backstory="당신은 여행자의 다양한 요청 사항과 선호도를 파악하여 효과적이고 만족스러운 여행 일정을 구성하는 전문가입니다. "
+                  "다른 에이전트의 작업을 조정하고 최적화하여 전체 여행 계획이 원활하게 진행되도록 합니다.",
+        tools=[
+            BudgetCalculatorTool()
+        ],
+        verbose=True
+    )
+
+    travel_info_agent = Agent(
+        role="여행 전문가",
+        goal="여행 목적지와 관련된 최신의 유용한 정보를 수집하여 제공합니다.",
+        backstory="당신은 여행자에게 꼭 필요한 최신 정보를 찾아내는 데 탁월한 능력을 지닌 전문가입니다. "
+                  "목적지의 항공편(왕복), 숙소와 같은 필수 정보를 정확하고 "
+                  "신속하게 제공하여 여행자의 의사 결정을 돕습니다.",
+        tools=[
+            FlightSearchTool(),
+            FlexibleFlightSearchTool(),
+            HotelSearchTool(),
+            ExchangeRateTool()
+        ],
+        verbose=True
+    )
+
+    # 병렬 모드에서 항공편/숙소 조회를 동시에 진행하기 위한 전담 에이전트
+    flight_info_agent = Agent(
+        role="항공편 전문가",
+        goal="여행 일정에 맞는 가성비 좋은 왕복 항공편을 찾아 제공합니다.",
+        backstory="당신은 항공권 검색에 능숙한 전문가입니다. "
+                  "여행자의 출발지, 목적지, 일정에 맞는 왕복 항공편을 가격과 시간대를 고려해 정확하게 찾아냅니다.",
+        tools=[
+            FlightSearchTool(),
+            FlexibleFlightSearchTool()
+        ],
+        verbose=True
+    )
+
+    hotel_info_agent = Agent(
+        role="숙소 전문가",
+        goal="여행 일정과 예산에 맞는 숙소를 찾아 제공합니다.",
+        backstory="당신은 숙소 검색에 능숙한 전문가입니다. "
+                  "여행자의 목적지와 숙박 일정에 맞는 숙소를 가격과 위치를 고려해 정확하게 찾아냅니다.",
+        tools=[
+            HotelSearchTool(),
+            ExchangeRateTool()
+        ],
+        verbose=True
+    )
+
+    local_recommendation_agent = Agent(
+        role="현지 전문가",
+        goal="여행 목적지에서 현지인이 선호하는 장소와 특별한 경험을 추천하여 여행을 풍성하게 합니다.",
+        # backstory="당신은 현지 문화와 지역 정보를 잘 이해하며, 현지 맛집, "
+        #           "숨은 명소 등을 추천하는 전문가입니다. "
+        #           "여행자가 현지에서 더욱 특별하고 기억에 남는 경험을 할 수 있도록 도와줍니다.",
+        backstory="당신은 현지 문화와 지역 정보를 잘 이해하며, 현지 맛집, "
+                  "숨은 명소 등을 추천하는 전문가입니다. "
+                  "여행자가 현지에서 더욱 특별하고 기억에 남는 경험을 할 수 있도록 도와줍니다. "
+                  "또한 현지의 실제 데이터와 환율 정보를 참고하여 현실적인 예산 계획을 제시합니다.",
+        tools=[
+            NearbyPlacesTool(),
+            ExchangeRateTool(),
+            ExchangeRateBatchTool(),
+            BudgetCalculatorTool()
+        ],
+        verbose=True
+    )
+
+    return {
+        "coordinator_agent": coordinator_agent,
+        "travel_info_agent": travel_info_agent,
+        "flight_info_agent": flight_info_agent,
+        "hotel_info_agent": hotel_info_agent,
+        "local_recommendation_agent": local_recommendation_agent,
+    }
+
+
+# 이름 -> 에이전트 (프로세스당 한 번 생성)
+def get_agents():
+    global _agents
+    if _agents is None:
+        with _agents_lock:
+            if _agents is None:
+                _agents = _build_agents()
+    return _agents
+
+
+def __getattr__(name):
+    if name.endswith("_agent"):
+        agents = get_agents()
+        if name in agents:
+            return agents[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
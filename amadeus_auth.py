@@ -0,0 +1,164 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from config import load_config
+from http_client import http_post
+
+load_config()
+
+AMADEUS_TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
+
+
+# 프로세스 전체에서 공유하는 Amadeus 액세스 토큰 관리자
+# - 만료 전까지는 캐시된 토큰을 그대로 사용합니다.
+# - 여러 스레드가 동시에 만료된 토큰을 요청해도 발급 요청은 한 번만 나갑니다(single-flight).
+# - 만료 renew_before 초 전에 백그라운드 스레드가 미리 토큰을 갱신합니다.
+# - cache_path 를 지정하면 토큰을 디스크에 저장해 재시작한 워커가 재사용합니다.
+class AmadeusTokenManager:
+    def __init__(self, client_id=None, client_secret=None, cache_path=None,
+                 expiry_margin=60, renew_before=300, background_refresh=True):
+        self.client_id = client_id or os.getenv('AMADEUS_CLIENT_ID')
+        self.client_secret = client_secret or os.getenv('AMADEUS_CLIENT_SECRET')
+        self.cache_path = cache_path
+        self.expiry_margin = expiry_margin  # 실제 만료 시각보다 이만큼 일찍 만료로 간주
+        self.renew_before = renew_before  # expires_at 이만큼 전에 백그라운드 갱신
+        self.background_refresh = background_refresh
+
+        self._token = {"access_token": None, "expires_at": 0}
+        self._lock = threading.Lock()
+        self._timer = None
+        self.refresh_count = 0  # 실제로 OAuth 발급 요청을 보낸 횟수
+
+    def get_token(self):
+        token = self._token
+        if self._is_valid(token):
+            return token["access_token"]
+
+        with self._lock:
+            # 락을 기다리는 동안 다른 스레드가 이미 갱신했다면 그 토큰을 사용
+            if self._is_valid(self._token):
+                return self._token["access_token"]
+
+            cached = self._load_cache()
+            if cached:
+                self._token = cached
+                self._schedule_renewal()
+            else:
+                self._refresh()
+
+            return self._token["access_token"]
+
+    # get_token 의 asyncio 버전: 유효한 토큰이 있으면 바로 반환하고, 발급이 필요할 때만 스레드에서 기다림
+    async def get_token_async(self):
+        token = self._token
+        if self._is_valid(token):
+            return token["access_token"]
+        return await asyncio.to_thread(self.get_token)
+
+    # 보관 중인 토큰을 버려 다음 호출 때 새로 발급받게 합니다 (예: 401 응답 시)
+    def invalidate(self):
+        with self._lock:
+            self._token = {"access_token": None, "expires_at": 0}
+
+    def _is_valid(self, token):
+        return bool(token["access_token"]) and time.time() < token["expires_at"]
+
+    # 반드시 self._lock 을 잡은 상태에서 호출해야 합니다.
+    def _refresh(self):
+        response = http_post(AMADEUS_TOKEN_URL, data={
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        })
+        if response.status_code != 200:
+            raise Exception("Amadeus 토큰 발급 실패", response.text)
+
+        token_data = response.json()
+        self._token = {
+            "access_token": token_data["access_token"],
+            "expires_at": time.time() + token_data["expires_in"] - self.expiry_margin
+        }
+        self.refresh_count += 1
+
+        self._save_cache()
+        self._schedule_renewal()
+
+    # 남은 유효 시간이 renew_before 이하인 토큰(수명이 짧게 발급됐거나, 만료가 가까운 캐시 토큰)은 미리 갱신하지 않음
+    # 바로 갱신을 예약하면 갱신된 토큰도 같은 조건이라 발급 요청이 쉬지 않고 반복되므로,
+    # 이런 토큰은 만료된 뒤 get_token 호출에서 다시 발급받습니다.
+    def _schedule_renewal(self):
+        if not self.background_refresh:
+            return
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        delay = self._token["expires_at"] - self.renew_before - time.time()
+        if delay <= 0:
+            return
+        self._timer = threading.Timer(delay, self._renew_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _renew_in_background(self):
+        with self._lock:
+            try:
+                self._refresh()
+            except Exception:
+                # 기존 토큰은 expires_at 까지 유효하므로, 실패하면 다음 get_token 호출에서 다시 시도
+                pass
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("client_id") != self.client_id:
+            return None
+
+        token = {"access_token": cached.get("access_token"), "expires_at": cached.get("expires_at", 0)}
+        return token if self._is_valid(token) else None
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"client_id": self.client_id, **self._token}, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+
+_token_manager = None
+_token_manager_lock = threading.Lock()
+
+
+# 프로세스 공용 토큰 관리자 (AMADEUS_TOKEN_CACHE 환경변수로 디스크 캐시 경로 지정)
+def get_token_manager():
+    global _token_manager
+    if _token_manager is None:
+        with _token_manager_lock:
+            if _token_manager is None:
+                _token_manager = AmadeusTokenManager(cache_path=os.getenv("AMADEUS_TOKEN_CACHE"))
+    return _token_manager
+
+
+def get_amadeus_token():
+    return get_token_manager().get_token()
+
+
+async def aget_amadeus_token():
+    return await get_token_manager().get_token_async()
@@ -1,101 +1,34 @@
-import requests
-import os
-import time
-from dotenv import load_dotenv
+from config import load_config
 
-load_dotenv()
+from hotel_offers import fetch_hotel_offers, search_hotels_by_city
+from locations import get_city_code
 
-class HotelSearchTool:
-    def __init__(self):
-        self._amadeus_token = {
-            "access_token": None,
-            "expires_at": 0
-        }
-
-    def get_amadeus_token(self):
-        if self._amadeus_token["access_token"] and time.time() < self._amadeus_token["expires_at"]:
-            return self._amadeus_token["access_token"]
-
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        data = {
-            'grant_type': 'client_credentials',
-            'client_id': os.getenv('AMADEUS_CLIENT_ID'),
-            'client_secret': os.getenv('AMADEUS_CLIENT_SECRET')
-        }
-
-        response = requests.post(url, data=data)
-        if response.status_code != 200:
-            raise Exception("Amadeus 토큰 발급 실패", response.text)
-
-        token_data = response.json()
-        self._amadeus_token["access_token"] = token_data["access_token"]
-        self._amadeus_token["expires_at"] = time.time() + token_data["expires_in"] - 60
-
-        return self._amadeus_token["access_token"]
+load_config()
 
+# 숙소 검색 예제: 요청/응답 처리와 오퍼 병렬/묶음 조회, 병합은 에이전트 도구와 같은 hotel_offers 모듈을 쓰고
+# 여기서는 결과를 읽기 쉬운 dict 목록으로만 정리합니다. (crewai 를 불러오지 않음)
+class HotelSearchTool:
+    def __init__(self, max_workers=5, offer_timeout=10.0, batch_size=0, max_results=None):
+        # 호텔별 오퍼 조회 동시성 설정
+        self.max_workers = max_workers  # 동시에 진행할 오퍼 조회 요청 수
+        self.offer_timeout = offer_timeout  # 오퍼 조회 요청 1건당 타임아웃(초)
+        self.batch_size = batch_size  # 1 이상이면 hotelIds 를 batch_size 개씩 묶어 한 번에 조회
+        self.max_results = max_results  # 가격이 확인된 호텔이 이만큼 모이면 나머지 조회 중단
+
+    # 한글/영문 도시명, 공항명, IATA 코드를 호텔 검색용 도시 코드로 변환
     def get_city_code(self, city_name):
-        city_codes = {
-            "서울": "SEL", "부산": "PUS", "제주": "CJU", "대구": "TAE", "인천": "ICN",
-            "오사카": "OSA", "도쿄": "TYO", "후쿠오카": "FUK", "삿포로": "SPK", "나고야": "NGO",
-            "오키나와": "OKA", "교토": "UKY", "요코하마": "YOK", "히로시마": "HIJ",
-            "베이징": "BJS", "상하이": "SHA", "광저우": "CAN", "선전": "SZX", "칭다오": "TAO",
-            "홍콩": "HKG", "마카오": "MFM", "시안": "SIA",
-            "타이베이": "TPE", "가오슝": "KHH",
-            "방콕": "BKK", "푸켓": "HKT", "치앙마이": "CNX",
-            "하노이": "HAN", "호치민": "SGN", "다낭": "DAD", "나트랑": "NHA",
-            "마닐라": "MNL", "세부": "CEB", "보라카이": "MPH",
-            "싱가포르": "SIN",
-            "쿠알라룸푸르": "KUL", "코타키나발루": "BKI", "페낭": "PEN",
-            "자카르타": "JKT", "발리": "DPS", "족자카르타": "JOG",
-            "델리": "DEL", "뭄바이": "BOM", "방갈로르": "BLR"
-        }
-
-        code = city_codes.get(city_name)
-        if not code:
-            raise ValueError(f"'{city_name}'의 도시 코드를 찾을 수 없습니다.")
-        return code
-
-    def search_hotels_by_city(self, city_code):
-        url = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
-        headers = {"Authorization": f"Bearer {self.get_amadeus_token()}"}
-        params = {"cityCode": city_code}
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            return []
-
-        return response.json().get("data", [])
-
-    def search_hotel_offers(self, hotel_id, check_in_date, check_out_date, adults=1):
-        url = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
-        headers = {"Authorization": f"Bearer {self.get_amadeus_token()}"}
-        params = {
-            "hotelIds": hotel_id,
-            "checkInDate": check_in_date,
-            "checkOutDate": check_out_date,
-            "adults": adults
-        }
-
-        response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            return None
-
-        data = response.json()
-        if "data" in data and len(data["data"]) > 0:
-            return data["data"][0]  # 첫 번째 유효한 오퍼 정보만 반환
-        else:
-            return None
+        return get_city_code(city_name)
 
     def get_available_hotels(self, city_name, check_in_date, check_out_date, adults=1, max_hotels=10):
         city_code = self.get_city_code(city_name)
-        city_hotels = self.search_hotels_by_city(city_code)
+        city_hotels = search_hotels_by_city(city_code)
+        hotel_ids = [hotel["hotelId"] for hotel in city_hotels[:max_hotels]]
         available_hotels = []
 
-        for hotel in city_hotels[:max_hotels]:
-            hotel_id = hotel["hotelId"]
-            hotel_offer = self.search_hotel_offers(hotel_id, check_in_date, check_out_date, adults)
-
+        hotel_offers = fetch_hotel_offers(hotel_ids, check_in_date, check_out_date, adults,
+                                          max_workers=self.max_workers, offer_timeout=self.offer_timeout,
+                                          batch_size=self.batch_size, max_results=self.max_results)
+        for hotel_offer in hotel_offers:
             if hotel_offer:
                 hotel_info = {
                     "hotel_name": hotel_offer["hotel"]["name"],
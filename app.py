@@ -1,12 +1,46 @@
+import os
+import threading
+import time
 import streamlit as st
-from crewai import Crew, Process, Task
-from agents import coordinator_agent
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from config import load_config
 
 from crew import TravelCoordinatorCrew
+from jobs import ACTIVE_STATUSES, JobQueueFull, get_job_store, job_pool_from_env
+from http_client import get_http_client
+from response_cache import get_response_cache
+from result_cache import get_itinerary_cache
+from hotel_filter import get_no_offer_tracker
 
-load_dotenv()
+load_config()
+
+# crew 원본(crewai, 에이전트, 도구 포함)은 프로세스당 한 번, 백그라운드 스레드에서 미리 구성
+# 첫 화면은 crewai 를 기다리지 않고 바로 그리고, 첫 작업이 들어올 때쯤이면 대부분 준비가 끝나 있습니다.
+@st.cache_resource
+def warm_crew():
+    warmup = {"seconds": None}
+
+    def build():
+        started_at = time.perf_counter()
+        TravelCoordinatorCrew().crew()
+        warmup["seconds"] = time.perf_counter() - started_at
+
+    threading.Thread(target=build, name="crew-warmup", daemon=True).start()
+    return warmup
+
+
+crew_warmup = warm_crew()
+
+
+# 일정 생성 작업은 스크립트 스레드가 아닌 작업 큐 워커가 실행 (세션이 몇 개든 동시 실행 수는 워커 수로 제한)
+# JOBS_WORKER_MODE=external 이면 웹 프로세스에서는 워커를 띄우지 않고 `python jobs.py worker` 프로세스가 처리
+@st.cache_resource
+def start_job_workers():
+    if os.getenv("JOBS_WORKER_MODE", "inprocess").lower() == "external":
+        return None
+    return job_pool_from_env().start()
+
+
+job_pool = start_job_workers()
 
 # Streamlit 앱 제목
 st.title("🚀 여행 일정 계획 챗봇")
@@ -20,22 +54,108 @@ user_input = st.text_area(
     "혼자 가는 여행이라 너무 비싸지 않으면서 가성비 좋은 곳들로 부탁드려요."
 )
 
-# 여행 일정 생성 버튼
+# 진행 상황(에이전트 단계, 태스크 결과) 표시 여부
+stream_output = st.sidebar.checkbox("진행 상황 실시간 표시", value=True)
+# 오늘 같은 요청으로 만든 일정이 있어도 새로 생성
+force_refresh = st.sidebar.checkbox("새로 생성하기 (캐시 무시)", value=False)
+
+# 여행 일정 생성 버튼: 작업 큐에 등록하고 작업 id 를 세션에 보관 (다시 실행해도 같은 작업을 계속 보여줌)
 if st.button("여행 일정 생성하기"):
-    with st.spinner("일정을 생성 중입니다..."):
+    st.session_state.pop("job_id", None)
+    cached = None if force_refresh else get_itinerary_cache().get(user_input)
+
+    if cached:
+        st.info(f"오늘 {cached['created_at']}에 생성된 일정을 불러왔습니다. 최신 가격이 필요하면 '새로 생성하기'를 선택하세요.")
+        st.success("여행 일정 생성 완료!")
+        st.markdown("### 📝 생성된 여행 일정:")
+        st.markdown(cached["result"])
+    else:
+        try:
+            job_id, deduped = get_job_store().submit(user_input, parallel=TravelCoordinatorCrew().parallel,
+                                                     force_refresh=force_refresh)
+        except JobQueueFull as e:
+            st.error(str(e))
+            st.stop()
+
+        st.session_state["job_id"] = job_id
+        if deduped:
+            st.info("같은 요청을 이미 처리 중이어서 그 작업의 결과를 함께 기다립니다.")
+
 
-        inputs = {
-            'content': user_input
-        }
+# 작업이 끝날 때까지 진행 이벤트를 주기적으로 읽어 화면에 표시
+def show_job(job_id):
+    store = get_job_store()
+    job = store.get(job_id)
+    if job is None:
+        st.session_state.pop("job_id", None)
+        return
 
-        result = TravelCoordinatorCrew().crew().kickoff(inputs=inputs)
+    status = st.status("일정 생성 작업을 기다리는 중입니다...", expanded=stream_output)
+    # 워커가 모아서 기록한 LLM 출력 조각을 이어 붙여 생성되는 대로 표시
+    live_output = status.empty()
+    live_text = ""
+    first_content_at = None
+    seen = 0
+    while True:
+        job = store.get(job_id)
+        for event in store.events(job_id, seen):
+            seen = event["seq"]
+            if first_content_at is None and event["kind"] in ("token", "task"):
+                first_content_at = event["elapsed"]
+            if not stream_output:
+                continue
+            if event["kind"] == "token":
+                live_text += event["text"]
+                live_output.markdown(live_text)
+            elif event["kind"] == "step":
+                live_text = ""
+                live_output.empty()
+                status.write(event["text"])
+            elif event["kind"] == "task":
+                live_text = ""
+                live_output.empty()
+                with st.expander(f"✅ {event['source']} 작업 완료 ({event['elapsed']:.0f}초)"):
+                    st.markdown(event["text"])
 
+        if job["status"] not in ACTIVE_STATUSES:
+            break
+        if job["status"] == "queued":
+            status.update(label=f"대기 중입니다... ({store.position(job_id)}번째)")
+        else:
+            status.update(label="일정을 생성 중입니다...")
+        time.sleep(0.25)
 
+    if job["status"] != "done":
+        status.update(label="일정 생성 중 오류가 발생했습니다.", state="error")
+        st.error(f"일정을 만들지 못했습니다 ({job['status']}): {job['error'] or ''}")
+        return
+
+    live_output.empty()
+    status.update(label="여행 일정 생성 완료!", state="complete", expanded=False)
+    if job["started_at"]:
+        caption = f"대기 {job['started_at'] - job['created_at']:.1f}초, 생성 {job['finished_at'] - job['started_at']:.1f}초"
+        if first_content_at is not None:
+            caption += f", 첫 출력까지 {first_content_at:.1f}초"
+        st.caption(caption)
     st.success("여행 일정 생성 완료!")
 
     # 생성된 일정 결과 출력
     st.markdown("### 📝 생성된 여행 일정:")
-    st.markdown(result)
-    print(result)
-    
-    
\ No newline at end of file
+    st.markdown(job["result"])
+
+
+if st.session_state.get("job_id"):
+    show_job(st.session_state["job_id"])
+
+# 성능 지표
+with st.sidebar.expander("성능 지표"):
+    if crew_warmup["seconds"] is None:
+        st.write("crew 초기 구성: 준비 중")
+    else:
+        st.write(f"crew 초기 구성: {crew_warmup['seconds'] * 1000:.1f}ms (프로세스당 1회, 백그라운드)")
+    st.write("HTTP:", get_http_client().stats())
+    st.write("업스트림 요청 한도:", get_http_client().rate_limiter.budget())
+    st.write("도구 캐시:", get_response_cache().stats())
+    st.write("일정 캐시:", get_itinerary_cache().stats())
+    st.write("작업 큐:", get_job_store().stats())
+    st.write("호텔 오퍼 조회:", get_no_offer_tracker().stats())
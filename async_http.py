@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import os
+import threading
+import weakref
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_client import HttpClient, RETRY_STATUS_CODES, _span_name
+from replay import cassette_from_env
+from tracing import current_span, span
+
+
+# asyncio 용 HTTP 전송 계층 (httpx.AsyncClient)
+# 설정(타임아웃, 재시도/백오프, 업스트림 바꾸기, 녹화/재생, 요청 한도)과 통계는 HttpClient 와 같고,
+# 요청/재시도 대기/한도 대기가 모두 await 이라 동시에 많은 요청을 보내도 스레드를 쓰지 않습니다.
+# httpx.AsyncClient 는 만들어진 이벤트 루프에서만 쓸 수 있으므로 루프마다 하나씩 둡니다.
+# - max_connections: 루프당 동시 커넥션 수 상한 (HTTP_ASYNC_MAX_CONNECTIONS, 기본 50)
+class AsyncHttpClient(HttpClient):
+    def __init__(self, max_connections=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_connections = max_connections or int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", 50))
+        self._clients = weakref.WeakKeyDictionary()
+
+    def client_for_loop(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return client
+
+    async def request(self, method, url, **kwargs):
+        with span("http", _span_name(method, url)) as http_span:
+            if self.cassette is not None and self.cassette.mode == "replay":
+                self._count("requests")
+                response = self.cassette.replay(method, url, kwargs)
+                http_span.set(replayed=True)
+            else:
+                target_url = url
+                if self.upstream_override:
+                    parts = urlsplit(url)
+                    target_url = self.upstream_override + url[len(f"{parts.scheme}://{parts.netloc}"):]
+
+                buckets = self.rate_limiter.buckets_for(url)
+                response = await self._request_with_retries(method, target_url, buckets, **kwargs)
+                if self.cassette is not None:
+                    # 녹화 파일 전체를 다시 쓰므로 이벤트 루프 밖에서 저장
+                    await asyncio.to_thread(self.cassette.record, method, url, kwargs, response)
+
+            http_span.set(status=response.status_code, response_bytes=len(response.content))
+            if response.status_code >= 400:
+                http_span.fail(f"HTTP {response.status_code}")
+            return response
+
+    async def _request_with_retries(self, method, url, buckets, **kwargs):
+        timeout = kwargs.pop("timeout", None)
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        client = self.client_for_loop()
+        attempt = 0
+        while True:
+            if buckets:
+                waited = await self.rate_limiter.acquire_async(buckets)
+                if waited:
+                    current_span().add("rate_limit_wait_ms", waited * 1000)
+
+            self._count("requests")
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                self._count("errors")
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if response.status_code == 429 and buckets:
+                    await self.rate_limiter.block_async(buckets, delay)
+                    delay = 0
+
+            attempt += 1
+            self._count("retries")
+            current_span().add("retries")
+            await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    # 요청/재시도 횟수와 열려 있는 루프별 클라이언트 수
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["clients"] = len(self._clients)
+        return stats
+
+    # 현재 루프의 클라이언트를 닫음
+    async def aclose(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    # 모든 루프의 클라이언트를 닫음 (각 루프에서 닫고, 멈춘 루프의 클라이언트는 버림)
+    def close(self):
+        for loop, client in list(self._clients.items()):
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        self._clients.clear()
+
+
+_async_http_client = None
+_async_http_client_lock = threading.Lock()
+
+
+# 프로세스 공용 async HTTP 클라이언트 (환경변수는 get_http_client 와 같음)
+def get_async_http_client():
+    global _async_http_client
+    if _async_http_client is None:
+        with _async_http_client_lock:
+            if _async_http_client is None:
+                _async_http_client = AsyncHttpClient(cassette=cassette_from_env())
+    return _async_http_client
+
+
+async def async_http_get(url, **kwargs):
+    return await get_async_http_client().get(url, **kwargs)
+
+
+async def async_http_post(url, **kwargs):
+    return await get_async_http_client().post(url, **kwargs)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+# 동기 코드에서 코루틴을 실행할 때 쓰는 공용 이벤트 루프 (데몬 스레드 하나에서 계속 실행)
+def background_loop():
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-http-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+# 공용 이벤트 루프에서 코루틴을 실행하고 결과를 기다림
+# 호출한 스레드의 컨텍스트(트레이스 상위 구간 등)를 그대로 이어받고,
+# timeout 초 안에 끝나지 않으면 코루틴을 취소한 뒤 TimeoutError 를 던집니다.
+def run_coroutine(coro, timeout=None):
+    context = contextvars.copy_context()
+
+    async def in_caller_context():
+        for var, value in context.items():
+            var.set(value)
+        return await coro
+
+    future = asyncio.run_coroutine_threadsafe(in_caller_context(), background_loop())
+    try:
+        return future.result(timeout)
+    except FuturesTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"비동기 작업이 {timeout}초 안에 끝나지 않았습니다.")
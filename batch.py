@@ -0,0 +1,188 @@
+import argparse
+import contextvars
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+if __name__ == "__main__" and "--offline" in sys.argv:
+    # crewai 를 불러오기 전에 설정해야 원격 텔레메트리 전송이 꺼짐
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+# 여러 프로세스로 실행할 때 워커끼리 나눠 쓰는 캐시/토큰/요청 한도 설정
+# 부모 프로세스의 환경변수로 넘기므로 이미 지정한 값이 있으면 그대로 씁니다.
+SHARED_PROCESS_ENV = {
+    "TOOL_CACHE_BACKEND": "sqlite",
+    "ITINERARY_CACHE_BACKEND": "sqlite",
+    "RATE_LIMIT_BACKEND": "sqlite",
+    "AMADEUS_TOKEN_CACHE": ".amadeus_token.json",
+}
+
+
+# 요청 파일 읽기
+# - .csv: 헤더에 content 열이 있어야 하고, id 열이 있으면 그 값을 요청 id 로 씀
+# - 그 밖의 확장자는 JSONL: 한 줄에 {"id": ..., "content": ...} 또는 요청 문자열 하나
+# id 가 없으면 줄 번호(CSV 는 데이터 행 번호)를 id 로 씁니다. 나머지 열은 결과에 그대로 붙습니다.
+def read_requests(path):
+    rows = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            records = enumerate(csv.DictReader(f), start=1)
+        else:
+            records = ((number, json.loads(line)) for number, line in enumerate(f, start=1) if line.strip())
+
+        for number, record in records:
+            if isinstance(record, str):
+                record = {"content": record}
+            content = (record.get("content") or "").strip()
+            if not content:
+                raise ValueError(f"{path}:{number} 행에 content 가 없습니다.")
+            rows.append({**record, "id": str(record.get("id") or number), "content": content})
+
+    seen = set()
+    for row in rows:
+        if row["id"] in seen:
+            raise ValueError(f"요청 id 가 중복됩니다: {row['id']}")
+        seen.add(row["id"])
+    return rows
+
+
+# 결과 파일에서 이미 성공한 요청 id 목록 (중단된 배치를 이어서 실행할 때 건너뜀)
+# 실패한 요청은 다시 실행하고, 쓰다가 끊긴 마지막 줄은 무시합니다.
+def load_completed(path):
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                completed.add(str(record["id"]))
+    return completed
+
+
+# 요청 한 건 실행: 결과 파일에 쓸 레코드를 반환 (예외도 레코드로 남김)
+def run_request(row, parallel=False, force_refresh=False):
+    from crew import TravelCoordinatorCrew
+    from result_cache import cached_kickoff
+
+    started = time.perf_counter()
+    record = dict(row)
+    try:
+        result, cached = cached_kickoff(TravelCoordinatorCrew(parallel=parallel).crew, {"content": row["content"]},
+                                        force_refresh=force_refresh)
+        record.update(status="ok", cached=cached, result=str(result))
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - started, 2)
+    record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    return record
+
+
+# 끝난 순서대로 결과 파일에 한 줄씩 추가 (쓰는 쪽은 이 함수를 부르는 스레드 하나뿐)
+class ResultWriter:
+    def __init__(self, path):
+        # 이전 실행이 줄 중간에 끊겼다면 새 레코드가 그 줄에 이어 붙지 않게 줄을 바꿈
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        self.file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self.file.write("\n")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+# 요청들을 워커 풀로 실행하고 결과를 output_path 에 기록
+# - pool="thread": 한 프로세스 안의 스레드들이 HTTP 세션, Amadeus 토큰, 캐시를 그대로 공유
+# - pool="process": 워커 프로세스마다 따로 실행하되 SHARED_PROCESS_ENV 의 SQLite 캐시/토큰 파일/요청 한도를 공유
+# 결과 파일에 이미 성공으로 기록된 요청은 건너뜁니다. 반환값: 요약 통계
+def run_batch(rows, output_path, workers=4, pool="thread", parallel=False, force_refresh=False, progress=None):
+    completed = load_completed(output_path)
+    pending = [row for row in rows if row["id"] not in completed]
+    summary = {"total": len(rows), "skipped": len(rows) - len(pending), "ok": 0, "error": 0, "cached": 0}
+    if not pending:
+        return summary
+
+    if pool == "process":
+        for name, value in SHARED_PROCESS_ENV.items():
+            os.environ.setdefault(name, value)
+        executor = ProcessPoolExecutor(max_workers=workers)
+        submit = lambda row: executor.submit(run_request, row, parallel, force_refresh)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda row: executor.submit(contextvars.copy_context().run, run_request, row, parallel,
+                                             force_refresh)
+
+    writer = ResultWriter(output_path)
+    started = time.perf_counter()
+    try:
+        futures = {submit(row): row for row in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                record = future.result()
+            except Exception as e:
+                # 워커 프로세스가 죽는 등(BrokenProcessPool) 결과를 받지 못한 요청도 오류로 남기고 계속 진행
+                # (성공으로 기록되지 않았으므로 다음 실행 때 다시 시도됨)
+                record = dict(futures[future], status="error", error=f"{type(e).__name__}: {e}",
+                              seconds=round(time.perf_counter() - started, 2),
+                              finished_at=datetime.now().isoformat(timespec="seconds"))
+            writer.write(record)
+            summary[record["status"]] += 1
+            summary["cached"] += bool(record.get("cached"))
+            if progress:
+                progress(f"[{done}/{len(pending)}] {record['id']} {record['status']} ({record['seconds']}s)")
+    finally:
+        # Ctrl+C 등으로 멈추면 아직 시작하지 않은 요청은 취소 (기록된 결과는 다음 실행 때 건너뜀)
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="요청 파일(JSONL/CSV)의 여행 일정을 한꺼번에 생성")
+    parser.add_argument("input", help="요청 파일 (.jsonl 또는 .csv, content 필수 / id 선택)")
+    parser.add_argument("-o", "--output", help="결과 JSONL 파일 (기본: <입력 파일 이름>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", 4)), help="동시 실행 수")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread", help="워커 종류 (기본 thread)")
+    parser.add_argument("--parallel", action="store_true", help="항공편/숙소/현지 추천을 동시에 실행하는 병렬 crew 사용")
+    parser.add_argument("--refresh", action="store_true", help="캐시된 일정이 있어도 새로 생성")
+    parser.add_argument("--offline", action="store_true", help="API 키 없이 스텁 서버와 가짜 LLM 으로 실행")
+    args = parser.parse_args()
+
+    if args.offline and args.pool == "process":
+        parser.error("--offline 은 --pool thread 에서만 사용할 수 있습니다.")
+
+    rows = read_requests(args.input)
+    output = args.output or os.path.splitext(args.input)[0] + ".results.jsonl"
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+
+    def run():
+        return run_batch(rows, output, workers=args.workers, pool=args.pool, parallel=args.parallel,
+                         force_refresh=args.refresh, progress=log)
+
+    if args.offline:
+        from replay import offline_environment
+        with offline_environment():
+            summary = run()
+    else:
+        summary = run()
+    print(json.dumps(summary, ensure_ascii=False))
@@ -0,0 +1,372 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+if __name__ == "__main__":
+    # crewai 를 불러오기 전에 설정해야 원격 텔레메트리 전송이 꺼짐
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import amadeus_auth
+import exchange_rates
+from replay import offline_environment
+from response_cache import get_response_cache
+from stub_server import PROFILES, load_profile
+
+# 벤치마크 종류
+SCENARIOS = ["tools", "token", "throughput", "e2e"]
+
+# 도구별 벤치마크 입력
+TOOL_CASES = {
+    "FlightSearchTool": {"origin_city": "인천", "destination_city": "오사카",
+                         "departure_date": "2025-04-25", "return_date": "2025-04-27"},
+    "HotelSearchTool": {"city_name": "오사카", "check_in_date": "2025-04-25", "check_out_date": "2025-04-27"},
+    "NearbyPlacesTool": {"place_name": "오사카"},
+    "ExchangeRateTool": {"from_currency": "JPY", "to_currency": "KRW", "amount": 10000},
+}
+
+# 동시 처리량 측정에 쓰는 여행 요청 (요청마다 목적지와 날짜가 달라 캐시를 공유하지 않음)
+TRIP_DESTINATIONS = ["오사카", "도쿄", "후쿠오카", "다낭", "방콕", "타이베이", "싱가포르", "홍콩"]
+
+
+def _trip_request(index):
+    destination = TRIP_DESTINATIONS[index % len(TRIP_DESTINATIONS)]
+    day = 1 + index // len(TRIP_DESTINATIONS) % 25
+    return {
+        "content": f"2025년 5월 {day}일부터 {day + 2}일까지 인천을 출발해서 {destination}로 여행을 다녀오려고 합니다. "
+                   "항공편, 숙소, 현지 맛집, 가볼만한 곳까지 포함해서 여행 일정을 만들어주세요."
+    }
+
+
+# 지연 값(ms) 목록 요약: 횟수, 평균, 최소/최대, p50/p95
+def summarize(durations):
+    if not durations:
+        return {"count": 0}
+
+    values = sorted(durations)
+
+    def percentile(p):
+        position = (len(values) - 1) * p
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+        "min_ms": round(values[0] * 1000, 2),
+        "p50_ms": round(percentile(0.5) * 1000, 2),
+        "p95_ms": round(percentile(0.95) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2),
+    }
+
+
+# 프로필의 지연 시간을 factor 배로 줄이거나 늘림 (CI 에서 빠르게 돌릴 때 사용)
+def scale_profile(profile, factor):
+    routes = load_profile(profile)
+    if factor == 1:
+        return routes
+    for settings in routes.values():
+        for name in ("latency", "jitter", "hang"):
+            settings[name] *= factor
+        if settings["retry_after"] is not None:
+            settings["retry_after"] *= factor
+    return routes
+
+
+def _timed(func):
+    started = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        return time.perf_counter() - started, type(e).__name__
+    return time.perf_counter() - started, None
+
+
+def _count_error(errors, error):
+    if error:
+        errors[error] = errors.get(error, 0) + 1
+
+
+# 도구별 지연 시간
+# - cold: 응답 캐시와 환율표를 비운 상태 (업스트림 호출 포함)
+# - warm: 바로 이어서 같은 입력으로 다시 호출 (캐시 적중)
+def bench_tools(iterations):
+    import tools
+
+    results = {}
+    for name, args in TOOL_CASES.items():
+        tool = getattr(tools, name)()
+        cold, warm, errors = [], [], {}
+        for _ in range(iterations):
+            get_response_cache().clear()
+            exchange_rates._rate_cache = exchange_rates.RateTableCache(api_key="offline")
+
+            duration, error = _timed(lambda: tool._run(**args))
+            cold.append(duration)
+            _count_error(errors, error)
+
+            duration, error = _timed(lambda: tool._run(**args))
+            warm.append(duration)
+            _count_error(errors, error)
+
+        results[name] = {"cold": summarize(cold), "warm": summarize(warm), "errors": errors}
+    return results
+
+
+# Amadeus 토큰 발급 비용
+# - refresh: 토큰을 버리고 새로 발급받는 시간
+# - cached: 유효한 토큰을 꺼내는 시간
+# - concurrent_refresh: 토큰이 없는 상태에서 여러 스레드가 동시에 요청했을 때 걸린 시간과 실제 발급 횟수
+def bench_token(iterations, threads=16):
+    manager = amadeus_auth.AmadeusTokenManager("offline", "offline", background_refresh=False)
+    amadeus_auth._token_manager = manager
+
+    refresh, cached, errors = [], [], {}
+    for _ in range(iterations):
+        manager.invalidate()
+        duration, error = _timed(manager.get_token)
+        refresh.append(duration)
+        _count_error(errors, error)
+
+        duration, error = _timed(manager.get_token)
+        cached.append(duration)
+        _count_error(errors, error)
+
+    manager.invalidate()
+    refresh_count = manager.refresh_count
+    barrier = threading.Barrier(threads)
+
+    def request_token():
+        barrier.wait()
+        return _timed(manager.get_token)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(lambda _: request_token(), range(threads)))
+    wall = time.perf_counter() - started
+    for _, error in outcomes:
+        _count_error(errors, error)
+
+    return {
+        "refresh": summarize(refresh),
+        "cached": summarize(cached),
+        "concurrent_refresh": {
+            "threads": threads,
+            "wall_ms": round(wall * 1000, 2),
+            "refreshes": manager.refresh_count - refresh_count,
+            "latency": summarize([duration for duration, _ in outcomes]),
+        },
+        "errors": errors,
+    }
+
+
+# N 개 여행 일정을 동시에 만들 때의 처리량 (concurrency 단계마다 concurrency * per_worker 건)
+def bench_throughput(levels, per_worker, parallel):
+    from crew import TravelCoordinatorCrew
+
+    results = []
+    offset = 0
+    for concurrency in levels:
+        count = concurrency * per_worker
+        requests = [_trip_request(offset + index) for index in range(count)]
+        offset += count
+
+        def run(inputs):
+            return _timed(lambda: TravelCoordinatorCrew(parallel=parallel).crew().kickoff(inputs=inputs))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(run, requests))
+        wall = time.perf_counter() - started
+
+        errors = {}
+        for _, error in outcomes:
+            _count_error(errors, error)
+        results.append({
+            "concurrency": concurrency,
+            "itineraries": count,
+            "wall_ms": round(wall * 1000, 2),
+            "itineraries_per_s": round(count / wall, 3) if wall else None,
+            "latency": summarize([duration for duration, error in outcomes if not error]),
+            "errors": errors,
+        })
+    return results
+
+
+# 일정 1건 전체 생성 시간 (순차/병렬 모드, 매번 응답 캐시를 비운 상태)
+def bench_end_to_end(iterations):
+    from crew import TravelCoordinatorCrew
+
+    inputs = _trip_request(0)
+    results = {}
+    for mode, parallel in (("sequential", False), ("parallel", True)):
+        durations, errors = [], {}
+        for _ in range(iterations):
+            get_response_cache().clear()
+            exchange_rates._rate_cache = exchange_rates.RateTableCache(api_key="offline")
+            duration, error = _timed(lambda: TravelCoordinatorCrew(parallel=parallel).crew().kickoff(inputs=inputs))
+            _count_error(errors, error)
+            if not error:
+                durations.append(duration)
+        results[mode] = {**summarize(durations), "errors": errors}
+    return results
+
+
+# 스텁 프로필 하나로 선택한 벤치마크를 모두 실행
+def run_profile(profile, scenarios, iterations=5, scale=1.0, concurrency=(1, 4, 8), per_worker=2,
+                llm_latency=0.0, seed=0, rate_limits=False):
+    routes = scale_profile(profile, scale)
+    results = {"stub_profile": routes}
+
+    with offline_environment(profile=routes, llm_latency=llm_latency, seed=seed, rate_limits=rate_limits) as env:
+        stub = env["stub"]
+        runners = {
+            "tools": lambda: bench_tools(iterations),
+            "token": lambda: bench_token(iterations),
+            "throughput": lambda: bench_throughput(concurrency, per_worker, parallel=True),
+            "e2e": lambda: bench_end_to_end(iterations),
+        }
+        for scenario in scenarios:
+            stub.reset_stats()
+            started = time.perf_counter()
+            results[scenario] = runners[scenario]()
+            results[scenario + "_upstream"] = {
+                "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+                "routes": stub.stats(),
+            }
+        results["http"] = env["http_client"].stats()
+        if rate_limits:
+            results["rate_limits"] = env["rate_limiter"].budget()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(profiles, scenarios, iterations=5, scale=1.0, concurrency=(1, 4, 8), per_worker=2,
+                   llm_latency=0.0, seed=0, rate_limits=False):
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scenarios": list(scenarios),
+            "iterations": iterations,
+            "scale": scale,
+            "concurrency": list(concurrency),
+            "per_worker": per_worker,
+            "llm_latency": llm_latency,
+            "seed": seed,
+            "rate_limits": rate_limits,
+        },
+        "profiles": {},
+    }
+    for profile in profiles:
+        report["profiles"][profile] = run_profile(profile, scenarios, iterations, scale, concurrency, per_worker,
+                                                  llm_latency, seed, rate_limits)
+    return report
+
+
+# 결과에서 비교할 지표만 평평하게 모음: {"fast.tools.FlightSearchTool.cold.p50_ms": 12.3, ...}
+def flatten_metrics(report):
+    metrics = {}
+
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in ("stub_profile", "http", "rate_limits") or key.endswith("_upstream"):
+                    continue
+                walk(f"{prefix}.{key}" if prefix else str(key), item)
+        elif isinstance(value, list):
+            for item in value:
+                label = f"c{item['concurrency']}" if isinstance(item, dict) and "concurrency" in item else None
+                if label:
+                    walk(f"{prefix}.{label}", item)
+        elif isinstance(value, (int, float)) and prefix.endswith(("p50_ms", "p95_ms", "wall_ms", "itineraries_per_s")):
+            metrics[prefix] = value
+
+    walk("", report.get("profiles", {}))
+    return metrics
+
+
+# 두 결과 파일의 지표 비교 (ratio = 새 값 / 기준 값)
+def compare_reports(baseline, current):
+    old, new = flatten_metrics(baseline), flatten_metrics(current)
+    rows = []
+    for name in sorted(set(old) & set(new)):
+        ratio = new[name] / old[name] if old[name] else None
+        rows.append({"metric": name, "baseline": old[name], "current": new[name],
+                     "ratio": round(ratio, 3) if ratio is not None else None})
+    return rows
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="도구 지연 시간과 여행 일정 생성 시간 벤치마크 (스텁 서버 + 가짜 LLM)")
+    parser.add_argument("--profiles", default="fast,realistic,flaky",
+                        help=f"쉼표로 구분한 스텁 프로필 ({', '.join(PROFILES)} 또는 JSON 파일 경로)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"쉼표로 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="스텁 지연 시간 배율 (0.1 이면 10배 빠르게)")
+    parser.add_argument("--concurrency", default="1,4,8", help="동시 처리량 측정 단계 (쉼표로 구분)")
+    parser.add_argument("--per-worker", type=int, default=2, help="동시 처리량 단계마다 워커당 일정 수")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--read-timeout", type=float, help="HTTP 읽기 타임아웃(초), 응답 지연 시나리오용")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-limits", action="store_true", help="업스트림 요청 한도(rate_limiter)를 적용해 측정")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (기본: 표준 출력)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="두 결과 파일 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        rows = compare_reports(_load_json(args.compare[0]), _load_json(args.compare[1]))
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        sys.exit(0)
+
+    if args.read_timeout:
+        os.environ["HTTP_READ_TIMEOUT"] = str(args.read_timeout)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오입니다: {', '.join(unknown)}")
+
+    # 에이전트 진행 로그는 표준 오류로 보내 표준 출력에는 결과 JSON 만 남김
+    with redirect_stdout(sys.stderr):
+        report = run_benchmarks(
+            [name.strip() for name in args.profiles.split(",") if name.strip()],
+            scenarios,
+            iterations=args.iterations,
+            scale=args.scale,
+            concurrency=[int(level) for level in args.concurrency.split(",")],
+            per_worker=args.per_worker,
+            llm_latency=args.llm_latency,
+            seed=args.seed,
+            rate_limits=args.rate_limits,
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
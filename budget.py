@@ -0,0 +1,173 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from output_shaper import render_table
+
+# 예산표에 보여 주는 항목 순서 (여기 없는 항목은 뒤에 이름순)
+CATEGORY_ORDER = ["항공", "숙소", "교통", "식비", "관광", "쇼핑", "기타"]
+
+# 소수점 없이 쓰는 통화
+ZERO_DECIMAL_CURRENCIES = {"KRW", "JPY", "VND", "IDR", "CLP", "HUF"}
+
+# "80만 원", "1,200엔", "$300" 처럼 금액에 붙는 통화 표기
+CURRENCY_WORDS = {
+    "원": "KRW", "₩": "KRW", "엔": "JPY", "¥": "JPY", "달러": "USD", "$": "USD", "유로": "EUR", "€": "EUR",
+    "위안": "CNY", "바트": "THB", "동": "VND", "파운드": "GBP", "£": "GBP",
+}
+# 금액 바로 뒤에 통화 대신 올 수 있는 말 ("50만 이내")
+_QUALIFIERS = ("이내", "이하", "미만", "정도", "내외", "안팎", "쯤", "가량", "까지", "선")
+_UNITS = {"천": 1_000, "만": 10_000, "백만": 1_000_000, "천만": 10_000_000, "억": 100_000_000}
+_AMOUNT = re.compile(
+    r"(?:([$€£¥₩])|(?<![A-Za-z])([A-Z]{3}))?\s*(\d[\d,]*(?:\.\d+)?)\s*(천만|백만|천|만|억)?\s*"
+    r"([A-Za-z]+|[가-힣]+|[$€£¥₩])?"
+)
+
+
+# "80만 원", "800,000원", "1.5백만 KRW", "$300", "USD 300" -> (금액, 통화 코드)
+# 통화 표기가 없으면 default_currency 를 씁니다. 금액을 찾지 못하거나 금액 뒤의 통화 표기를 모르면 ValueError
+# ("80만 원 이내", "5만원정도", "50만 이하" 처럼 통화 표기 뒤나 금액 뒤에 붙은 말은 무시)
+def parse_amount(text, default_currency="KRW"):
+    match = _AMOUNT.search(str(text))
+    if not match:
+        raise ValueError(f"'{text}'에서 금액을 찾을 수 없습니다.")
+
+    symbol, code, number, unit, suffix = match.groups()
+    amount = float(number.replace(",", "")) * _UNITS.get(unit, 1)
+    currency = code or CURRENCY_WORDS.get(symbol, default_currency)
+    if suffix:
+        if re.fullmatch(r"[A-Za-z]{3}", suffix):
+            currency = suffix.upper()
+        elif not suffix.startswith(_QUALIFIERS):
+            currency = next((code for name, code in CURRENCY_WORDS.items() if suffix.startswith(name)), None)
+            if currency is None:
+                raise ValueError(f"'{text}'의 통화 '{suffix}'을(를) 알 수 없습니다. 통화 코드(예: USD)로 적어 주세요.")
+    return amount, currency
+
+
+def round_amount(amount, currency):
+    return round(amount) if currency in ZERO_DECIMAL_CURRENCIES else round(amount, 2)
+
+
+def format_amount(amount, currency):
+    return f"{amount:,.0f}" if currency in ZERO_DECIMAL_CURRENCIES else f"{amount:,.2f}"
+
+
+# 예산 항목 한 줄: amount(단가) x quantity 가 이 항목의 비용
+# day 가 없으면 항공권/숙박처럼 특정 날짜가 아닌 여행 전체에 드는 비용
+@dataclass(slots=True)
+class BudgetItem:
+    category: str
+    name: str
+    amount: float
+    currency: str
+    quantity: float = 1
+    day: Optional[int] = None
+
+    @property
+    def total(self):
+        return self.amount * self.quantity
+
+
+@dataclass(slots=True)
+class BudgetLine:
+    item: BudgetItem
+    converted: float  # report.currency 로 환산한 금액
+
+
+@dataclass(slots=True)
+class BudgetReport:
+    currency: str
+    lines: List[BudgetLine]
+    by_category: Dict[str, float]
+    by_day: Dict[Optional[int], float]
+    total: float
+    limit: Optional[float] = None
+    rates: Dict[str, float] = field(default_factory=dict)  # 항목 통화 -> report.currency 환율
+    rate_updated_at: Optional[str] = None
+    stale: bool = False
+
+    @property
+    def remaining(self):
+        return None if self.limit is None else self.limit - self.total
+
+    @property
+    def over_budget(self):
+        return self.limit is not None and self.total > self.limit
+
+
+# 항목들을 currency 로 환산해 항목별/일자별 합계와 총액을 계산
+# 환율은 table(RateTable) 한 장에서 통화마다 한 번만 찾고, 모든 계산은 로컬에서 합니다.
+# - limit: 예산 (currency 기준, 없으면 예산 비교를 하지 않음)
+def compute_budget(items, table, currency="KRW", limit=None, stale=False):
+    currency = currency.upper()
+    rates = {code: table.rate(code, currency) for code in sorted({item.currency.upper() for item in items})}
+
+    lines = []
+    by_category = defaultdict(float)
+    by_day = defaultdict(float)
+    for item in items:
+        converted = item.total * rates[item.currency.upper()]
+        lines.append(BudgetLine(item, converted))
+        by_category[item.category] += converted
+        by_day[item.day] += converted
+
+    rank = {name: index for index, name in enumerate(CATEGORY_ORDER)}
+    return BudgetReport(
+        currency=currency,
+        lines=sorted(lines, key=lambda line: (line.item.day is not None, line.item.day or 0,
+                                              rank.get(line.item.category, len(rank)), line.item.category)),
+        by_category={name: by_category[name]
+                     for name in sorted(by_category, key=lambda name: (rank.get(name, len(rank)), name))},
+        by_day={day: by_day[day] for day in sorted(by_day, key=lambda day: (day is not None, day or 0))},
+        total=sum(line.converted for line in lines),
+        limit=limit,
+        rates=rates,
+        rate_updated_at=table.updated_at,
+        stale=stale,
+    )
+
+
+def _day_label(day):
+    return "공통" if day is None else f"{day}일차"
+
+
+# 에이전트에게 돌려주는 예산표: 항목 목록, 일자별/항목별 합계, 총액과 예산 대비 결과
+def render_budget(report, budget=2000):
+    currency = report.currency
+    sections = [render_table(
+        ["일자", "항목", "내용", "현지 금액", currency],
+        [
+            (_day_label(line.item.day), line.item.category, line.item.name,
+             f"{format_amount(line.item.amount, line.item.currency.upper())} {line.item.currency.upper()}"
+             + (f" x {line.item.quantity:g}" if line.item.quantity != 1 else ""),
+             format_amount(line.converted, currency))
+            for line in report.lines
+        ],
+        budget=budget, title="### 상세 예산표"
+    )]
+    sections.append(render_table(
+        ["일자", currency], [(_day_label(day), format_amount(amount, currency)) for day, amount in report.by_day.items()],
+        title="### 일자별 합계"
+    ))
+    sections.append(render_table(
+        ["항목", currency, "비율"],
+        [(name, format_amount(amount, currency), f"{amount / report.total:.0%}" if report.total else "-")
+         for name, amount in report.by_category.items()],
+        title="### 항목별 합계"
+    ))
+
+    summary = [f"총액: {format_amount(report.total, currency)} {currency}"]
+    if report.limit is not None:
+        summary.append(f"예산: {format_amount(report.limit, currency)} {currency}")
+        if report.over_budget:
+            summary.append(f"예산 초과: {format_amount(-report.remaining, currency)} {currency}")
+        else:
+            summary.append(f"남은 예산: {format_amount(report.remaining, currency)} {currency}")
+    rates = ", ".join(f"1 {code} = {rate:,.4g} {currency}" for code, rate in report.rates.items() if code != currency)
+    if rates:
+        summary.append(f"적용 환율: {rates} (기준 {report.rate_updated_at or '알 수 없음'}"
+                       + (", 갱신 실패로 이전 환율 사용" if report.stale else "") + ")")
+    sections.append("\n".join(summary))
+    return "\n\n".join(sections)
@@ -0,0 +1,37 @@
+import time
+
+from budget import parse_amount
+from exchange_rates import RateTable
+from tools import BudgetCalculatorTool
+
+# 예산 계산 도구 확인: 모르는 도시 이름을 받아도 실패하지 않고, 통화를 적지 않은 항목은 예산표 통화(KRW)로 계산
+table = RateTable(base="KRW", rates={"KRW": 1.0, "JPY": 0.1}, updated_at=None, updated_at_unix=None,
+                  fetched_at=time.time())
+items = [
+    {"category": "식비", "name": "저녁", "amount": 30000, "day": 1},
+    {"category": "관광", "name": "입장권", "amount": 1000, "currency": "JPY", "day": 1},
+]
+report = BudgetCalculatorTool.calculate(table, False, items, budget="5만 원", city_name="없는도시이름")
+
+if "30,000 KRW" not in report or "총액: 40,000 KRW" not in report or "남은 예산: 10,000 KRW" not in report:
+    raise ValueError(f"모르는 도시의 예산표가 KRW 로 계산되지 않았습니다.\n{report}")
+else:
+    print("BudgetCalculatorTool falls back to KRW for an unknown city.")
+
+# 예산 금액 해석: 통화 코드가 금액 앞에 있어도 그 통화로 읽고, 모르는 통화 표기는 KRW 로 넘기지 않고 ValueError
+amounts = {
+    "USD 300": (300, "USD"), "EUR 500": (500, "EUR"), "$300": (300, "USD"), "300 usd": (300, "USD"),
+    "80만 원 이내": (800000, "KRW"), "50만 이하": (500000, "KRW"), "1,200엔": (1200, "JPY"),
+}
+parsed = {text: parse_amount(text) for text in amounts}
+rejected = []
+for text in ("300 dollars", "3박"):
+    try:
+        parse_amount(text)
+    except ValueError:
+        rejected.append(text)
+
+if parsed != amounts or len(rejected) != 2:
+    raise ValueError(f"예산 금액을 잘못 해석했습니다: {parsed}, 거절한 입력: {rejected}")
+else:
+    print("parse_amount reads leading currency codes and rejects unknown currency words.")
@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_FANOUT_THREAD_PREFIX = "fanout"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# map_bounded 가 함께 쓰는 프로세스 공용 스레드 풀 (호출마다 풀을 만들고 버리지 않음)
+# - FANOUT_THREADS: 풀 전체의 스레드 수 (기본 32). 호출 1건의 동시 실행 수는 max_workers 로 따로 제한
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(os.getenv("FANOUT_THREADS", 32)),
+                                               thread_name_prefix=_FANOUT_THREAD_PREFIX)
+    return _executor
+
+
+# 결과 중 None 이 아닌 값을 입력 순서로 limit 개만 남김
+def _keep_first(results, limit):
+    found = 0
+    for idx, result in enumerate(results):
+        if result is None:
+            continue
+        if found >= limit:
+            results[idx] = None
+        else:
+            found += 1
+    return results
+
+
+# 입력 순서 앞쪽부터 끝난 항목만 보고, None 이 아닌 결과가 limit 개 모였는지 (뒤 항목은 더 기다릴 필요 없음)
+def _prefix_complete(results, done, limit):
+    found = 0
+    for idx, finished in enumerate(done):
+        if not finished:
+            return False
+        if results[idx] is not None:
+            found += 1
+            if found >= limit:
+                return True
+    return True
+
+
+# 최대 max_workers 개의 스레드로 func(item)을 병렬 호출하고, 결과를 입력 순서대로 돌려줍니다.
+# - 예외가 발생했거나 시간 초과/조기 종료로 받지 못한 항목의 자리는 None 으로 채워집니다.
+# - limit 을 지정하면 입력 순서로 앞에서부터 None 이 아닌 결과 limit 개만 남깁니다. 앞쪽 항목들의 결과가
+#   모두 나와 그 limit 개가 정해지면 아직 시작하지 않은 작업은 보내지 않습니다. (빨리 끝난 뒤쪽 항목이 앞쪽을 밀어내지 않음)
+# - timeout 은 전체 fan-out 에 대한 대기 시간(초)입니다. 요청별 타임아웃은 func 쪽에서 지정합니다.
+def map_bounded(func, items, max_workers=5, timeout=None, limit=None):
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    # 공용 풀의 작업 안에서 다시 호출되면 풀이 가득 차 서로 기다릴 수 있으므로 이때만 임시 풀을 씀
+    nested = threading.current_thread().name.startswith(_FANOUT_THREAD_PREFIX)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) if nested else get_executor()
+
+    done = [False] * len(items)
+    pending = {}
+    next_idx = 0
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def submit_next():
+        nonlocal next_idx
+        # 작업 스레드에서도 호출한 쪽의 컨텍스트(트레이스 상위 구간 등)를 이어받도록 항목마다 컨텍스트를 복사해 실행
+        future = executor.submit(contextvars.copy_context().run, func, items[next_idx])
+        pending[future] = next_idx
+        next_idx += 1
+
+    try:
+        while next_idx < len(items) and len(pending) < max(1, max_workers):
+            submit_next()
+
+        while pending:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            finished, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in finished:
+                idx = pending.pop(future)
+                done[idx] = True
+                try:
+                    results[idx] = future.result()
+                except Exception:
+                    pass
+
+            if limit is not None and _prefix_complete(results, done, limit):
+                break
+            while next_idx < len(items) and len(pending) < max(1, max_workers):
+                submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+        if nested:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return _keep_first(results, limit) if limit is not None else results
+
+
+# map_bounded 의 asyncio 버전: 최대 max_workers 개의 코루틴 func(item)을 동시에 실행하고, 결과를 입력 순서대로 돌려줍니다.
+# - 예외/시간 초과/limit(입력 순서로 앞에서부터) 처리는 map_bounded 와 같습니다.
+# - 조기 종료하거나 timeout 이 지나면 아직 끝나지 않은 작업은 취소하고, 취소가 끝날 때까지 기다린 뒤 반환합니다.
+async def gather_bounded(func, items, max_workers=5, timeout=None, limit=None):
+    items = list(items)
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(idx, item):
+        async with semaphore:
+            return idx, await func(item)
+
+    tasks = [asyncio.ensure_future(run(idx, item)) for idx, item in enumerate(items)]
+    pending = set(tasks)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    done_flags = [False] * len(items)
+
+    try:
+        while pending:
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                done_flags[tasks.index(task)] = True
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                idx, result = task.result()
+                results[idx] = result
+
+            if limit is not None and _prefix_complete(results, done_flags, limit):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return _keep_first(results, limit) if limit is not None else results
+
+
+# 리스트를 size 개씩 잘라 반환합니다.
+def chunked(items, size):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
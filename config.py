@@ -0,0 +1,17 @@
+import threading
+
+from dotenv import load_dotenv
+
+_loaded = False
+_loaded_lock = threading.Lock()
+
+
+# .env 파일을 프로세스에서 한 번만 읽어 환경변수로 등록 (이미 설정된 환경변수는 덮어쓰지 않음)
+# 모듈마다 load_dotenv() 를 부르는 대신 이 함수를 부르면 두 번째 호출부터는 아무 일도 하지 않습니다.
+def load_config():
+    global _loaded
+    if not _loaded:
+        with _loaded_lock:
+            if not _loaded:
+                load_dotenv()
+                _loaded = True
@@ -1,7 +1,7 @@
-from dotenv import load_dotenv
+from config import load_config
 import os   
 
-load_dotenv()
+load_config()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 if OPENAI_API_KEY is None:
@@ -1,15 +1,59 @@
-from crewai import Crew, Process
-from agents import coordinator_agent, travel_info_agent, local_recommendation_agent
-from tasks import initial_travel_plan_task, local_recommendation_task, final_coordinator_task
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from crewai import Crew
+
+# 모드별로 프로세스당 한 번만 구성하는 Crew 원본
+_crew_templates = {}
+_crew_templates_lock = threading.Lock()
 
 class TravelCoordinatorCrew():
 
-    def crew(self) -> Crew:
+    # parallel=True 이면 항공편/숙소/현지 추천을 동시에 실행하는 병렬 모드로 구성합니다.
+    # 지정하지 않으면 CREW_PARALLEL 환경변수(1/true)를 따릅니다.
+    def __init__(self, parallel=None):
+        if parallel is None:
+            parallel = os.getenv("CREW_PARALLEL", "").lower() in ("1", "true", "yes")
+        self.parallel = parallel
+
+    # 원본 Crew 의 사본을 반환합니다. 에이전트/태스크 실행 상태는 kickoff 마다 분리되고,
+    # 도구(HTTP 세션, Amadeus 토큰, 응답 캐시)는 모든 사본이 공유합니다.
+    def crew(self) -> "Crew":
+        template = _crew_templates.get(self.parallel)
+        if template is None:
+            with _crew_templates_lock:
+                template = _crew_templates.get(self.parallel)
+                if template is None:
+                    template = _crew_templates[self.parallel] = self.build_crew()
+        return template.copy()
+
+    # crewai, 에이전트, 태스크는 여기서 처음 불러오므로 이 모듈을 import 하는 것만으로는 무거운 의존성을 읽지 않습니다.
+    def build_crew(self) -> "Crew":
+        from crewai import Crew, Process
+
+        import crew_tracing  # CrewAI 이벤트 버스에 kickoff/task/agent/LLM 트레이스 핸들러 등록
+        from agents import (
+            coordinator_agent, travel_info_agent, local_recommendation_agent,
+            flight_info_agent, hotel_info_agent
+        )
+        from tasks import (
+            initial_travel_plan_task, local_recommendation_task, final_coordinator_task,
+            flight_search_task, hotel_search_task, local_research_task, parallel_coordinator_task
+        )
+
+        if self.parallel:
+            return Crew(
+                agents=[flight_info_agent, hotel_info_agent, local_recommendation_agent, coordinator_agent],
+                tasks=[flight_search_task, hotel_search_task, local_research_task, parallel_coordinator_task],
+                process=Process.sequential,
+                verbose=True
+            )
+
         return Crew(
             agents=[travel_info_agent, local_recommendation_agent,coordinator_agent],
             tasks=[initial_travel_plan_task, local_recommendation_task, final_coordinator_task],
             process=Process.sequential,
             verbose=True
         )
-
-
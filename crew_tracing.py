@@ -0,0 +1,127 @@
+import threading
+
+from crewai.utilities.events import (
+    crewai_event_bus,
+    AgentExecutionCompletedEvent, AgentExecutionErrorEvent, AgentExecutionStartedEvent,
+    CrewKickoffCompletedEvent, CrewKickoffFailedEvent, CrewKickoffStartedEvent,
+    LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent,
+    TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+)
+
+from output_shaper import estimate_tokens
+from tracing import current_span, get_tracer, set_current_span, NOOP_SPAN
+
+# CrewAI 이벤트 버스로 kickoff > task > agent > llm 구간을 기록
+# 이벤트 핸들러는 이벤트를 보낸 스레드에서 바로 실행되므로, 시작 이벤트에서 현재 구간을 바꿔 두면
+# 같은 스레드의 도구/HTTP 구간이 그 아래에 붙습니다. 비동기 태스크는 별도 스레드에서 실행되므로
+# 태스크의 에이전트가 속한 crew 로 kickoff 구간을 찾아 연결합니다.
+# 열린 구간: 키 -> (구간, 시작 전의 현재 구간)
+_open_spans = {}
+_open_spans_lock = threading.Lock()
+
+
+def _open(key, kind, name, parent=None, **attributes):
+    span = get_tracer().start_span(kind, name, parent=parent, **attributes)
+    if span is NOOP_SPAN:
+        return
+    previous = set_current_span(span)
+    with _open_spans_lock:
+        _open_spans[key] = (span, previous)
+
+
+def _close(key, error=None, **attributes):
+    with _open_spans_lock:
+        opened = _open_spans.pop(key, None)
+    if opened is None:
+        return
+    span, previous = opened
+    span.set(**attributes)
+    get_tracer().end_span(span, error=error)
+    set_current_span(previous or NOOP_SPAN)
+
+
+def _crew_span(task):
+    crew = getattr(getattr(task, "agent", None), "crew", None)
+    with _open_spans_lock:
+        opened = _open_spans.get(("crew", id(crew)))
+    return opened[0] if opened else None
+
+
+def _task_name(task):
+    return getattr(task, "name", None) or " ".join(str(getattr(task, "description", "")).split())[:40]
+
+
+def _message_text(messages):
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content", "")) for message in messages or [])
+
+
+@crewai_event_bus.on(CrewKickoffStartedEvent)
+def _on_kickoff_started(source, event):
+    inputs = event.inputs or {}
+    _open(("crew", id(source)), "kickoff", event.crew_name or "crew",
+          input_chars=sum(len(str(value)) for value in inputs.values()))
+
+
+@crewai_event_bus.on(CrewKickoffCompletedEvent)
+def _on_kickoff_completed(source, event):
+    _close(("crew", id(source)), output_chars=len(str(event.output)))
+
+
+@crewai_event_bus.on(CrewKickoffFailedEvent)
+def _on_kickoff_failed(source, event):
+    _close(("crew", id(source)), error=event.error)
+
+
+@crewai_event_bus.on(TaskStartedEvent)
+def _on_task_started(source, event):
+    task = event.task or source
+    agent = getattr(task, "agent", None)
+    _open(("task", id(task)), "task", _task_name(task), parent=_crew_span(task) or current_span(),
+          agent=getattr(agent, "role", None), async_execution=bool(getattr(task, "async_execution", False)))
+
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def _on_task_completed(source, event):
+    output = event.output
+    _close(("task", id(event.task or source)), output_chars=len(getattr(output, "raw", "") or ""))
+
+
+@crewai_event_bus.on(TaskFailedEvent)
+def _on_task_failed(source, event):
+    _close(("task", id(event.task or source)), error=event.error)
+
+
+@crewai_event_bus.on(AgentExecutionStartedEvent)
+def _on_agent_started(source, event):
+    _open(("agent", id(event.task)), "agent", event.agent.role,
+          tools=len(event.tools or []), prompt_chars=len(event.task_prompt or ""))
+
+
+@crewai_event_bus.on(AgentExecutionCompletedEvent)
+def _on_agent_completed(source, event):
+    _close(("agent", id(event.task)), output_chars=len(event.output or ""))
+
+
+@crewai_event_bus.on(AgentExecutionErrorEvent)
+def _on_agent_error(source, event):
+    _close(("agent", id(event.task)), error=event.error)
+
+
+# LLM 객체는 여러 kickoff 가 함께 쓰므로 (LLM, 스레드) 로 호출을 구분
+# 토큰 수는 호출마다 정확한 사용량을 받을 수 없어 프롬프트/응답 길이로 추정 (kickoff 전체 사용량은 CrewOutput.token_usage)
+@crewai_event_bus.on(LLMCallStartedEvent)
+def _on_llm_started(source, event):
+    _open(("llm", id(source), threading.get_ident()), "llm", str(getattr(source, "model", "llm")),
+          prompt_tokens=estimate_tokens(_message_text(event.messages)), tokens_estimated=True)
+
+
+@crewai_event_bus.on(LLMCallCompletedEvent)
+def _on_llm_completed(source, event):
+    _close(("llm", id(source), threading.get_ident()), completion_tokens=estimate_tokens(str(event.response)))
+
+
+@crewai_event_bus.on(LLMCallFailedEvent)
+def _on_llm_failed(source, event):
+    _close(("llm", id(source), threading.get_ident()), error=event.error)
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+
+from config import load_config
+from http_client import http_get
+
+load_config()
+
+
+# 기준 통화(base) 대비 전체 환율표 한 장
+# rates[X] 는 1 base 가 몇 X 인지를 의미하므로, A -> B 환율은 rates[B] / rates[A] 입니다.
+class RateTable:
+    def __init__(self, base, rates, updated_at, updated_at_unix, fetched_at):
+        self.base = base
+        self.rates = rates
+        self.updated_at = updated_at  # 업스트림 기준 환율 갱신 시각 (UTC 문자열)
+        self.updated_at_unix = updated_at_unix
+        self.fetched_at = fetched_at  # 이 프로세스가 환율표를 받아온 시각
+
+    def rate(self, from_currency, to_currency):
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        for currency in (from_currency, to_currency):
+            if currency not in self.rates:
+                raise ValueError(f"'{currency}'의 환율 정보를 찾을 수 없습니다.")
+        return self.rates[to_currency] / self.rates[from_currency]
+
+    def convert(self, amount, from_currency, to_currency):
+        return amount * self.rate(from_currency, to_currency)
+
+
+# /latest/{base} 환율표를 한 번 받아 refresh_interval 동안 재사용하고, 환산은 로컬에서 계산합니다.
+# 갱신에 실패하면 마지막으로 받은 환율표를 그대로 사용합니다(stale=True 로 표시).
+# 실패 후 retry_interval 초(기본 min(refresh_interval, 60)) 동안은 업스트림을 다시 부르지 않고 이전 환율표를 바로 돌려주므로,
+# 장애 중에도 환산할 때마다 타임아웃과 재시도를 기다리며 락 앞에 줄 서지 않습니다.
+class RateTableCache:
+    def __init__(self, base="KRW", refresh_interval=3600, api_key=None, retry_interval=None):
+        self.base = base.upper()
+        self.refresh_interval = refresh_interval
+        self.retry_interval = min(refresh_interval, 60) if retry_interval is None else retry_interval
+        self.api_key = api_key or os.getenv('EXCHANGE_RATE_API_KEY')
+
+        self._table = None
+        self._stale = False
+        self._retry_at = 0  # 갱신 실패 후 다음 갱신을 시도할 시각
+        self._lock = threading.Lock()
+
+    # 마지막 갱신에 실패해 이전 환율표를 쓰고 있는지
+    @property
+    def stale(self):
+        return self._stale
+
+    # 다시 받을 필요가 없는 환율표가 있는지 (갱신에 실패한 뒤 재시도 시각 전이면 이전 환율표도 그대로 사용)
+    def is_fresh(self):
+        table = self._table
+        if not table:
+            return False
+        now = time.time()
+        return now - table.fetched_at < self.refresh_interval or now < self._retry_at
+
+    def get_table(self):
+        if self.is_fresh():
+            return self._table
+
+        with self._lock:
+            if self.is_fresh():
+                return self._table
+
+            try:
+                self._table = self.fetch_table()
+                self._stale = False
+                self._retry_at = 0
+            except Exception:
+                if self._table is None:
+                    raise
+                self._stale = True
+                self._retry_at = time.time() + self.retry_interval
+
+            return self._table
+
+    def fetch_table(self):
+        url = f"https://v6.exchangerate-api.com/v6/{self.api_key}/latest/{self.base}"
+
+        response = http_get(url)
+        if response.status_code != 200:
+            raise Exception("환율 정보 조회 실패", response.text)
+
+        data = response.json()
+
+        if data['result'] != "success":
+            raise Exception("환율 조회에 실패했습니다", data.get('error-type', 'unknown error'))
+
+        return RateTable(
+            base=data["base_code"],
+            rates=data["conversion_rates"],
+            updated_at=data.get("time_last_update_utc"),
+            updated_at_unix=data.get("time_last_update_unix"),
+            fetched_at=time.time()
+        )
+
+    def convert(self, from_currency, to_currency, amount):
+        table = self.get_table()
+        rate = table.rate(from_currency, to_currency)
+
+        return {
+            "from_currency": from_currency,
+            "to_currency": to_currency,
+            "original_amount": amount,
+            "converted_amount": round(amount * rate, 4),
+            "conversion_rate": rate,
+            "rate_updated_at": table.updated_at,
+            "stale": self._stale
+        }
+
+    # [{"from_currency": ..., "to_currency": ..., "amount": ...}, ...] 를 한 번에 환산
+    # 환율을 찾을 수 없는 통화가 있으면 그 항목만 "error" 를 담아 돌려주고 나머지는 계속 환산합니다.
+    def convert_many(self, conversions):
+        self.get_table()
+        results = []
+        for item in conversions:
+            try:
+                results.append(self.convert(item["from_currency"], item["to_currency"], item["amount"]))
+            except ValueError as e:
+                results.append({
+                    "from_currency": item["from_currency"],
+                    "to_currency": item["to_currency"],
+                    "original_amount": item["amount"],
+                    "error": str(e)
+                })
+        return results
+
+    # get_table / convert / convert_many 의 asyncio 버전: 환율표를 새로 받아야 할 때만 스레드에서 기다림 (환산은 로컬 계산)
+    async def aget_table(self):
+        if self.is_fresh():
+            return self._table
+        return await asyncio.to_thread(self.get_table)
+
+    async def aconvert(self, from_currency, to_currency, amount):
+        await self.aget_table()
+        return self.convert(from_currency, to_currency, amount)
+
+    async def aconvert_many(self, conversions):
+        await self.aget_table()
+        return self.convert_many(conversions)
+
+
+_rate_cache = None
+_rate_cache_lock = threading.Lock()
+
+
+# 프로세스 공용 환율표 캐시
+# - EXCHANGE_RATE_BASE: 기준 통화 (기본 KRW)
+# - EXCHANGE_RATE_REFRESH: 환율표 갱신 주기(초, 기본 3600)
+# - EXCHANGE_RATE_RETRY: 갱신 실패 후 다시 시도하기까지 기다리는 시간(초, 기본 min(갱신 주기, 60))
+def get_rate_cache():
+    global _rate_cache
+    if _rate_cache is None:
+        with _rate_cache_lock:
+            if _rate_cache is None:
+                _rate_cache = RateTableCache(
+                    base=os.getenv("EXCHANGE_RATE_BASE", "KRW"),
+                    refresh_interval=float(os.getenv("EXCHANGE_RATE_REFRESH", 3600)),
+                    retry_interval=float(os.environ["EXCHANGE_RATE_RETRY"]) if os.getenv("EXCHANGE_RATE_RETRY") else None
+                )
+    return _rate_cache
@@ -1,33 +1,17 @@
-import requests
-import os
-from dotenv import load_dotenv
+from config import load_config
 
-load_dotenv()
+from exchange_rates import get_rate_cache
+
+load_config()
 
 class ExchangeRateTool():
 
     def exchange_currency(self, from_currency: str, to_currency: str, amount: float):
-        api_key = os.getenv('EXCHANGE_RATE_API_KEY')
-        url = f"https://v6.exchangerate-api.com/v6/{api_key}/pair/{from_currency}/{to_currency}/{amount}"
-
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception("환율 정보 조회 실패", response.text)
-
-        data = response.json()
-
-        if data['result'] != "success":
-            raise Exception("환율 조회에 실패했습니다", data.get('error-type', 'unknown error'))
-
-        converted_amount = data['conversion_result']
+        return get_rate_cache().convert(from_currency, to_currency, amount)
 
-        return {
-            "from_currency": from_currency,
-            "to_currency": to_currency,
-            "original_amount": amount,
-            "converted_amount": converted_amount,
-            "conversion_rate": data["conversion_rate"]
-        }
+    # 여러 금액을 한 번에 환산 (환율표는 한 번만 조회)
+    def exchange_many(self, conversions):
+        return get_rate_cache().convert_many(conversions)
 
 # 사용 예시
 if __name__ == "__main__":
@@ -36,6 +20,17 @@ if __name__ == "__main__":
     result = exchange_tool.exchange_currency(from_currency="USD", to_currency="KRW", amount=100)
 
     print(f"{result['original_amount']} {result['from_currency']}는 {result['converted_amount']} {result['to_currency']}입니다.")
-    print(f"적용된 환율: {result['conversion_rate']}")
+    print(f"적용된 환율: {result['conversion_rate']} (기준 시각: {result['rate_updated_at']})")
+
+    results = exchange_tool.exchange_many([
+        {"from_currency": "JPY", "to_currency": "KRW", "amount": 1500},
+        {"from_currency": "JPY", "to_currency": "KRW", "amount": 980},
+        {"from_currency": "USD", "to_currency": "JPY", "amount": 20}
+    ])
+    for result in results:
+        if "error" in result:
+            print(f"{result['original_amount']} {result['from_currency']} -> 변환 실패: {result['error']}")
+        else:
+            print(f"{result['original_amount']} {result['from_currency']} -> {result['converted_amount']} {result['to_currency']}")
     
     
\ No newline at end of file
@@ -0,0 +1,189 @@
+import json
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.events import (
+    crewai_event_bus, LLMCallCompletedEvent, LLMCallStartedEvent, LLMCallType, LLMStreamChunkEvent
+)
+
+from locations import get_location_index
+
+# 요청에서 여행 정보를 찾지 못했을 때 사용하는 기본값
+DEFAULT_TRIP = {"origin": "인천", "destination": "오사카", "start": "2025-04-25", "end": "2025-04-27"}
+
+# CrewAI 도구 사용 안내 메시지의 첫 문장
+TOOL_REMINDER = "You ONLY have access to the following tools"
+
+
+# 요청 문장에서 출발지, 목적지, 여행 기간을 뽑아냄
+# 예: "2025년 4월 25일부터 27일까지 인천을 출발해서 오사카로" -> 인천, 오사카, 2025-04-25, 2025-04-27
+def extract_trip(text):
+    trip = dict(DEFAULT_TRIP)
+
+    match = re.search(r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일\s*(?:부터|~|-)?\s*(?:(\d{1,2})월\s*)?(\d{1,2})일", text)
+    if match:
+        year, month, day, end_month, end_day = match.groups()
+        start = date(int(year), int(month), int(day))
+        end = date(int(year), int(end_month or month), int(end_day))
+        trip["start"], trip["end"] = start.isoformat(), max(end, start + timedelta(days=1)).isoformat()
+    else:
+        dates = re.findall(r"\d{4}-\d{2}-\d{2}", text)
+        if len(dates) >= 2:
+            trip["start"], trip["end"] = dates[0], dates[1]
+
+    # 한글 도시 이름이 처음 나오는 위치 순으로 정렬 ("~을 출발" 앞의 도시가 출발지)
+    found = {}
+    for city in get_location_index().cities:
+        for name in [city.name_ko] + [alias for alias in city.aliases if re.search(r"[가-힣]", alias)]:
+            if len(name) < 2:
+                continue
+            position = text.find(name)
+            if position >= 0 and (city.name_ko not in found or position < found[city.name_ko]):
+                found[city.name_ko] = position
+    names = sorted(found, key=found.get)
+
+    origin = next((name for name in names if re.match(r"\s*[을를에서]*\s*출발", text[found[name] + len(name):])), None)
+    if origin or names:
+        trip["origin"] = origin or names[0]
+        others = [name for name in names if name != trip["origin"]]
+        if others:
+            trip["destination"] = others[0]
+    return trip
+
+
+# 도구 이름 -> 여행 정보로 만든 도구 입력 (여기 없는 도구는 사용하지 않음)
+def plan_tool_calls(trip, tool_names):
+    destination = get_location_index().lookup(trip["destination"]).city
+    currency = destination.currency if destination and destination.currency != "KRW" else "USD"
+
+    plans = {
+        "항공편 검색 도구": {"origin_city": trip["origin"], "destination_city": trip["destination"],
+                        "departure_date": trip["start"], "return_date": trip["end"]},
+        "숙소 검색 도구": {"city_name": trip["destination"], "check_in_date": trip["start"],
+                      "check_out_date": trip["end"]},
+        "인근 장소 검색 도구": {"place_name": trip["destination"]},
+        "환율 도구": {"from_currency": currency, "to_currency": "KRW", "amount": 10000},
+        "예산 계산 도구": {"items": budget_items(trip, currency), "budget": "80만 원",
+                       "city_name": trip["destination"]},
+    }
+    return [(name, args) for name, args in plans.items() if name in tool_names]
+
+
+# 여행 기간으로 만든 예산 계산 도구 입력 (항공/숙소는 원화, 현지 교통비는 도착지 통화)
+def budget_items(trip, currency):
+    start, end = date.fromisoformat(trip["start"]), date.fromisoformat(trip["end"])
+    nights = max((end - start).days, 1)
+    items = [
+        {"category": "항공", "name": f"{trip['origin']} ↔ {trip['destination']} 왕복", "amount": 350000,
+         "currency": "KRW"},
+        {"category": "숙소", "name": f"{nights}박", "amount": 80000, "currency": "KRW", "quantity": nights},
+    ]
+    for day in range(1, nights + 2):
+        items.append({"category": "식비", "name": "아침/점심/저녁", "amount": 40000, "currency": "KRW", "day": day})
+        items.append({"category": "교통", "name": "대중교통", "amount": 10, "currency": currency, "day": day})
+    return items
+
+
+# 오프라인 실행용 가짜 LLM
+# CrewAI 의 ReAct 형식(Thought/Action/Action Input, Final Answer)으로 답하므로 에이전트 실행기가 실제 LLM 과 같은 경로로 동작합니다.
+# 요청에서 뽑은 여행 정보로 사용할 수 있는 도구를 한 번씩 호출한 뒤, 도구 결과를 모아 최종 답변을 만듭니다.
+# 같은 입력에는 항상 같은 답을 하며, latency 로 LLM 응답 지연을 흉내 낼 수 있습니다.
+class FakeLLM(BaseLLM):
+    def __init__(self, model="fake-llm", latency=0.0, chunk_size=24):
+        super().__init__(model=model, temperature=0)
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.stream = False
+        self._lock = threading.Lock()
+        self.call_count = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        with self._lock:
+            self.call_count += 1
+        # 실제 LLM 과 같은 호출 시작/완료 이벤트를 보내 트레이스와 이벤트 리스너가 똑같이 동작하게 함
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(messages=messages, tools=tools, callbacks=callbacks,
+                                                              available_functions=available_functions))
+        if self.latency:
+            time.sleep(self.latency)
+
+        answer = self.respond(messages)
+        if self.stream:
+            for start in range(0, len(answer), self.chunk_size):
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=answer[start:start + self.chunk_size]))
+        crewai_event_bus.emit(self, event=LLMCallCompletedEvent(response=answer, call_type=LLMCallType.LLM_CALL))
+        return answer
+
+    def respond(self, messages):
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        tool_names = re.findall(r"Tool Name: (.+?)\n", prompt)
+        # CrewAI 가 중간에 넣는 도구 사용 안내 메시지에도 "Observation:" 이 들어 있으므로 제외
+        observations = [
+            message["content"].split("Observation:", 1)[1].strip()
+            for message in messages
+            if message.get("role") == "assistant"
+            and "Observation:" in str(message.get("content", ""))
+            and TOOL_REMINDER not in message["content"]
+        ]
+
+        # 에이전트 설명과 도구 설명에도 도시 이름 예시가 있으므로 태스크의 "요청:" 줄에서만 여행 정보를 찾고,
+        # 요청이 없는 후속 태스크는 앞 단계 답변의 머리글에서 가져옴
+        request = re.search(r"요청: (.+)", prompt)
+        header = re.search(r"# 여행 정보: (.+?) → (.+?), (\S+) ~ (\S+)", prompt)
+        if request or not header:
+            trip = extract_trip(request.group(1) if request else prompt)
+        else:
+            trip = dict(zip(("origin", "destination", "start", "end"), header.groups()))
+        calls = plan_tool_calls(trip, tool_names)
+        if len(observations) < len(calls):
+            name, args = calls[len(observations)]
+            return (
+                f"Thought: {name}로 필요한 정보를 조회합니다.\n"
+                f"Action: {name}\n"
+                f"Action Input: {json.dumps(args, ensure_ascii=False)}"
+            )
+
+        # 조회 도구가 없는 에이전트(코디네이터)는 앞 단계 결과(context)를 그대로 모으고 예산표를 덧붙여 정리
+        sections = [f"## {name}\n{observation}" for (name, _), observation in zip(calls, observations)]
+        if all(name == "예산 계산 도구" for name, _ in calls) and "This is the context you're working with:" in prompt:
+            context = prompt.split("This is the context you're working with:", 1)[1].split("\n\nBegin!", 1)[0]
+            sections.insert(0, context.strip())
+        return (
+            "Thought: I now know the final answer\n"
+            f"Final Answer: # 여행 정보: {trip['origin']} → {trip['destination']}, {trip['start']} ~ {trip['end']}\n\n"
+            + ("\n\n".join(sections) if sections else "앞 단계의 결과를 바탕으로 일정을 정리했습니다.")
+        )
+
+    def supports_function_calling(self):
+        return False
+
+    def get_context_window_size(self):
+        return 128000
+
+
+# agents 모듈의 모든 에이전트 LLM 을 FakeLLM 으로 바꾸고, 원래대로 되돌리는 함수를 반환
+# 이미 만들어 둔 Crew 원본도 비워서 다음 crew() 호출 때 바뀐 에이전트로 다시 구성합니다.
+def install_fake_llm(latency=0.0):
+    from crewai import Agent
+
+    import agents
+    import crew
+
+    originals = {}
+    for agent in agents.get_agents().values():
+        if isinstance(agent, Agent) and id(agent) not in originals:
+            originals[id(agent)] = (agent, agent.llm)
+            agent.llm = FakeLLM(latency=latency)
+    crew._crew_templates.clear()
+
+    def restore():
+        for agent, llm in originals.values():
+            agent.llm = llm
+        crew._crew_templates.clear()
+
+    return restore
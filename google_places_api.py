@@ -1,10 +1,18 @@
-import requests
 import os
-from dotenv import load_dotenv
+from config import load_config
 
-load_dotenv()
+from http_client import http_get
+from concurrency import map_bounded
+
+load_config()
+
+# Place Details 에서 조회하는 기본 필드 (필드 수만큼 과금되므로 필요한 것만 지정)
+PLACE_DETAIL_FIELDS = ["name", "rating", "formatted_address", "formatted_phone_number", "opening_hours", "website", "reviews"]
 
 class NearbyPlacesTool:
+    def __init__(self, max_workers=5, detail_fields=None):
+        self.max_workers = max_workers  # 동시에 진행할 세부 정보 조회 요청 수
+        self.detail_fields = detail_fields or list(PLACE_DETAIL_FIELDS)
 
     # 장소명으로 위치(위도·경도) 얻기
     def get_location_by_name(self, place_name):
@@ -14,7 +22,7 @@ class NearbyPlacesTool:
             "language": "ko",
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
+        response = http_get(url, params=params).json()
 
         if response["status"] != "OK":
             raise Exception(f"장소 검색 실패: {response['status']}")
@@ -32,7 +40,7 @@ class NearbyPlacesTool:
             "language": "ko",
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
+        response = http_get(url, params=params).json()
 
         if response["status"] != "OK":
             raise Exception(f"근처 맛집 검색 실패: {response['status']}")
@@ -47,21 +55,29 @@ class NearbyPlacesTool:
         return restaurants
 
     # 맛집 세부정보 얻기 함수
-    def get_place_details(self, place_id):
+    def get_place_details(self, place_id, fields=None):
         url = "https://maps.googleapis.com/maps/api/place/details/json"
         params = {
             "place_id": place_id,
             "language": "ko",
-            "fields": "name,rating,formatted_address,formatted_phone_number,opening_hours,website,reviews",
+            "fields": ",".join(fields or self.detail_fields),
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
+        response = http_get(url, params=params).json()
 
         if response["status"] != "OK":
             raise Exception(f"세부 정보 조회 실패: {response['status']}")
 
         return response["result"]
 
+    # 여러 장소의 세부 정보를 병렬로 조회 (place_ids 순서 유지, 실패한 장소는 None)
+    def get_places_details(self, place_ids, fields=None):
+        return map_bounded(
+            lambda place_id: self.get_place_details(place_id, fields),
+            place_ids,
+            max_workers=self.max_workers
+        )
+
 
 if __name__ == "__main__":
 
@@ -73,17 +89,26 @@ if __name__ == "__main__":
 
     restaurants = nearby_places_tool.find_nearby_restaurants(lat, lng)
 
+    # 이름/평점은 근처 검색 결과에 이미 있으므로 나머지 필드만 세부 정보로 조회
+    details_list = nearby_places_tool.get_places_details(
+        [restaurant["place_id"] for restaurant in restaurants],
+        fields=["formatted_address", "formatted_phone_number", "opening_hours", "website", "reviews"]
+    )
+
     print("\n🍽️ 근처 맛집 목록:")
-    for idx, restaurant in enumerate(restaurants, 1):
+    for idx, (restaurant, details) in enumerate(zip(restaurants, details_list), 1):
         print(f"{idx}. {restaurant['이름']} (평점: {restaurant['평점']}) - 주소: {restaurant['주소']}")
+        if not details:
+            print("\n\t세부 정보를 가져오지 못했습니다.")
+            print("\n------------------------------------------------------------\n")
+            continue
 
-        details = nearby_places_tool.get_place_details(restaurant["place_id"])
-        print(f"\n\t📋 '{details['name']}' 세부 정보:")
+        print(f"\n\t📋 '{restaurant['이름']}' 세부 정보:")
         print(f"\t주소: {details.get('formatted_address', '정보 없음')}")
         print(f"\t전화번호: {details.get('formatted_phone_number', '정보 없음')}")
         print(f"\t웹사이트: {details.get('website', '정보 없음')}")
         print(f"\t영업시간: {details.get('opening_hours', {}).get('weekday_text', '정보 없음')}")
-        print(f"\t평점: {details.get('rating', '정보 없음')}")
+        print(f"\t평점: {restaurant['평점']}")
 
         # 리뷰 (옵션)
         reviews = details.get('reviews', [])
@@ -0,0 +1,129 @@
+import math
+import os
+import threading
+
+from locations import haversine_km
+from response_cache import get_response_cache
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# by-city 결과 1건의 거리(km)
+# 기준 좌표가 있으면 geoCode 로 직접 계산하고, 없으면 응답의 distance(도시 중심 기준)를 사용
+def hotel_distance_km(hotel, lat=None, lon=None):
+    geo = hotel.get("geoCode") or {}
+    if lat is not None and lon is not None and "latitude" in geo and "longitude" in geo:
+        return haversine_km(lat, lon, geo["latitude"], geo["longitude"])
+
+    distance = hotel.get("distance") or {}
+    if distance.get("value") is None:
+        return None
+    value = float(distance["value"])
+    return value * 1.609344 if distance.get("unit") == "MILE" else value
+
+
+# by-city 호텔 목록을 오퍼 조회 전에 로컬에서 거르고 정렬
+# - chain_codes / min_rating / max_distance_km 조건에 맞지 않는 호텔 제외 (성급 정보가 없는 호텔은 min_rating 지정 시 제외)
+# - 가까운 순, 거리가 같으면 성급이 높은 순 (거리 정보가 없으면 뒤로)
+def rank_hotels(hotels, lat=None, lon=None, max_distance_km=None, min_rating=None, chain_codes=None):
+    chain_codes = {code.upper() for code in chain_codes} if chain_codes else None
+
+    ranked = []
+    for position, hotel in enumerate(hotels):
+        if chain_codes and (hotel.get("chainCode") or "").upper() not in chain_codes:
+            continue
+
+        rating = _to_int(hotel.get("rating"))
+        if min_rating and (rating is None or rating < min_rating):
+            continue
+
+        distance = hotel_distance_km(hotel, lat, lon)
+        if max_distance_km is not None and distance is not None and distance > max_distance_km:
+            continue
+
+        ranked.append((math.inf if distance is None else distance, -(rating or 0), position, hotel))
+
+    ranked.sort(key=lambda item: item[:3])
+    return [hotel for *_, hotel in ranked]
+
+
+# 오퍼가 반복해서 없는 호텔을 기억해 두었다가 다음 검색에서 건너뜀
+# 호텔별 연속 "오퍼 없음" 횟수를 응답 캐시("hotel_no_offers" 네임스페이스)에 저장하므로
+# sqlite 백엔드를 쓰면 프로세스 간에도 공유되고, TTL 이 지나면 다시 조회 대상이 됩니다.
+class NoOfferTracker:
+    def __init__(self, cache, threshold=2):
+        self.cache = cache
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stats = {"skipped": 0, "no_offers": 0, "offers": 0}
+
+    def _params(self, hotel_id):
+        return {"hotel_id": hotel_id}
+
+    def misses(self, hotel_id):
+        return self.cache.get("hotel_no_offers", self._params(hotel_id), 0) or 0
+
+    # 건너뛸 호텔을 제외하고 앞에서부터 limit 개 (순위가 낮은 호텔은 기록을 확인하지 않음)
+    def filter(self, hotel_ids, limit=None):
+        if self.threshold <= 0:
+            return list(hotel_ids)[:limit]
+
+        kept = []
+        skipped = 0
+        for hotel_id in hotel_ids:
+            if limit is not None and len(kept) >= limit:
+                break
+            if self.misses(hotel_id) >= self.threshold:
+                skipped += 1
+            else:
+                kept.append(hotel_id)
+
+        with self._lock:
+            self._stats["skipped"] += skipped
+        return kept
+
+    async def afilter(self, hotel_ids, limit=None):
+        return await self.run_async(self.filter, hotel_ids, limit)
+
+    def record(self, hotel_id, has_offer):
+        misses = self.misses(hotel_id)
+        if has_offer:
+            if misses:
+                self.cache.set("hotel_no_offers", self._params(hotel_id), 0)
+        else:
+            self.cache.set("hotel_no_offers", self._params(hotel_id), misses + 1)
+
+        with self._lock:
+            self._stats["offers" if has_offer else "no_offers"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # 기록을 읽고 쓰는 동기 함수(filter, record 나 오퍼 응답 해석)를 이벤트 루프를 막지 않게 실행
+    async def run_async(self, func, *args, **kwargs):
+        return await self.cache.run_async(func, *args, **kwargs)
+
+
+_no_offer_tracker = None
+_no_offer_tracker_lock = threading.Lock()
+
+
+# 프로세스 공용 오퍼 없음 기록
+# - HOTEL_NO_OFFER_THRESHOLD: 연속으로 이 횟수만큼 오퍼가 없으면 건너뜀 (기본 2, 0 이면 사용 안 함)
+# - 기록 유지 시간은 TOOL_CACHE_TTL_HOTEL_NO_OFFERS (기본 1일)
+def get_no_offer_tracker():
+    global _no_offer_tracker
+    if _no_offer_tracker is None:
+        with _no_offer_tracker_lock:
+            if _no_offer_tracker is None:
+                _no_offer_tracker = NoOfferTracker(
+                    get_response_cache(),
+                    threshold=int(os.getenv("HOTEL_NO_OFFER_THRESHOLD", 2))
+                )
+    return _no_offer_tracker
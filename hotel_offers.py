@@ -0,0 +1,116 @@
+from amadeus_auth import get_amadeus_token
+from concurrency import chunked, map_bounded
+from hotel_filter import get_no_offer_tracker
+from http_client import http_get
+
+HOTELS_BY_CITY_URL = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
+HOTEL_OFFERS_URL = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
+
+
+# Amadeus 호텔 API 요청 만들기/응답 해석과 오퍼 병렬 조회
+# 에이전트 도구(tools.HotelSearchTool)와 예제(amadeus_hotel_api)가 함께 쓰며, crewai 를 불러오지 않습니다.
+
+def hotels_by_city_request(city_code, min_rating=None, chain_codes=None, amenities=None):
+    params = {"cityCode": city_code}
+    if min_rating:
+        params["ratings"] = ",".join(str(rating) for rating in range(min_rating, 6))
+    if chain_codes:
+        params["chainCodes"] = ",".join(chain_codes)
+    if amenities:
+        params["amenities"] = ",".join(amenities)
+    return HOTELS_BY_CITY_URL, params
+
+
+def hotel_offers_request(hotel_ids, check_in_date, check_out_date, adults=1):
+    return HOTEL_OFFERS_URL, {
+        "hotelIds": ",".join(hotel_ids),
+        "checkInDate": check_in_date,
+        "checkOutDate": check_out_date,
+        "adults": adults
+    }
+
+
+def parse_hotels_by_city(response):
+    return response.json().get("data", []) if response.status_code == 200 else []
+
+
+def parse_hotel_offer(hotel_id, response):
+    # 빈 결과(200)와 객실 없음/판매 불가(400)는 "오퍼 없음"으로 기록하고, 그 밖의 오류는 기록하지 않음
+    if response.status_code == 400:
+        get_no_offer_tracker().record(hotel_id, False)
+    if response.status_code != 200:
+        return None
+
+    data = response.json()
+    offer = data["data"][0] if data.get("data") else None
+    get_no_offer_tracker().record(hotel_id, offer is not None)
+    return offer
+
+
+def parse_hotel_offers_batch(hotel_ids, response):
+    if response.status_code != 200:
+        return {}
+
+    offers = {offer["hotel"]["hotelId"]: offer for offer in response.json().get("data", [])}
+    for hotel_id in hotel_ids:
+        get_no_offer_tracker().record(hotel_id, hotel_id in offers)
+    return offers
+
+
+def search_hotels_by_city(city_code, min_rating=None, chain_codes=None, amenities=None, token=None):
+    url, params = hotels_by_city_request(city_code, min_rating, chain_codes, amenities)
+    response = http_get(url, headers={"Authorization": f"Bearer {token or get_amadeus_token()}"}, params=params)
+    return parse_hotels_by_city(response)
+
+
+def search_hotel_offers(hotel_id, check_in_date, check_out_date, adults=1, timeout=None, token=None):
+    url, params = hotel_offers_request([hotel_id], check_in_date, check_out_date, adults)
+    response = http_get(url, headers={"Authorization": f"Bearer {token or get_amadeus_token()}"}, params=params,
+                        timeout=timeout)
+    return parse_hotel_offer(hotel_id, response)
+
+
+# 여러 호텔의 오퍼를 한 번의 요청으로 조회 (hotelId -> 오퍼)
+def search_hotel_offers_batch(hotel_ids, check_in_date, check_out_date, adults=1, timeout=None, token=None):
+    url, params = hotel_offers_request(hotel_ids, check_in_date, check_out_date, adults)
+    response = http_get(url, headers={"Authorization": f"Bearer {token or get_amadeus_token()}"}, params=params,
+                        timeout=timeout)
+    return parse_hotel_offers_batch(hotel_ids, response)
+
+
+# 묶음 조회 결과를 hotel_ids 순서의 목록으로 (max_results 를 넘는 오퍼는 None)
+def merge_batches(hotel_ids, batches, max_results=None):
+    offers_by_id = {}
+    for batch in batches:
+        offers_by_id.update(batch or {})
+
+    hotel_offers = [offers_by_id.get(hotel_id) for hotel_id in hotel_ids]
+    if max_results is not None:
+        priced = [idx for idx, offer in enumerate(hotel_offers) if offer][max_results:]
+        for idx in priced:
+            hotel_offers[idx] = None
+    return hotel_offers
+
+
+# 호텔 목록의 오퍼를 병렬로 조회하여 hotel_ids 순서대로 반환 (오퍼가 없으면 None)
+# - batch_size 가 1 이상이면 hotelIds 를 batch_size 개씩 묶어 한 번에 조회
+# - max_results: 가격이 확인된 호텔이 (hotel_ids 순서로) 이만큼 모이면 나머지 조회 중단
+# - search_offer / search_batch: 한 건/묶음 조회 함수 (기본은 이 모듈의 함수, 도구는 자신의 메서드를 넘김)
+def fetch_hotel_offers(hotel_ids, check_in_date, check_out_date, adults=1, max_workers=5, offer_timeout=10.0,
+                       batch_size=0, max_results=None, search_offer=None, search_batch=None):
+    if batch_size > 0:
+        search_batch = search_batch or search_hotel_offers_batch
+        batches = map_bounded(
+            lambda ids: search_batch(ids, check_in_date, check_out_date, adults, offer_timeout),
+            chunked(hotel_ids, batch_size),
+            max_workers=max_workers
+        )
+        return merge_batches(hotel_ids, batches, max_results)
+
+    search_offer = search_offer or search_hotel_offers
+    return map_bounded(
+        lambda hotel_id: search_offer(hotel_id, check_in_date, check_out_date, adults, offer_timeout),
+        hotel_ids,
+        max_workers=max_workers,
+        limit=max_results
+    )
@@ -0,0 +1,208 @@
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import get_rate_limiter
+from replay import cassette_from_env
+from tracing import current_span, span
+
+# 재시도 대상 HTTP 상태 코드 (요청 한도 초과, 일시적인 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# 모든 API 도구가 함께 쓰는 HTTP 전송 계층
+# - 업스트림 호스트마다 keep-alive 커넥션 풀을 가진 requests.Session 을 하나씩 둡니다.
+# - pool_size 는 호스트당 동시 커넥션 수 상한입니다(초과 요청은 빈 커넥션을 기다림).
+# - 429/5xx 와 연결 오류는 지수 백오프 + 지터로 재시도하고, Retry-After 헤더가 있으면 따릅니다.
+# - upstream_override 를 지정하면 모든 요청의 scheme://host 를 그 주소(스텁 서버 등)로 바꿔 보냅니다.
+# - cassette(replay.Cassette)를 지정하면 응답을 녹화하거나, 네트워크 없이 녹화된 응답을 재생합니다.
+# - 보내는 요청마다(재시도 포함) rate_limiter 의 업스트림 한도를 기다렸다가 보내고, 429 를 받으면 해당 버킷을 잠시 막습니다.
+class HttpClient:
+    def __init__(self, pool_size=None, max_retries=None, connect_timeout=None, read_timeout=None,
+                 backoff_base=None, backoff_max=None, upstream_override=None, cassette=None, rate_limiter=None):
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES", 3))
+        self.connect_timeout = connect_timeout or float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+        self.read_timeout = read_timeout or float(os.getenv("HTTP_READ_TIMEOUT", 30))
+        self.backoff_base = backoff_base or float(os.getenv("HTTP_BACKOFF_BASE", 0.5))
+        self.backoff_max = backoff_max or float(os.getenv("HTTP_BACKOFF_MAX", 30))
+        self.upstream_override = (upstream_override or os.getenv("HTTP_UPSTREAM_OVERRIDE") or "").rstrip("/") or None
+        self.cassette = cassette
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "errors": 0}
+
+    # 호스트별 세션 반환 (없으면 생성)
+    def session_for(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size,
+                                          pool_block=True, max_retries=0)
+                    session.mount(f"{host}/", adapter)
+                    self._sessions[host] = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        with span("http", _span_name(method, url)) as http_span:
+            if self.cassette is not None and self.cassette.mode == "replay":
+                self._count("requests")
+                response = self.cassette.replay(method, url, kwargs)
+                http_span.set(replayed=True)
+            else:
+                target_url = url
+                if self.upstream_override:
+                    parts = urlsplit(url)
+                    target_url = self.upstream_override + url[len(f"{parts.scheme}://{parts.netloc}"):]
+
+                # 한도 버킷은 바꾸기 전 원래 업스트림 주소로 고름
+                buckets = self.rate_limiter.buckets_for(url)
+                response = self._request_with_retries(method, target_url, buckets, **kwargs)
+                if self.cassette is not None:
+                    self.cassette.record(method, url, kwargs, response)
+
+            http_span.set(status=response.status_code, response_bytes=len(response.content))
+            if response.status_code >= 400:
+                http_span.fail(f"HTTP {response.status_code}")
+            return response
+
+    def _request_with_retries(self, method, url, buckets, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (self.connect_timeout, self.read_timeout)
+
+        session = self.session_for(url)
+        attempt = 0
+        while True:
+            if buckets:
+                waited = self.rate_limiter.acquire(buckets)
+                if waited:
+                    current_span().add("rate_limit_wait_ms", waited * 1000)
+
+            self._count("requests")
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._count("errors")
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if response.status_code == 429 and buckets:
+                    # 다른 스레드/워커도 같은 시간 동안 이 업스트림에 보내지 않도록 버킷을 비움
+                    self.rate_limiter.block(buckets, delay)
+                    delay = 0
+                response.close()
+
+            attempt += 1
+            self._count("retries")
+            current_span().add("retries")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    # 요청/재시도 횟수와 커넥션 재사용률
+    def stats(self):
+        connections = 0
+        pooled_requests = 0
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for _, session in sessions:
+            for adapter in session.adapters.values():
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+                        pooled_requests += pool.num_requests
+
+        with self._lock:
+            stats = dict(self._counters)
+        stats["connections"] = connections
+        stats["reuse_rate"] = 1 - connections / pooled_requests if pooled_requests else 0.0
+        stats["hosts"] = [host for host, _ in sessions]
+        return stats
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    # 0, 1, 2... 번째 재시도 대기시간: base * 2^attempt 범위 안의 무작위 값 (full jitter)
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    # Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return min(self.backoff_max, max(0.0, retry_at.timestamp() - time.time()))
+
+
+# 트레이스 구간 이름: 메서드 + 호스트 + 경로 (경로에 든 ExchangeRate-API 키는 가림)
+def _span_name(method, url):
+    parts = urlsplit(url)
+    return f"{method} {parts.netloc}{re.sub(r'^/v6/[^/]+/', '/v6/{key}/', parts.path)}"
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+# 프로세스 공용 HTTP 클라이언트
+# - HTTP_UPSTREAM_OVERRIDE: 모든 요청을 보낼 주소 (예: 스텁 서버 http://127.0.0.1:8765)
+# - HTTP_CASSETTE / HTTP_CASSETTE_MODE: 응답 녹화/재생 (replay.cassette_from_env 참고)
+def get_http_client():
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient(cassette=cassette_from_env())
+    return _http_client
+
+
+def http_get(url, **kwargs):
+    return get_http_client().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return get_http_client().post(url, **kwargs)
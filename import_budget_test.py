@@ -0,0 +1,11 @@
+from import_profile import DEFAULT_BUDGET_MS, LIGHT_TARGETS, find_violations, profile_import, summarize
+
+# 시작 시간 확인: 진입점과 가벼운 모듈이 import 예산(IMPORT_BUDGET_MS)을 넘거나 crewai 등 무거운 패키지를 불러오면 실패
+summaries = [summarize(module, profile_import(module)) for module in LIGHT_TARGETS]
+violations = find_violations(summaries, DEFAULT_BUDGET_MS)
+
+if violations:
+    raise ValueError("import 예산을 넘었습니다.\n" + "\n".join(violations))
+else:
+    print("Light modules import within budget without heavy packages: "
+          + ", ".join(f"{summary['module']} {summary['total_ms']}ms" for summary in summaries))
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# 시작 시간 측정 대상과 각 대상이 불러오면 안 되는 무거운 패키지
+# main/app 은 진입점이라 crewai 를 실제로 쓰기 전까지 미루고, 나머지는 crewai 와 무관한 모듈입니다.
+HEAVY_PACKAGES = ("crewai", "langchain_openai", "litellm")
+LIGHT_TARGETS = ["main", "app", "crew", "batch", "jobs", "http_client", "result_cache", "response_cache", "config"]
+
+# 모듈당 허용하는 import 시간(ms): 지금은 가장 느린 http_client 가 약 200ms
+# app 은 streamlit(pandas 포함) 자체가 약 2초 걸리므로 따로 잡고, 검사는 crewai 를 불러오지 않는지에 둡니다.
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 500))
+TARGET_BUDGETS_MS = {"app": float(os.getenv("IMPORT_BUDGET_APP_MS", 4000))}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+# 새 파이썬 프로세스에서 module 을 불러오며 -X importtime 출력을 모음
+# 반환값: [{"module", "self_ms", "cumulative_ms", "depth"}, ...] (불러온 순서)
+def profile_import(module):
+    env = dict(os.environ, OTEL_SDK_DISABLED="true")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if completed.returncode != 0:
+        raise Exception(f"{module} 을(를) 불러오지 못했습니다.", completed.stderr.strip().splitlines()[-1:])
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append({
+                "module": match.group(4),
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+                "depth": len(match.group(3)) // 2,
+            })
+    return entries
+
+
+# 대상 하나의 요약: 전체 import 시간, 가장 오래 걸린 최상위 패키지, 불러온 무거운 패키지
+def summarize(module, entries, top=5):
+    # importtime 은 하위 모듈을 먼저 출력하므로, 대상 줄 바로 앞의 더 깊은 줄들이 대상이 불러온 모듈
+    # (인터프리터 시작 때 불러온 site 등은 제외)
+    own = next((index for index in range(len(entries) - 1, -1, -1) if entries[index]["module"] == module), None)
+    if own is None:
+        return {"module": module, "total_ms": 0, "heaviest": [], "heavy_packages": []}
+    start = own
+    while start > 0 and entries[start - 1]["depth"] > entries[own]["depth"]:
+        start -= 1
+    total_ms = entries[own]["cumulative_ms"]
+    entries = entries[start:own]
+
+    packages = {}
+    for entry in entries:
+        name = entry["module"]
+        if "." not in name and name != module:
+            packages[name] = max(packages.get(name, 0), entry["cumulative_ms"])
+
+    return {
+        "module": module,
+        "total_ms": round(total_ms, 1),
+        "heaviest": [{"package": name, "ms": round(ms, 1)}
+                     for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]],
+        "heavy_packages": sorted({entry["module"].split(".")[0] for entry in entries} & set(HEAVY_PACKAGES)),
+    }
+
+
+# 예산(ms)을 넘었거나 무거운 패키지를 불러온 대상 목록 (budget_ms 가 0 이면 시간은 검사하지 않음)
+def find_violations(summaries, budget_ms=DEFAULT_BUDGET_MS):
+    violations = []
+    for summary in summaries:
+        if summary["heavy_packages"]:
+            violations.append(f"{summary['module']}: {', '.join(summary['heavy_packages'])} 을(를) 불러옴")
+        limit = TARGET_BUDGETS_MS.get(summary["module"], budget_ms) if budget_ms else 0
+        if limit and summary["total_ms"] > limit:
+            violations.append(f"{summary['module']}: {summary['total_ms']}ms > 예산 {limit}ms")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 측정 (python -X importtime)")
+    parser.add_argument("modules", nargs="*", help=f"측정할 모듈 (기본: {' '.join(LIGHT_TARGETS)})")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"모듈당 허용하는 import 시간 (기본 {DEFAULT_BUDGET_MS:g}, 0 이면 검사하지 않음)")
+    parser.add_argument("--top", type=int, default=5, help="모듈마다 보여 줄 무거운 패키지 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    summaries = [summarize(module, profile_import(module), top=args.top) for module in args.modules or LIGHT_TARGETS]
+    violations = find_violations(summaries, args.budget_ms)
+
+    if args.json:
+        print(json.dumps({"modules": summaries, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        for summary in summaries:
+            heaviest = ", ".join(f"{item['package']} {item['ms']}ms" for item in summary["heaviest"])
+            print(f"{summary['module']:<16} {summary['total_ms']:>8.1f}ms  {heaviest}")
+        for violation in violations:
+            print(f"위반: {violation}", file=sys.stderr)
+
+    sys.exit(1 if violations else 0)
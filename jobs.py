@@ -0,0 +1,448 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+
+if __name__ == "__main__" and "--offline" in sys.argv:
+    # crewai 를 불러오기 전에 설정해야 원격 텔레메트리 전송이 꺼짐
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from result_cache import normalize_content
+
+# 작업 상태: queued -> running -> done / failed / timeout (queued 에서 cancelled 로 끝날 수도 있음)
+# timeout 으로 끝난 작업의 kickoff 스레드는 멈출 수 없으므로, 스레드가 실제로 끝날 때까지 orphaned=1 로 표시하고
+# 실행 중인 작업과 함께 동시 실행 상한(max_running)에 셉니다.
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed", "timeout", "cancelled")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# 일정 생성 작업 큐 (로컬 SQLite 파일)
+# 같은 파일을 쓰는 웹 프로세스와 워커 프로세스들이 함께 쓰며, 작업 진행 이벤트(단계/태스크 완료)도 함께 저장합니다.
+# - 중복 제거: 같은 날 같은 요청(정규화한 내용 + 모드 + 새로 생성 여부)이 대기/실행 중이면 새 작업을 만들지 않고 그 작업 id 를 돌려줌
+# - max_running: 모든 워커를 통틀어 동시에 실행할 작업 수 상한
+# - max_queued: 대기 중인 작업이 이만큼 쌓이면 새 요청을 JobQueueFull 로 거절 (0 이면 제한 없음)
+class JobStore:
+    def __init__(self, path, max_running=4, max_queued=0):
+        self.path = path
+        self.max_running = max_running
+        self.max_queued = max_queued
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, dedupe_key TEXT NOT NULL, content TEXT NOT NULL, "
+                "parallel INTEGER NOT NULL, force_refresh INTEGER NOT NULL, status TEXT NOT NULL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL, worker TEXT, "
+                "cached INTEGER, result TEXT, error TEXT, orphaned INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "orphaned" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN orphaned INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "job_id TEXT NOT NULL, seq INTEGER NOT NULL, kind TEXT NOT NULL, source TEXT, text TEXT, "
+                "elapsed REAL, PRIMARY KEY (job_id, seq))"
+            )
+
+    # 읽기-판단-쓰기를 한 번에 처리하도록 쓰기 잠금(BEGIN IMMEDIATE)을 잡은 트랜잭션
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # 조회 전용 연결: 지연(DEFERRED) 트랜잭션이라 쓰기 잠금을 잡지 않고, WAL 이므로 쓰는 쪽과 서로 기다리지 않음
+    @contextmanager
+    def _read(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.close()
+
+    # force_refresh 요청이 캐시를 쓰는 작업에 합쳐지면 새로 만든 일정을 받지 못하므로 키에 포함
+    @staticmethod
+    def dedupe_key(content, parallel=False, force_refresh=False):
+        mode = f"{int(bool(parallel))}|{int(bool(force_refresh))}"
+        return f"{date.today().isoformat()}|{mode}|{normalize_content(content)}"
+
+    # 작업 등록: (작업 id, 진행 중인 같은 요청의 작업을 재사용했는지)
+    def submit(self, content, parallel=False, force_refresh=False):
+        key = self.dedupe_key(content, parallel, force_refresh)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key, *ACTIVE_STATUSES)
+            ).fetchone()
+            if row:
+                return row["id"], True
+
+            if self.max_queued:
+                queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+                if queued >= self.max_queued:
+                    raise JobQueueFull(f"대기 중인 작업이 너무 많습니다({queued}건). 잠시 후 다시 시도해 주세요.")
+
+            job_id = uuid.uuid4().hex[:12]
+            conn.execute(
+                "INSERT INTO jobs (id, dedupe_key, content, parallel, force_refresh, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, key, content, int(bool(parallel)), int(bool(force_refresh)), time.time())
+            )
+            return job_id, False
+
+    # 가장 오래 기다린 작업 하나를 실행 상태로 바꿔 반환 (동시 실행 상한에 걸렸거나 대기 작업이 없으면 None)
+    # 시간 초과 뒤에도 아직 돌고 있는 kickoff(orphaned)도 실행 중으로 셉니다.
+    def claim(self, worker):
+        # 대기 작업이 없으면 쓰기 잠금 없이 바로 돌아감 (워커들이 poll_interval 마다 부름)
+        with self._read() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+                return None
+
+        with self._connect() as conn:
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running' OR orphaned = 1"
+            ).fetchone()[0]
+            if running >= self.max_running:
+                return None
+
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker = ? WHERE id = ?",
+                (time.time(), worker, row["id"])
+            )
+            return {**dict(row), "status": "running", "worker": worker}
+
+    def add_event(self, job_id, kind, source="", text="", elapsed=0.0):
+        with self._connect() as conn:
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO job_events (job_id, seq, kind, source, text, elapsed) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, seq, kind, source, text, elapsed)
+            )
+
+    # 실행 중인 작업만 끝냄 (이미 시간 초과로 정리된 작업에 늦게 도착한 결과는 무시)
+    # orphaned: kickoff 스레드가 아직 돌고 있어 release 할 때까지 실행 자리를 계속 차지함
+    def finish(self, job_id, status, result=None, error=None, cached=False, orphaned=False):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, cached = ?, orphaned = ? "
+                "WHERE id = ? AND status = 'running'",
+                (status, time.time(), result, error, int(cached), int(orphaned), job_id)
+            )
+
+    # 시간 초과된 작업의 kickoff 스레드가 끝나 실행 자리를 돌려줌
+    def release(self, job_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET orphaned = 0 WHERE id = ?", (job_id,))
+
+    # 대기 중인 작업 취소 (이미 실행 중이면 False)
+    def cancel(self, job_id):
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            ).rowcount
+        return updated > 0
+
+    # 워커가 죽어 끝나지 않은 작업 정리: max_seconds 보다 오래 실행 중인 작업을 timeout 으로 바꿈
+    # 워커 프로세스가 죽어 release 하지 못한 orphaned 표시도 orphan_seconds(기본 max_seconds 의 3배)가 지나면 풀어 줌
+    def expire(self, max_seconds, orphan_seconds=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET orphaned = 0 WHERE orphaned = 1 AND started_at < ?",
+                (now - (orphan_seconds or max_seconds * 3),)
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = 'timeout', finished_at = ?, error = ? "
+                "WHERE status = 'running' AND started_at < ?",
+                (now, f"작업이 {max_seconds:.0f}초 안에 끝나지 않았습니다.", now - max_seconds)
+            ).rowcount
+
+    def get(self, job_id):
+        with self._read() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    # after_seq 이후의 진행 이벤트 목록
+    def events(self, job_id, after_seq=0):
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT seq, kind, source, text, elapsed FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after_seq)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # 대기 작업 수 기준 대략적인 순번 (대기 중이 아니면 0)
+    def position(self, job_id):
+        with self._read() as conn:
+            row = conn.execute("SELECT status, created_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row["status"] != "queued":
+                return 0
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= ?", (row["created_at"],)
+            ).fetchone()[0]
+
+    # 상태별 작업 수
+    def stats(self):
+        with self._read() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # finished 상태로 older_than 초보다 오래된 작업과 이벤트 삭제
+    def purge(self, older_than=7 * 24 * 60 * 60):
+        cutoff = time.time() - older_than
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM job_events WHERE job_id IN "
+                f"(SELECT id FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))}) AND finished_at < ?)",
+                (*FINISHED_STATUSES, cutoff)
+            )
+            return conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))}) AND finished_at < ?",
+                (*FINISHED_STATUSES, cutoff)
+            ).rowcount
+
+
+# 큐에서 작업을 꺼내 TravelCoordinatorCrew 로 실행하는 워커 스레드 묶음
+# - workers: 이 풀이 동시에 실행하는 작업 수 (전체 상한은 JobStore.max_running)
+# - job_timeout: 작업 1건의 최대 실행 시간(초). 넘으면 바로 timeout 으로 기록하지만, 멈출 수 없는 kickoff 가
+#   실제로 끝날 때까지는 그 워커가 새 작업을 받지 않고 실행 자리도 계속 차지합니다.
+# - token_flush_interval: LLM 출력 조각을 에이전트별로 모아 이 간격(초)마다 token 이벤트 하나로 기록
+# - expire_interval: 죽은 워커가 남긴 작업 정리(expire)를 이 간격(초)마다 풀에서 한 번만 실행
+# 웹 프로세스 안에서 돌리거나(start), 별도 프로세스로 `python jobs.py worker` 를 여러 개 띄워 같은 큐를 나눠 처리합니다.
+class JobWorkerPool:
+    def __init__(self, store, workers=2, job_timeout=600, poll_interval=0.5, token_flush_interval=0.2,
+                 expire_interval=30.0):
+        self.store = store
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self.token_flush_interval = token_flush_interval
+        self.expire_interval = expire_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._expire_lock = threading.Lock()
+        self._next_expire = 0.0
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._loop, args=(f"{self.name}:{index}",), name=f"job-worker-{index}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _loop(self, worker):
+        while not self._stop.is_set():
+            self._expire_due()
+            job = self.store.claim(worker)
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                self.run_job(job)
+            except Exception as e:
+                self.store.finish(job["id"], "failed", error=f"{type(e).__name__}: {e}")
+
+    # 다른 워커 프로세스가 죽으면서 남긴 작업 정리 (실행 제한 시간 + 여유 1분)
+    # 쓰기 잠금을 잡으므로 폴링마다 하지 않고 expire_interval 마다 한 스레드만 실행
+    def _expire_due(self):
+        now = time.monotonic()
+        with self._expire_lock:
+            if now < self._next_expire:
+                return
+            self._next_expire = now + self.expire_interval
+        self.store.expire(self.job_timeout + 60)
+
+    # 작업 1건 실행: 오늘 만든 같은 일정이 있으면 그대로 쓰고, 없으면 crew 를 실행하며 진행 이벤트를 기록
+    def run_job(self, job):
+        from crew import TravelCoordinatorCrew
+        from result_cache import get_itinerary_cache
+        from streaming import stream_kickoff
+
+        itinerary_cache = get_itinerary_cache()
+        if not job["force_refresh"]:
+            cached = itinerary_cache.get(job["content"])
+            if cached:
+                self.store.finish(job["id"], "done", result=cached["result"], cached=True)
+                return
+
+        crew = TravelCoordinatorCrew(parallel=bool(job["parallel"])).crew()
+        inputs = {"content": job["content"]}
+        kickoff_finished = threading.Event()
+        orphaned = False
+        tokens = {}  # 에이전트 -> [아직 기록하지 않은 조각, 첫 조각의 경과 시간]
+        flushed_at = {}
+
+        def flush_tokens(source=None):
+            for name in [source] if source is not None else list(tokens):
+                text, elapsed = tokens.pop(name)
+                self.store.add_event(job["id"], "token", name, "".join(text), round(elapsed, 2))
+                flushed_at[name] = time.monotonic()
+
+        for event in stream_kickoff(crew, inputs, stream_tokens=True, timeout=self.job_timeout,
+                                    on_exit=kickoff_finished.set):
+            if event.kind == "token":
+                tokens.setdefault(event.source, [[], event.elapsed])[0].append(event.text)
+                if time.monotonic() - flushed_at.get(event.source, 0) >= self.token_flush_interval:
+                    flush_tokens(event.source)
+                continue
+
+            # 단계/태스크/결과 이벤트보다 앞서 나온 조각이 먼저 기록되도록 남은 조각을 모두 기록
+            flush_tokens()
+            if event.kind in ("step", "task"):
+                self.store.add_event(job["id"], event.kind, event.source, event.text, round(event.elapsed, 2))
+            elif event.kind == "done":
+                entry = itinerary_cache.set(job["content"], event.result)
+                self.store.finish(job["id"], "done", result=entry["result"])
+            elif event.kind == "error":
+                timed_out = isinstance(event.error, TimeoutError)
+                orphaned = timed_out and not kickoff_finished.is_set()
+                self.store.finish(job["id"], "timeout" if timed_out else "failed",
+                                  error=f"{type(event.error).__name__}: {event.error}", orphaned=orphaned)
+
+        # 시간 초과된 kickoff 가 끝날 때까지 기다렸다가 실행 자리를 돌려줌 (풀을 멈추면 기다리지 않음)
+        if orphaned:
+            while not kickoff_finished.wait(self.poll_interval) and not self._stop.is_set():
+                pass
+            self.store.release(job["id"])
+
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+# 프로세스 공용 작업 큐
+# - JOBS_DB_PATH: sqlite 파일 경로 (기본 .jobs.sqlite3)
+# - JOBS_MAX_RUNNING: 모든 워커를 통틀어 동시에 실행할 작업 수 (기본 4)
+# - JOBS_MAX_QUEUED: 대기 작업 수 상한 (기본 0, 제한 없음)
+def get_job_store():
+    global _job_store
+    if _job_store is None:
+        with _job_store_lock:
+            if _job_store is None:
+                _job_store = JobStore(
+                    os.getenv("JOBS_DB_PATH", ".jobs.sqlite3"),
+                    max_running=int(os.getenv("JOBS_MAX_RUNNING", 4)),
+                    max_queued=int(os.getenv("JOBS_MAX_QUEUED", 0))
+                )
+    return _job_store
+
+
+# 환경변수로 워커 풀 생성
+# - JOBS_WORKERS: 풀의 워커 스레드 수 (기본 2)
+# - JOBS_TIMEOUT: 작업 1건의 최대 실행 시간(초, 기본 600)
+# - JOBS_EXPIRE_INTERVAL: 죽은 워커가 남긴 작업을 정리하는 간격(초, 기본 30)
+def job_pool_from_env(store=None):
+    return JobWorkerPool(
+        store or get_job_store(),
+        workers=int(os.getenv("JOBS_WORKERS", 2)),
+        job_timeout=float(os.getenv("JOBS_TIMEOUT", 600)),
+        expire_interval=float(os.getenv("JOBS_EXPIRE_INTERVAL", 30))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여행 일정 작업 큐 워커/관리 도구")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = commands.add_parser("worker", help="큐의 작업을 꺼내 실행 (Ctrl+C 로 종료)")
+    worker_parser.add_argument("--workers", type=int, help="워커 스레드 수 (기본 JOBS_WORKERS 또는 2)")
+    worker_parser.add_argument("--timeout", type=float, help="작업 1건의 최대 실행 시간(초)")
+    worker_parser.add_argument("--offline", action="store_true", help="API 키 없이 스텁 서버와 가짜 LLM 으로 실행")
+
+    submit_parser = commands.add_parser("submit", help="작업 등록")
+    submit_parser.add_argument("content")
+    submit_parser.add_argument("--parallel", action="store_true")
+    submit_parser.add_argument("--refresh", action="store_true")
+
+    status_parser = commands.add_parser("status", help="작업 상태 (id 를 생략하면 상태별 작업 수)")
+    status_parser.add_argument("job_id", nargs="?")
+
+    commands.add_parser("purge", help="끝난 지 7일이 지난 작업 삭제")
+    args = parser.parse_args()
+
+    store = get_job_store()
+    if args.command == "worker":
+        pool = job_pool_from_env(store)
+        pool.workers = args.workers or pool.workers
+        pool.job_timeout = args.timeout or pool.job_timeout
+
+        offline = None
+        if args.offline:
+            from replay import offline_environment
+            offline = offline_environment()
+            offline.__enter__()
+
+        pool.start()
+        print(f"워커 {pool.name} 시작: 스레드 {pool.workers}개, 작업 제한 시간 {pool.job_timeout:.0f}초", file=sys.stderr)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pool.stop()
+        finally:
+            if offline:
+                offline.__exit__(None, None, None)
+    elif args.command == "submit":
+        job_id, deduped = store.submit(args.content, parallel=args.parallel, force_refresh=args.refresh)
+        print(json.dumps({"job_id": job_id, "deduped": deduped}))
+    elif args.command == "status":
+        if args.job_id:
+            job = store.get(args.job_id)
+            if job:
+                job = {**job, "events": store.events(args.job_id)}
+                for name in ("created_at", "started_at", "finished_at"):
+                    if job[name]:
+                        job[name] = datetime.fromtimestamp(job[name]).isoformat(timespec="seconds")
+            print(json.dumps(job, ensure_ascii=False, indent=2))
+        else:
+            print(json.dumps(store.stats()))
+    elif args.command == "purge":
+        print(json.dumps({"deleted": store.purge()}))
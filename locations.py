@@ -0,0 +1,262 @@
+import difflib
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# 도시/공항 데이터 파일 (한글명, 영문명, IATA 코드, 별칭, 좌표)
+LOCATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locations.json")
+
+# 정확히 일치하는 이름이 없을 때 떼어 보고 다시 찾는 접미사
+NAME_SUFFIXES = ["특별자치시", "특별자치도", "특별시", "광역시", "국제공항", "공항", "시", "도", "현", "섬",
+                 "international airport", "airport", "city"]
+
+# 국가 코드 -> 현지 통화 코드
+COUNTRY_CURRENCIES = {
+    "KR": "KRW", "JP": "JPY", "CN": "CNY", "HK": "HKD", "MO": "MOP", "TW": "TWD", "MN": "MNT",
+    "TH": "THB", "VN": "VND", "PH": "PHP", "SG": "SGD", "MY": "MYR", "ID": "IDR", "KH": "KHR", "LA": "LAK",
+    "MM": "MMK", "IN": "INR", "NP": "NPR", "MV": "MVR", "LK": "LKR", "AE": "AED", "QA": "QAR", "TR": "TRY",
+    "GU": "USD", "MP": "USD", "US": "USD", "AU": "AUD", "NZ": "NZD", "CA": "CAD", "MX": "MXN",
+    "GB": "GBP", "FR": "EUR", "IT": "EUR", "ES": "EUR", "PT": "EUR", "DE": "EUR", "NL": "EUR", "AT": "EUR",
+    "GR": "EUR", "FI": "EUR", "CH": "CHF", "CZ": "CZK", "HU": "HUF", "DK": "DKK",
+}
+
+
+@dataclass(slots=True)
+class Airport:
+    iata: str
+    name_ko: str
+    name_en: str
+    lat: float
+    lon: float
+
+
+@dataclass(slots=True)
+class City:
+    code: Optional[str]  # IATA 도시 코드 (없는 도시는 가까운 도시/공항으로 대체)
+    name_ko: str
+    name_en: str
+    country: str
+    lat: float
+    lon: float
+    airports: List[Airport] = field(default_factory=list)
+    aliases: List[str] = field(default_factory=list)
+
+    @property
+    def currency(self):
+        return COUNTRY_CURRENCIES.get(self.country)
+
+
+# 조회 결과: 공항 이름/코드로 찾았으면 airport 가 채워집니다.
+@dataclass(slots=True)
+class LocationMatch:
+    city: Optional[City]
+    airport: Optional[Airport] = None
+    fuzzy: bool = False
+
+
+# 두 좌표 사이의 거리(km)
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+# 이름 정규화: 유니코드 정규화(NFKC), 소문자, 공백과 문장부호 제거
+def normalize_name(name):
+    text = unicodedata.normalize("NFKC", str(name)).lower()
+    return re.sub(r"[\W_]+", "", text)
+
+
+# 한글 음절을 자모로 분해 ("오사까" 와 "오사카" 처럼 받침/된소리 하나만 다른 이름도 가깝게 비교)
+def to_jamo(text):
+    return unicodedata.normalize("NFD", text)
+
+
+# 도시/공항 이름 색인
+# 한글명, 영문명, 별칭, IATA 코드는 사전 조회로 바로 찾고, 없으면 접미사 제거 -> 자모 단위 유사도 순으로 찾습니다.
+# 한 번 찾은 이름은 결과를 기억해 두므로 같은 이름을 다시 찾을 때는 사전 조회 한 번이면 됩니다.
+class LocationIndex:
+    def __init__(self, cities, airports=None, fuzzy_cutoff=0.8):
+        self.cities = cities
+        # 도시에 속하지 않은 공항(우타파오 등)도 공항 이름 조회와 가까운 공항 찾기에 사용
+        self.airports = dict(airports or {})
+        for city in cities:
+            for airport in city.airports:
+                self.airports.setdefault(airport.iata, airport)
+        self.fuzzy_cutoff = fuzzy_cutoff
+
+        # 공항 코드 -> 그 공항을 쓰는 도시 (도시 코드로 검색하면 해당 도시의 모든 공항이 포함됨)
+        self.airport_cities = {}
+        for city in cities:
+            for airport in city.airports:
+                self.airport_cities.setdefault(airport.iata, city)
+
+        self._names = {}
+        self._codes = {}
+        for city in cities:
+            if city.code:
+                self._codes.setdefault(city.code, LocationMatch(city))
+            for name in [city.name_ko, city.name_en] + city.aliases:
+                self._names.setdefault(normalize_name(name), LocationMatch(city))
+        for iata, airport in self.airports.items():
+            match = LocationMatch(self.airport_cities.get(iata), airport)
+            self._codes.setdefault(iata, match)
+            for name in (airport.name_ko, airport.name_en):
+                self._names.setdefault(normalize_name(name), match)
+                # "간사이", "Narita" 처럼 "공항"을 뺀 이름도 (도시 이름과 겹치지 않으면) 등록
+                short = re.sub(r"(국제공항|공항|international airport|airport)$", "", name.lower()).strip()
+                self._names.setdefault(normalize_name(short), match)
+
+        self._jamo_names = {to_jamo(name): name for name in self._names}
+        self._memo = {}
+
+    @classmethod
+    def load(cls, path=LOCATIONS_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        airports = {
+            iata: Airport(iata=iata, name_ko=item["ko"], name_en=item["en"], lat=item["lat"], lon=item["lon"])
+            for iata, item in data["airports"].items()
+        }
+        cities = [
+            City(
+                code=item["code"],
+                name_ko=item["ko"],
+                name_en=item["en"],
+                country=item["country"],
+                lat=item["lat"],
+                lon=item["lon"],
+                airports=[airports[iata] for iata in item["airports"]],
+                aliases=item.get("aliases", [])
+            )
+            for item in data["cities"]
+        ]
+        return cls(cities, airports)
+
+    # 이름/코드로 도시 또는 공항을 찾아 LocationMatch 반환, 없으면 ValueError
+    def lookup(self, name):
+        match = self._memo.get(name)
+        if match is None:
+            match = self._lookup(name)
+            if match is None:
+                raise ValueError(self._not_found_message(name))
+            self._memo[name] = match
+        return match
+
+    def _lookup(self, name):
+        raw = str(name).strip()
+        if re.fullmatch(r"[A-Za-z]{3}", raw) and raw.upper() in self._codes:
+            return self._codes[raw.upper()]
+
+        # "Osaka, Japan", "오사카(일본)" 처럼 덧붙은 부분은 떼고도 찾아봄
+        candidates = [raw] + [part for part in re.split(r"[,(/]", raw)[:1] if part.strip() != raw]
+        for candidate in candidates:
+            key = normalize_name(candidate)
+            if not key:
+                continue
+            if key in self._names:
+                return self._names[key]
+
+            for suffix in NAME_SUFFIXES:
+                suffix = normalize_name(suffix)
+                if key.endswith(suffix) and key[:-len(suffix)] in self._names:
+                    return self._names[key[:-len(suffix)]]
+
+        for candidate in candidates:
+            key = normalize_name(candidate)
+            if len(key) < 2:
+                continue
+            close = difflib.get_close_matches(to_jamo(key), self._jamo_names, n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                match = self._names[self._jamo_names[close[0]]]
+                return LocationMatch(match.city, match.airport, fuzzy=True)
+        return None
+
+    # 찾지 못했을 때 비슷한 이름을 함께 알려주면 에이전트가 다음 시도에서 바로 고칠 수 있음
+    def _not_found_message(self, name):
+        close = difflib.get_close_matches(to_jamo(normalize_name(name)), self._jamo_names, n=3, cutoff=0.5)
+        suggestions = []
+        for jamo in close:
+            match = self._names[self._jamo_names[jamo]]
+            label = match.city.name_ko if match.city and not match.airport else match.airport.name_ko
+            if label not in suggestions:
+                suggestions.append(label)
+
+        message = f"'{name}'의 도시 코드를 찾을 수 없습니다."
+        if suggestions:
+            message += f" 비슷한 이름: {', '.join(suggestions)}"
+        return message
+
+    # 좌표에서 가까운 공항 순으로 [(Airport, 거리 km), ...]
+    def nearest_airports(self, lat, lon, limit=3):
+        distances = [
+            (airport, haversine_km(lat, lon, airport.lat, airport.lon))
+            for airport in self.airports.values()
+        ]
+        distances.sort(key=lambda item: item[1])
+        return distances[:limit]
+
+    # 좌표에서 가장 가까운, 도시 코드가 있는 도시
+    def nearest_city(self, lat, lon, country=None):
+        cities = [city for city in self.cities if city.code and (country is None or city.country == country)]
+        return min(cities, key=lambda city: haversine_km(lat, lon, city.lat, city.lon), default=None)
+
+    # 항공편 검색용 코드
+    # 공항으로 찾았으면 공항 코드, 공항이 있는 도시는 도시 코드(모든 공항 포함),
+    # 공항이 없는 도시(교토, 하코네 등)는 가장 가까운 공항이 속한 도시 코드를 반환
+    def airport_code(self, name):
+        match = self.lookup(name)
+        if match.airport:
+            return match.airport.iata
+
+        city = match.city
+        if city.airports:
+            return city.code
+
+        airport, _ = self.nearest_airports(city.lat, city.lon, limit=1)[0]
+        owner = self.airport_cities.get(airport.iata)
+        return owner.code if owner and owner.code else airport.iata
+
+    # 호텔 검색용 도시 코드
+    # 도시 코드가 없는 도시는 같은 나라에서 가장 가까운 도시의 코드를 반환
+    def city_code(self, name):
+        match = self.lookup(name)
+        city = match.city
+        if city is None:
+            airport = match.airport
+            city = self.nearest_city(airport.lat, airport.lon)
+        elif not city.code:
+            city = self.nearest_city(city.lat, city.lon, country=city.country)
+
+        if city is None:
+            raise ValueError(f"'{name}'의 도시 코드를 찾을 수 없습니다.")
+        return city.code
+
+
+_location_index = None
+_location_index_lock = threading.Lock()
+
+
+# 프로세스 공용 도시/공항 색인 (처음 사용할 때 한 번만 데이터 파일을 읽음)
+# - LOCATIONS_PATH: 데이터 파일 경로 (기본: 이 모듈 옆의 locations.json)
+def get_location_index():
+    global _location_index
+    if _location_index is None:
+        with _location_index_lock:
+            if _location_index is None:
+                _location_index = LocationIndex.load(os.getenv("LOCATIONS_PATH", LOCATIONS_PATH))
+    return _location_index
+
+
+def get_city_code(city_name):
+    return get_location_index().city_code(city_name)
+
+
+def get_airport_code(city_name):
+    return get_location_index().airport_code(city_name)
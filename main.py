@@ -1,8 +1,17 @@
+import os
+import sys
+
+if "--offline" in sys.argv:
+    # crewai 를 불러오기 전에 설정해야 원격 텔레메트리 전송이 꺼짐
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
 from crew import TravelCoordinatorCrew
+from result_cache import cached_kickoff
 
-def run():
+def run(force_refresh=False):
     """
     Run the crew.
+    Returns the cached itinerary for the same request today unless force_refresh is set.
     """
     inputs = {
         'content': 
@@ -13,12 +22,25 @@ def run():
     }
 
     
-    return TravelCoordinatorCrew().crew().kickoff(inputs=inputs)
+    result, _ = cached_kickoff(TravelCoordinatorCrew().crew, inputs, force_refresh=force_refresh)
+    return result
 
 
 if __name__ == "__main__":
-    result = run()
+    if "--offline" in sys.argv:
+        # API 키 없이 스텁 서버와 가짜 LLM 으로 전체 파이프라인 실행
+        from replay import offline_environment
+        with offline_environment():
+            result = run(force_refresh=True)
+    else:
+        result = run(force_refresh="--refresh" in sys.argv)
     print(result)
+
+    if "--trace" in sys.argv:
+        # 이번 kickoff 의 시간 분포 (캐시된 일정을 돌려준 경우에는 kickoff 가 없어 트레이스도 없음)
+        from tracing import format_summary, get_tracer
+        trace = get_tracer().last_trace()
+        print(format_summary(trace.summary()) if trace else "트레이스가 없습니다. (캐시된 일정)")
     
     
     
\ No newline at end of file
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import tempfile
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 도구 결과 1건당 기본 토큰 예산
+DEFAULT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", 800))
+
+# 로컬 캐시에 cl100k_base 가 없을 때 tiktoken 이 내려받도록 허용할지 (기본: 내려받지 않고 바이트 수로 근사)
+TIKTOKEN_DOWNLOAD = os.getenv("TOOL_OUTPUT_TIKTOKEN_DOWNLOAD", "false").lower() in ("1", "true", "yes")
+_CL100K_URL = "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
+
+_encoding = None
+
+
+# tiktoken 이 cl100k_base 를 내려받지 않고 불러올 수 있는지 (tiktoken.load 와 같은 캐시 경로 규칙)
+def _encoding_cached():
+    cache_dir = os.getenv("TIKTOKEN_CACHE_DIR", os.getenv("DATA_GYM_CACHE_DIR",
+                                                         os.path.join(tempfile.gettempdir(), "data-gym-cache")))
+    return bool(cache_dir) and os.path.exists(os.path.join(cache_dir, hashlib.sha1(_CL100K_URL.encode()).hexdigest()))
+
+
+# 토큰 수 추정: tiktoken 을 쓸 수 있으면 cl100k_base 로 세고, 아니면 UTF-8 바이트 수 / 3 으로 근사
+# 인코딩 파일이 로컬에 없으면 도구 실행 중에 (타임아웃 없이) 내려받지 않도록 바이트 수 근사를 씁니다.
+def estimate_tokens(text):
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        if TIKTOKEN_DOWNLOAD or _encoding_cached():
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = False
+        else:
+            _encoding = False
+
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def truncate(text, max_chars):
+    text = " ".join(str(text).split())
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+# key 가 같은 항목은 처음 것만 남김 (정렬 후 호출하면 가장 좋은 항목이 남음)
+def dedupe(items, key):
+    seen = set()
+    unique = []
+    for item in items:
+        item_key = key(item)
+        if item_key in seen:
+            continue
+        seen.add(item_key)
+        unique.append(item)
+    return unique
+
+
+# 헤더 + 행을 " | " 로 구분한 표로 만들되, 토큰 예산을 넘으면 아래 행부터 생략
+def render_table(header, rows, budget=DEFAULT_TOKEN_BUDGET, title=None):
+    lines = [title] if title else []
+    lines.append(" | ".join(header))
+    used = estimate_tokens("\n".join(lines))
+
+    shown = 0
+    for row in rows:
+        line = " | ".join("" if value is None else str(value) for value in row)
+        cost = estimate_tokens(line) + 1
+        if shown and used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+
+    if shown < len(rows):
+        lines.append(f"(토큰 예산으로 {len(rows) - shown}건 생략)")
+    if not rows:
+        lines.append("(결과 없음)")
+    return "\n".join(lines)
+
+
+def _format_price(price):
+    return f"{price:,.0f}" if isinstance(price, (int, float)) else price
+
+
+# 항공편: 같은 여정은 최저가만 남기고 가격순 상위 top_n 개
+def shape_flights(flights, budget=DEFAULT_TOKEN_BUDGET, top_n=5, title=None):
+    flights = sorted(flights, key=lambda flight: flight["가격"])
+    flights = dedupe(flights, key=lambda flight: (flight.get("가는편"), flight.get("오는편")))[:top_n]
+
+    round_trip = any("오는편" in flight for flight in flights)
+    with_date = any("출발일" in flight for flight in flights)
+    header = (["출발일"] if with_date else []) + ["가격", "통화", "가는편"] + (["오는편"] if round_trip else [])
+    rows = [
+        ([flight.get("출발일")] if with_date else [])
+        + [_format_price(flight["가격"]), flight["통화"], flight["가는편"]]
+        + ([flight.get("오는편", "")] if round_trip else [])
+        for flight in flights
+    ]
+    return render_table(header, rows, budget, title)
+
+
+# 숙소: 같은 호텔은 최저가만 남기고 가격순 상위 top_n 개, 객실 설명은 짧게
+def shape_hotels(hotels, budget=DEFAULT_TOKEN_BUDGET, top_n=5, room_chars=60, title=None):
+    hotels = sorted(hotels, key=lambda hotel: hotel["가격"])
+    hotels = dedupe(hotels, key=lambda hotel: hotel["호텔"])[:top_n]
+
+    rows = [
+        [hotel["호텔"], _format_price(hotel["가격"]), hotel["통화"], truncate(hotel.get("객실", ""), room_chars)]
+        for hotel in hotels
+    ]
+    return render_table(["호텔", "총 가격", "통화", "객실"], rows, budget, title)
+
+
+# 장소: 같은 이름은 하나만, 평점순 상위 top_n 개, 리뷰/영업시간은 잘라서 표시
+def shape_places(places, budget=DEFAULT_TOKEN_BUDGET, top_n=5, review_chars=60, max_reviews=1, title=None):
+    places = sorted(places, key=lambda place: place.get("평점") or 0, reverse=True)
+    places = dedupe(places, key=lambda place: place["이름"])[:top_n]
+
+    rows = []
+    for place in places:
+        opening_hours = place.get("영업시간") or []
+        reviews = place.get("리뷰") or []
+        rows.append([
+            place["이름"],
+            place.get("평점", ""),
+            truncate(place.get("주소", ""), 40),
+            truncate(opening_hours[0], 30) + (" 외" if len(opening_hours) > 1 else "") if opening_hours else "",
+            " / ".join(truncate(review, review_chars) for review in reviews[:max_reviews])
+        ])
+    return render_table(["이름", "평점", "주소", "영업시간", "리뷰"], rows, budget, title)
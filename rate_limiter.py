@@ -0,0 +1,346 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+# 버킷 하나의 한도
+# - rate: 초당 채워지는 요청 수, burst: 한 번에 쓸 수 있는 최대 요청 수 (버킷 크기)
+# - daily: 하루(UTC) 최대 요청 수 (None 이면 제한 없음)
+@dataclass(slots=True)
+class RateLimit:
+    rate: float
+    burst: float
+    daily: Optional[int] = None
+
+
+# 업스트림/엔드포인트별 기본 한도
+# 요청 URL 의 호스트와 경로 접두사가 맞는 규칙의 버킷을 모두 거칩니다. (호스트 전체 버킷 + 엔드포인트 버킷 등)
+# - Amadeus 테스트 환경: 사용자당 초당 10건
+# - Google Places: 메서드(textsearch / nearbysearch / details)별 분당 600건
+# - ExchangeRate-API: 환율표를 한 시간에 한 번 정도만 받으므로 낮게
+DEFAULT_RULES = [
+    {"name": "amadeus", "host": "test.api.amadeus.com", "path": "", "rate": 10, "burst": 10},
+    {"name": "google_places_textsearch", "host": "maps.googleapis.com", "path": "/maps/api/place/textsearch/",
+     "rate": 10, "burst": 10},
+    {"name": "google_places_nearbysearch", "host": "maps.googleapis.com", "path": "/maps/api/place/nearbysearch/",
+     "rate": 10, "burst": 10},
+    {"name": "google_places_details", "host": "maps.googleapis.com", "path": "/maps/api/place/details/",
+     "rate": 10, "burst": 10},
+    {"name": "exchangerate", "host": "v6.exchangerate-api.com", "path": "", "rate": 1, "burst": 5},
+]
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _seconds_until_tomorrow(now):
+    current = datetime.fromtimestamp(now, timezone.utc)
+    return 86400 - (current.hour * 3600 + current.minute * 60 + current.second + current.microsecond / 1e6)
+
+
+# 버킷에서 tokens 개를 예약: (기다릴 시간(초), 예약 여부)
+# 남은 수가 모자라도 max_wait 안에 채워지면 미리 빼 두고(음수 허용) 그만큼 기다리게 하므로,
+# 기다리는 요청들은 도착 순서대로 rate 간격으로 통과하고 다시 경쟁하지 않습니다.
+# 상태: tokens(남은 요청 수, 음수면 밀린 요청), updated(마지막 계산 시각), day / day_count(오늘 사용량)
+def take_tokens(state, limit, tokens, now, max_wait):
+    state["tokens"] = min(limit.burst, state["tokens"] + (now - state["updated"]) * limit.rate)
+    state["updated"] = now
+    if state["day"] != _today():
+        state["day"], state["day_count"] = _today(), 0
+
+    if limit.daily is not None and state["day_count"] + tokens > limit.daily:
+        return _seconds_until_tomorrow(now), False
+
+    wait = max(0.0, (tokens - state["tokens"]) / limit.rate)
+    if wait > max_wait:
+        return wait, False
+
+    state["tokens"] -= tokens
+    state["day_count"] += tokens
+    return wait, True
+
+
+# delay 초 동안 아무도 통과하지 못하도록 남은 수를 내림 (delay 초 뒤에 한 건이 채워짐)
+def drain_tokens(state, limit, delay, now):
+    take_tokens(state, limit, 0, now, 0)
+    state["tokens"] = min(state["tokens"], 1 - delay * limit.rate)
+
+
+# 예약했던 tokens 개를 되돌림 (여러 버킷 중 뒤 버킷에서 거절돼 요청을 보내지 않을 때)
+def refund_tokens(state, limit, tokens, now):
+    take_tokens(state, limit, 0, now, 0)
+    state["tokens"] = min(limit.burst, state["tokens"] + tokens)
+    state["day_count"] = max(0, state["day_count"] - tokens)
+
+
+def _new_state(limit, now):
+    return {"tokens": limit.burst, "updated": now, "day": _today(), "day_count": 0}
+
+
+# 프로세스 내부 버킷 (스레드 간 공유)
+class MemoryBucketBackend:
+    blocking = False  # 짧은 메모리 락만 잡으므로 이벤트 루프에서 바로 호출해도 됨
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def take(self, name, limit, tokens, max_wait):
+        now = time.time()
+        with self._lock:
+            state = self._states.setdefault(name, _new_state(limit, now))
+            return take_tokens(state, limit, tokens, now, max_wait)
+
+    def drain(self, name, limit, delay):
+        now = time.time()
+        with self._lock:
+            drain_tokens(self._states.setdefault(name, _new_state(limit, now)), limit, delay, now)
+
+    def refund(self, name, limit, tokens):
+        now = time.time()
+        with self._lock:
+            refund_tokens(self._states.setdefault(name, _new_state(limit, now)), limit, tokens, now)
+
+    def peek(self, name, limit):
+        now = time.time()
+        with self._lock:
+            state = dict(self._states.get(name) or _new_state(limit, now))
+        take_tokens(state, limit, 0, now, 0)
+        return state
+
+
+# 로컬 SQLite 파일 버킷 (같은 파일을 쓰는 모든 워커 프로세스가 한도를 나눠 씀)
+# 예약은 BEGIN IMMEDIATE 트랜잭션 안에서 읽고-계산하고-쓰므로 프로세스 사이에서도 한 번에 하나씩 처리됩니다.
+class SqliteBucketBackend:
+    blocking = True  # BEGIN IMMEDIATE 락을 최대 30초까지 기다릴 수 있으므로 asyncio 에서는 스레드로 넘김
+
+    def __init__(self, path, table="rate_limits"):
+        self.path = path
+        self.table = table
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "day TEXT NOT NULL, day_count INTEGER NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _load(self, conn, name, limit, now):
+        row = conn.execute(
+            f"SELECT tokens, updated, day, day_count FROM {self.table} WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return _new_state(limit, now)
+        return dict(zip(("tokens", "updated", "day", "day_count"), row))
+
+    def _save(self, conn, name, state):
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (name, tokens, updated, day, day_count) VALUES (?, ?, ?, ?, ?)",
+            (name, state["tokens"], state["updated"], state["day"], state["day_count"])
+        )
+
+    def take(self, name, limit, tokens, max_wait):
+        with self._connect() as conn:
+            now = time.time()
+            state = self._load(conn, name, limit, now)
+            result = take_tokens(state, limit, tokens, now, max_wait)
+            self._save(conn, name, state)
+            return result
+
+    def drain(self, name, limit, delay):
+        with self._connect() as conn:
+            now = time.time()
+            state = self._load(conn, name, limit, now)
+            drain_tokens(state, limit, delay, now)
+            self._save(conn, name, state)
+
+    def refund(self, name, limit, tokens):
+        with self._connect() as conn:
+            now = time.time()
+            state = self._load(conn, name, limit, now)
+            refund_tokens(state, limit, tokens, now)
+            self._save(conn, name, state)
+
+    def peek(self, name, limit):
+        with self._connect() as conn:
+            now = time.time()
+            state = self._load(conn, name, limit, now)
+        take_tokens(state, limit, 0, now, 0)
+        return state
+
+
+# 업스트림 요청 한도 관리
+# acquire() 는 한도가 찰 때까지 기다렸다가(실패하지 않고 줄을 섬) 통과시키고,
+# 하루 한도를 다 썼거나 max_wait 보다 오래 기다려야 하면 RateLimitExceeded 를 던집니다.
+class RateLimiter:
+    def __init__(self, backend, rules=None, max_wait=60.0):
+        self.backend = backend
+        self.max_wait = max_wait
+        self.rules = []
+        self.limits = {}
+        for rule in rules if rules is not None else DEFAULT_RULES:
+            self.rules.append((rule["name"], rule.get("host", ""), rule.get("path", "")))
+            self.limits[rule["name"]] = RateLimit(float(rule["rate"]), float(rule.get("burst") or rule["rate"]),
+                                                  rule.get("daily"))
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # 요청 URL 에 적용되는 버킷 이름 목록
+    def buckets_for(self, url):
+        parts = urlsplit(url)
+        return [name for name, host, path in self.rules
+                if (not host or parts.netloc == host) and parts.path.startswith(path)]
+
+    # 모든 버킷에서 한 건씩 예약하고 차례가 올 때까지 대기, 기다린 시간(초) 반환
+    def acquire(self, buckets, tokens=1):
+        wait = self._reserve(buckets, tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    # acquire 의 asyncio 버전 (기다리는 동안 이벤트 루프를 막지 않음)
+    async def acquire_async(self, buckets, tokens=1):
+        wait = await self._run_async(self._reserve, buckets, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    # 버킷마다 자리를 예약하고, 모든 버킷의 차례가 올 때까지 기다릴 시간(초)을 반환
+    # 어느 버킷에서든 거절되면 앞 버킷에서 이미 예약한 자리는 되돌려, 보내지 않은 요청이 한도를 쓰지 않게 합니다.
+    def _reserve(self, buckets, tokens):
+        longest = 0.0
+        reserved_buckets = []
+        for name in buckets:
+            wait, reserved = self.backend.take(name, self.limits[name], tokens, self.max_wait)
+            if not reserved:
+                self._count(name, "rejected")
+                for reserved_name in reserved_buckets:
+                    self.backend.refund(reserved_name, self.limits[reserved_name], tokens)
+                    self._count(reserved_name, "refunded")
+                raise RateLimitExceeded(f"{name} 요청 한도를 초과했습니다. {wait:.1f}초 후에 다시 시도하세요.")
+
+            reserved_buckets.append(name)
+            self._count(name, "acquired")
+            if wait > 0:
+                self._count(name, "waits")
+                self._count(name, "wait_seconds", wait)
+            longest = max(longest, wait)
+        return longest
+
+    # 429 응답처럼 업스트림이 한도 초과를 알려 오면, 모든 워커가 delay 초 동안 해당 버킷을 쓰지 않게 함
+    def block(self, buckets, delay):
+        for name in buckets:
+            self.backend.drain(name, self.limits[name], delay)
+            self._count(name, "blocked")
+
+    async def block_async(self, buckets, delay):
+        await self._run_async(self.block, buckets, delay)
+
+    # 백엔드가 blocking(SQLite)이면 예약/차단을 스레드에서 실행해 공유 이벤트 루프를 막지 않음
+    async def _run_async(self, func, *args):
+        if getattr(self.backend, "blocking", True):
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    # 버킷별 현재 남은 요청 수(음수면 밀린 요청 수), 오늘 사용량, 이 프로세스의 대기 통계
+    def budget(self):
+        with self._lock:
+            stats = {name: {**counters, "wait_seconds": round(counters["wait_seconds"], 3)}
+                     for name, counters in self._stats.items()}
+
+        budget = {}
+        for name, limit in self.limits.items():
+            state = self.backend.peek(name, limit)
+            budget[name] = {
+                "tokens": round(state["tokens"], 2),
+                "burst": limit.burst,
+                "rate": limit.rate,
+                "daily_used": state["day_count"],
+                "daily_limit": limit.daily,
+                **stats.get(name, {}),
+            }
+        return budget
+
+    def _count(self, name, counter, value=1):
+        with self._lock:
+            counters = self._stats.setdefault(name, {"acquired": 0, "waits": 0, "wait_seconds": 0.0,
+                                                     "blocked": 0, "rejected": 0, "refunded": 0})
+            counters[counter] += value
+
+
+# 기본 규칙에 환경변수 설정을 덮어씀
+# - RATE_LIMIT_{NAME}_RATE / _BURST / _DAILY: 버킷별 한도 (예: RATE_LIMIT_AMADEUS_RATE=5)
+# - RATE_LIMIT_RULES: 추가/변경할 규칙의 JSON 목록
+#   (예: [{"name": "amadeus_hotel_offers", "host": "test.api.amadeus.com", "path": "/v3/shopping/hotel-offers", "rate": 4}])
+def load_rules():
+    rules = {rule["name"]: dict(rule) for rule in DEFAULT_RULES}
+    for rule in json.loads(os.getenv("RATE_LIMIT_RULES") or "[]"):
+        rules[rule["name"]] = {**rules.get(rule["name"], {}), **rule}
+
+    for name, rule in rules.items():
+        for key in ("rate", "burst", "daily"):
+            value = os.getenv(f"RATE_LIMIT_{name.upper()}_{key.upper()}")
+            if value:
+                rule[key] = int(value) if key == "daily" else float(value)
+    return list(rules.values())
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+# 프로세스 공용 요청 한도 관리자
+# - RATE_LIMIT_ENABLED: 0 이면 한도를 적용하지 않음 (기본 1)
+# - RATE_LIMIT_BACKEND: memory(기본, 프로세스 안에서만 공유) 또는 sqlite(같은 파일을 쓰는 프로세스끼리 공유)
+# - RATE_LIMIT_PATH: sqlite 파일 경로 (기본 .rate_limits.sqlite3)
+# - RATE_LIMIT_MAX_WAIT: 한 요청이 한도를 기다리는 최대 시간(초, 기본 60)
+def get_rate_limiter():
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                if os.getenv("RATE_LIMIT_ENABLED", "1").lower() in ("0", "false", "no"):
+                    rules = []
+                else:
+                    rules = load_rules()
+
+                if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "sqlite":
+                    backend = SqliteBucketBackend(os.getenv("RATE_LIMIT_PATH", ".rate_limits.sqlite3"))
+                else:
+                    backend = MemoryBucketBackend()
+                _rate_limiter = RateLimiter(backend, rules, max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", 60)))
+    return _rate_limiter
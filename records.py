@@ -0,0 +1,206 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+
+# ISO 8601 기간(PT2H10M)을 분 단위로 변환
+def parse_duration_minutes(duration):
+    match = re.fullmatch(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?", duration or "")
+    if not match:
+        return None
+
+    days, hours, minutes = (int(value or 0) for value in match.groups())
+    return (days * 24 + hours) * 60 + minutes
+
+
+# 분 단위 시간을 "2시간 10분" 형태로 변환
+def format_minutes(minutes):
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}시간 {minutes}분" if hours else f"{minutes}분"
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class Segment:
+    carrier: str
+    number: str
+    departure_airport: str
+    departure_at: datetime
+    arrival_airport: str
+    arrival_at: datetime
+
+    @property
+    def flight_number(self):
+        return f"{self.carrier}{self.number}"
+
+
+@dataclass(slots=True)
+class Itinerary:
+    segments: List[Segment]
+    duration_minutes: Optional[int]
+
+    @classmethod
+    def from_api(cls, raw):
+        segments = [
+            Segment(
+                carrier=segment["carrierCode"],
+                number=segment["number"],
+                departure_airport=segment["departure"]["iataCode"],
+                departure_at=datetime.fromisoformat(segment["departure"]["at"]),
+                arrival_airport=segment["arrival"]["iataCode"],
+                arrival_at=datetime.fromisoformat(segment["arrival"]["at"])
+            )
+            for segment in raw["segments"]
+        ]
+        return cls(segments=segments, duration_minutes=parse_duration_minutes(raw.get("duration")))
+
+    @property
+    def departure_at(self):
+        return self.segments[0].departure_at
+
+    @property
+    def arrival_at(self):
+        return self.segments[-1].arrival_at
+
+    # [(경유 공항, 대기 분), ...]
+    @property
+    def layovers(self):
+        return [
+            (current.departure_airport, int((current.departure_at - previous.arrival_at).total_seconds() // 60))
+            for previous, current in zip(self.segments, self.segments[1:])
+        ]
+
+    # 예: "KE723 ICN 04-25 09:00→NRT 11:00, KE1 NRT 12:30→KIX 14:00 (5시간 0분, 경유 NRT 1시간 30분)"
+    def to_compact(self):
+        legs = []
+        for segment in self.segments:
+            arrival_format = "%H:%M" if segment.arrival_at.date() == segment.departure_at.date() else "%m-%d %H:%M"
+            legs.append(
+                f"{segment.flight_number} {segment.departure_airport} {segment.departure_at:%m-%d %H:%M}"
+                f"→{segment.arrival_airport} {segment.arrival_at.strftime(arrival_format)}"
+            )
+
+        notes = []
+        if self.duration_minutes is not None:
+            notes.append(format_minutes(self.duration_minutes))
+        layovers = self.layovers
+        notes.append(
+            "경유 " + ", ".join(f"{airport} {format_minutes(minutes)}" for airport, minutes in layovers)
+            if layovers else "직항"
+        )
+        return f"{', '.join(legs)} ({', '.join(notes)})"
+
+
+@dataclass(slots=True)
+class FlightOffer:
+    price: float
+    currency: str
+    outbound: Itinerary
+    inbound: Optional[Itinerary] = None
+
+    @classmethod
+    def from_api(cls, raw):
+        itineraries = raw["itineraries"]
+        return cls(
+            price=float(raw["price"]["total"]),
+            currency=raw["price"]["currency"],
+            outbound=Itinerary.from_api(itineraries[0]),
+            inbound=Itinerary.from_api(itineraries[1]) if len(itineraries) > 1 else None
+        )
+
+    @property
+    def carrier(self):
+        return self.outbound.segments[0].carrier
+
+    # LLM 에게 전달하는 압축 표현
+    def to_compact(self):
+        compact = {"가격": self.price, "통화": self.currency, "가는편": self.outbound.to_compact()}
+        if self.inbound:
+            compact["오는편"] = self.inbound.to_compact()
+        return compact
+
+
+@dataclass(slots=True)
+class HotelOffer:
+    hotel_id: str
+    name: str
+    price: float
+    currency: str
+    room: str = ""
+
+    @classmethod
+    def from_api(cls, raw):
+        offer = raw["offers"][0]
+        return cls(
+            hotel_id=raw["hotel"].get("hotelId", ""),
+            name=raw["hotel"]["name"],
+            price=float(offer["price"]["total"]),
+            currency=offer["price"]["currency"],
+            room=((offer.get("room") or {}).get("description") or {}).get("text", "")
+        )
+
+    def to_compact(self):
+        compact = {"호텔": self.name, "가격": self.price, "통화": self.currency}
+        if self.room:
+            compact["객실"] = self.room
+        return compact
+
+
+@dataclass(slots=True)
+class Review:
+    text: str
+    rating: Optional[float]
+
+
+@dataclass(slots=True)
+class Place:
+    name: str
+    address: Optional[str] = None
+    rating: Optional[float] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    opening_hours: List[str] = field(default_factory=list)
+    reviews: List[Review] = field(default_factory=list)
+
+    # Place Details 결과(또는 주변 검색 결과와 합친 dict)에서 생성
+    @classmethod
+    def from_api(cls, raw, max_reviews=3):
+        return cls(
+            name=raw.get("name"),
+            address=raw.get("formatted_address") or raw.get("vicinity"),
+            rating=_to_float(raw.get("rating")),
+            phone=raw.get("formatted_phone_number"),
+            website=raw.get("website"),
+            opening_hours=(raw.get("opening_hours") or {}).get("weekday_text", []),
+            reviews=[
+                Review(text=review.get("text", ""), rating=_to_float(review.get("rating")))
+                for review in (raw.get("reviews") or [])[:max_reviews]
+            ]
+        )
+
+    # 값이 있는 항목만 포함하는 압축 표현
+    def to_compact(self):
+        compact = {"이름": self.name}
+        if self.address:
+            compact["주소"] = self.address
+        if self.rating is not None:
+            compact["평점"] = self.rating
+        if self.phone:
+            compact["전화번호"] = self.phone
+        if self.website:
+            compact["웹사이트"] = self.website
+        if self.opening_hours:
+            compact["영업시간"] = self.opening_hours
+        if self.reviews:
+            compact["리뷰"] = [
+                f"({review.rating:g}) {review.text}" if review.rating is not None else review.text
+                for review in self.reviews
+            ]
+        return compact
@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# 녹화 파일에 남기지 않는 요청 값 (API 키, 클라이언트 시크릿)
+SECRET_PARAMS = {"key", "apikey", "api_key", "client_id", "client_secret"}
+
+# 녹화 파일에 남기는 응답 헤더
+RECORDED_HEADERS = ["Content-Type", "Retry-After"]
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+# 녹화해 둔 값으로 requests.Response 를 만들어 실제 응답과 똑같이 다룰 수 있게 함
+def build_response(status, headers, body, url):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+# 업스트림 요청/응답 녹화 파일
+# - record 모드: 실제(또는 스텁 서버) 응답을 요청 키별로 저장
+# - replay 모드: 네트워크 없이 저장된 응답을 돌려줌 (같은 키가 여러 번 녹화됐으면 순서대로, 마지막 응답은 반복)
+# 요청 키는 메서드 + 호스트 + 경로 + 정렬된 파라미터이며, API 키와 시크릿은 키에서 빠지므로 녹화 파일에 남지 않습니다.
+class Cassette:
+    def __init__(self, path, mode="replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"지원하지 않는 녹화 모드입니다: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._stats = {"recorded": 0, "replayed": 0, "missed": 0}
+
+        self.interactions = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.interactions = json.load(f).get("interactions", {})
+
+    @staticmethod
+    def request_key(method, url, params=None, data=None):
+        parts = urlsplit(url)
+        # ExchangeRate-API 는 경로에 API 키가 들어감 (/v6/{key}/latest/KRW)
+        path = re.sub(r"^/v6/[^/]+/", "/v6/{key}/", parts.path)
+
+        values = dict(parse_qsl(parts.query))
+        for extra in (params, data):
+            if isinstance(extra, dict):
+                values.update(extra)
+        query = urlencode(sorted(
+            (name, value) for name, value in values.items()
+            if value is not None and name.lower() not in SECRET_PARAMS
+        ))
+        return f"{method.upper()} {parts.netloc}{path}" + (f"?{query}" if query else "")
+
+    def record(self, method, url, kwargs, response):
+        key = self.request_key(method, url, kwargs.get("params"), kwargs.get("data"))
+        entry = {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body": response.text
+        }
+        with self._lock:
+            self.interactions.setdefault(key, []).append(entry)
+            self._stats["recorded"] += 1
+            self._save()
+
+    def replay(self, method, url, kwargs):
+        key = self.request_key(method, url, kwargs.get("params"), kwargs.get("data"))
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                self._stats["missed"] += 1
+                raise CassetteMiss(f"녹화된 응답이 없습니다: {key}")
+
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = min(index + 1, len(entries) - 1)
+            self._stats["replayed"] += 1
+            entry = entries[index]
+
+        return build_response(entry["status"], entry["headers"], entry["body"], url)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "interactions": len(self.interactions)}
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"interactions": self.interactions}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+# 환경변수로 녹화 파일 설정
+# - HTTP_CASSETTE: 녹화 파일 경로 (없으면 녹화/재생 안 함)
+# - HTTP_CASSETTE_MODE: record 또는 replay (기본 replay)
+def cassette_from_env():
+    path = os.getenv("HTTP_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.getenv("HTTP_CASSETTE_MODE", "replay").lower())
+
+
+# 키 없이 오프라인으로 전체 파이프라인을 실행하는 환경
+# - 스텁 서버(stub_server)를 띄우고 모든 업스트림 요청을 그쪽으로 보냄 (cassette 가 replay 모드면 스텁 없이 재생)
+# - 프로세스 공용 HTTP 클라이언트(동기/async), Amadeus 토큰, 응답/일정/환율 캐시를 새 인스턴스로 바꿔 실제 캐시를 건드리지 않음
+# - fake_llm=True 이면 모든 에이전트의 LLM 을 FakeLLM 으로 교체
+# - rate_limits=True 이면 업스트림 요청 한도(rate_limiter)를 새 메모리 버킷으로 적용 (기본은 한도 없이 실행)
+# 블록을 벗어나면 원래 상태로 되돌립니다.
+@contextmanager
+def offline_environment(profile="fast", cassette=None, fake_llm=True, llm_latency=0.0, seed=0, rate_limits=False):
+    import amadeus_auth
+    import async_http
+    import exchange_rates
+    import hotel_filter
+    import http_client
+    import rate_limiter
+    import response_cache
+    import result_cache
+    from stub_server import StubServer
+
+    if isinstance(cassette, str):
+        cassette = Cassette(cassette, "replay" if os.path.exists(cassette) else "record")
+
+    stub = None
+    if cassette is None or cassette.mode == "record":
+        stub = StubServer(profile=profile, seed=seed).start()
+
+    saved = {
+        (http_client, "_http_client"): http_client._http_client,
+        (async_http, "_async_http_client"): async_http._async_http_client,
+        (amadeus_auth, "_token_manager"): amadeus_auth._token_manager,
+        (response_cache, "_response_cache"): response_cache._response_cache,
+        (result_cache, "_itinerary_cache"): result_cache._itinerary_cache,
+        (exchange_rates, "_rate_cache"): exchange_rates._rate_cache,
+        (hotel_filter, "_no_offer_tracker"): hotel_filter._no_offer_tracker,
+    }
+    limiter = rate_limiter.RateLimiter(rate_limiter.MemoryBucketBackend(),
+                                       rate_limiter.load_rules() if rate_limits else [])
+    client = http_client.HttpClient(upstream_override=stub.url if stub else None, cassette=cassette,
+                                    rate_limiter=limiter)
+    http_client._http_client = client
+    async_client = async_http.AsyncHttpClient(upstream_override=stub.url if stub else None, cassette=cassette,
+                                              rate_limiter=limiter)
+    async_http._async_http_client = async_client
+    amadeus_auth._token_manager = amadeus_auth.AmadeusTokenManager("offline", "offline", background_refresh=False)
+    response_cache._response_cache = response_cache.ResponseCache(response_cache.MemoryCacheBackend(1000))
+    result_cache._itinerary_cache = result_cache.ItineraryCache(
+        response_cache.ResponseCache(response_cache.MemoryCacheBackend(200), {"itinerary": 6 * 60 * 60})
+    )
+    exchange_rates._rate_cache = exchange_rates.RateTableCache(api_key="offline")
+    hotel_filter._no_offer_tracker = None
+
+    restore_llms = None
+    if fake_llm:
+        from fake_llm import install_fake_llm
+        restore_llms = install_fake_llm(latency=llm_latency)
+
+    environment = {"stub": stub, "http_client": client, "async_http_client": async_client, "cassette": cassette,
+                   "rate_limiter": limiter}
+    try:
+        yield environment
+    finally:
+        if restore_llms:
+            restore_llms()
+        client.close()
+        async_client.close()
+        for (module, name), value in saved.items():
+            setattr(module, name, value)
+        if stub:
+            stub.stop()
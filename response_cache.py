@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from tracing import current_span
+
+# 도구별 기본 TTL(초): 가격은 자주 바뀌므로 짧게, 장소 정보는 길게
+DEFAULT_TTLS = {
+    "flight": 10 * 60,
+    "hotel": 10 * 60,
+    "places": 24 * 60 * 60,
+    "geocode": 7 * 24 * 60 * 60,
+    "hotel_no_offers": 24 * 60 * 60,
+}
+
+_MISS = object()
+
+
+# 프로세스 내 메모리 캐시 (TTL + LRU 크기 제한)
+class MemoryCacheBackend:
+    blocking = False  # 짧은 메모리 락만 잡으므로 이벤트 루프에서 바로 호출해도 됨
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISS
+
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return _MISS
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 로컬 SQLite 파일 캐시 (여러 워커 프로세스가 같은 파일을 공유)
+# 값은 JSON 으로 저장하므로 JSON 직렬화 가능한 결과만 넣을 수 있습니다.
+class SqliteCacheBackend:
+    blocking = True  # 파일 락을 최대 30초까지 기다릴 수 있으므로 asyncio 에서는 스레드로 넘김
+
+    def __init__(self, path, max_entries=10000, table="response_cache"):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISS
+
+            if now >= row[1]:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return _MISS
+
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+            )
+            conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+
+# 도구 인자를 정규화한 키로 응답을 캐싱합니다.
+class ResponseCache:
+    def __init__(self, backend, ttls=None):
+        self.backend = backend
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    # 문자열은 앞뒤 공백 제거 + 소문자, 나머지는 그대로 두고 정렬된 JSON 의 해시를 키로 사용
+    @staticmethod
+    def make_key(namespace, params):
+        normalized = {
+            name: value.strip().lower() if isinstance(value, str) else value
+            for name, value in params.items()
+        }
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    # 캐시에 있으면 반환하고, 없거나 bypass=True 이면 fetch() 결과를 저장 후 반환
+    def get_or_fetch(self, namespace, params, fetch, bypass=False):
+        if not bypass:
+            value = self.get(namespace, params, default=_MISS)
+            if value is not _MISS:
+                current_span().add("cache_hits")
+                return value
+        else:
+            self._count(namespace, "bypasses")
+
+        current_span().add("cache_misses")
+        value = fetch()
+        self.set(namespace, params, value)
+        return value
+
+    # get_or_fetch 의 asyncio 버전 (fetch 는 코루틴을 돌려주는 함수)
+    async def aget_or_fetch(self, namespace, params, fetch, bypass=False):
+        if not bypass:
+            value = await self.run_async(self.get, namespace, params, default=_MISS)
+            if value is not _MISS:
+                current_span().add("cache_hits")
+                return value
+        else:
+            self._count(namespace, "bypasses")
+
+        current_span().add("cache_misses")
+        value = await fetch()
+        await self.run_async(self.set, namespace, params, value)
+        return value
+
+    # 캐시를 읽고 쓰는 동기 함수를 이벤트 루프를 막지 않게 실행 (백엔드가 blocking 이면 스레드에서)
+    async def run_async(self, func, *args, **kwargs):
+        if getattr(self.backend, "blocking", True):
+            return await asyncio.to_thread(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    def get(self, namespace, params, default=None):
+        value = self.backend.get(self.make_key(namespace, params))
+        if value is _MISS:
+            self._count(namespace, "misses")
+            return default
+
+        self._count(namespace, "hits")
+        return value
+
+    def set(self, namespace, params, value):
+        self.backend.set(self.make_key(namespace, params), value, self.ttls.get(namespace, 60))
+
+    def stats(self):
+        with self._lock:
+            return {namespace: dict(counters) for namespace, counters in self._counters.items()}
+
+    def clear(self):
+        self.backend.clear()
+
+    def _count(self, namespace, name):
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0, "bypasses": 0})
+            counters[name] += 1
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+# 프로세스 공용 응답 캐시
+# - TOOL_CACHE_BACKEND: memory(기본) 또는 sqlite
+# - TOOL_CACHE_PATH: sqlite 파일 경로 (기본 .tool_cache.sqlite3)
+# - TOOL_CACHE_MAX_ENTRIES: 최대 항목 수
+# - TOOL_CACHE_TTL_FLIGHT / TOOL_CACHE_TTL_HOTEL / TOOL_CACHE_TTL_PLACES: 도구별 TTL(초)
+#   (TOOL_CACHE_TTL_GEOCODE, TOOL_CACHE_TTL_HOTEL_NO_OFFERS 도 같은 방식)
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                max_entries = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 1000))
+                if os.getenv("TOOL_CACHE_BACKEND", "memory").lower() == "sqlite":
+                    backend = SqliteCacheBackend(os.getenv("TOOL_CACHE_PATH", ".tool_cache.sqlite3"), max_entries)
+                else:
+                    backend = MemoryCacheBackend(max_entries)
+
+                ttls = {
+                    namespace: float(os.getenv(f"TOOL_CACHE_TTL_{namespace.upper()}"))
+                    for namespace in DEFAULT_TTLS
+                    if os.getenv(f"TOOL_CACHE_TTL_{namespace.upper()}")
+                }
+                _response_cache = ResponseCache(backend, ttls)
+    return _response_cache
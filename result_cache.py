@@ -0,0 +1,78 @@
+import os
+import re
+import threading
+import unicodedata
+from datetime import date, datetime
+
+from response_cache import ResponseCache, MemoryCacheBackend, SqliteCacheBackend
+
+
+# 요청 문장을 정규화: 유니코드 정규화(NFKC), 소문자, 문장부호 제거, 공백 하나로 통일
+# 띄어쓰기나 마침표만 다른 요청은 같은 키가 됩니다.
+def normalize_content(content):
+    text = unicodedata.normalize("NFKC", content).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+# kickoff 최종 결과 캐시
+# 키는 정규화한 요청 내용 + 가격을 조회한 날짜이므로, 날짜가 바뀌면 새로 생성합니다.
+class ItineraryCache:
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _params(self, content, day=None):
+        return {"content": normalize_content(content), "date": (day or date.today()).isoformat()}
+
+    # {"result": 일정 문자열, "created_at": 생성 시각} 또는 None
+    def get(self, content):
+        return self.cache.get("itinerary", self._params(content))
+
+    def set(self, content, result):
+        entry = {"result": str(result), "created_at": datetime.now().isoformat(timespec="seconds")}
+        self.cache.set("itinerary", self._params(content), entry)
+        return entry
+
+    def stats(self):
+        return self.cache.stats().get("itinerary", {})
+
+
+_itinerary_cache = None
+_itinerary_cache_lock = threading.Lock()
+
+
+# 프로세스 공용 일정 결과 캐시
+# - ITINERARY_CACHE_BACKEND: sqlite(기본) 또는 memory
+# - ITINERARY_CACHE_PATH: sqlite 파일 경로 (기본 .itinerary_cache.sqlite3)
+# - ITINERARY_CACHE_TTL: 결과 유지 시간(초, 기본 6시간)
+def get_itinerary_cache():
+    global _itinerary_cache
+    if _itinerary_cache is None:
+        with _itinerary_cache_lock:
+            if _itinerary_cache is None:
+                if os.getenv("ITINERARY_CACHE_BACKEND", "sqlite").lower() == "memory":
+                    backend = MemoryCacheBackend(max_entries=200)
+                else:
+                    backend = SqliteCacheBackend(
+                        os.getenv("ITINERARY_CACHE_PATH", ".itinerary_cache.sqlite3"),
+                        max_entries=1000,
+                        table="itinerary_cache"
+                    )
+
+                ttl = float(os.getenv("ITINERARY_CACHE_TTL", 6 * 60 * 60))
+                _itinerary_cache = ItineraryCache(ResponseCache(backend, {"itinerary": ttl}))
+    return _itinerary_cache
+
+
+# 캐시에 결과가 있으면 그대로, 없거나 force_refresh=True 이면 crew 를 실행해 저장 후 반환
+# 반환값: (일정 문자열 또는 CrewOutput, 캐시 사용 여부)
+def cached_kickoff(crew_factory, inputs, force_refresh=False):
+    cache = get_itinerary_cache()
+    if not force_refresh:
+        cached = cache.get(inputs["content"])
+        if cached:
+            return cached["result"], True
+
+    result = crew_factory().kickoff(inputs=inputs)
+    cache.set(inputs["content"], result)
+    return result, False
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from crewai.agents.parser import AgentAction, AgentFinish
+from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+
+
+# 스트리밍 중 UI 로 전달되는 이벤트
+# kind: "token"(LLM 출력 조각), "step"(에이전트 단계), "task"(태스크 완료), "done"(최종 결과), "error"
+@dataclass
+class StreamEvent:
+    kind: str
+    source: str = ""
+    text: str = ""
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0  # kickoff 시작 후 경과 시간(초)
+
+
+# 이벤트 버스는 프로세스 전역이므로 핸들러는 한 번만 등록하고,
+# 스트림 조각을 보낸 LLM 객체(id)로 어느 kickoff 의 어느 에이전트인지 찾아 전달합니다.
+_token_listeners = {}
+_token_listeners_lock = threading.Lock()
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_llm_stream_chunk(source, event):
+    with _token_listeners_lock:
+        listener = _token_listeners.get(id(source))
+    if listener:
+        listener(event.chunk)
+
+
+def _describe_step(step):
+    if isinstance(step, AgentAction):
+        return f"🔧 `{step.tool}` 도구 사용: {step.tool_input}"
+    if isinstance(step, AgentFinish):
+        return "📝 단계 결과 작성 완료"
+    return str(step)
+
+
+# crew 를 백그라운드 스레드에서 실행하면서 진행 상황을 StreamEvent 로 하나씩 돌려줍니다.
+# 콜백과 스트리밍 설정을 crew 에 직접 걸기 때문에, 다른 kickoff 와 공유하지 않는
+# 사본(TravelCoordinatorCrew().crew() 가 반환하는 것)을 넘겨야 합니다.
+# timeout(초)이 지나도 끝나지 않으면 TimeoutError 를 담은 "error" 이벤트로 끝냅니다.
+# (실행 중인 kickoff 스레드는 멈출 수 없어 끝날 때까지 백그라운드에서 돌고, 그 결과는 버려집니다.
+#  on_exit 를 넘기면 kickoff 스레드가 실제로 끝날 때 호출하므로, 호출한 쪽이 그때까지 자원을 잡아 둘 수 있습니다.)
+def stream_kickoff(crew, inputs, stream_tokens=True, timeout=None, on_exit=None):
+    events = queue.Queue()
+    started_at = time.perf_counter()
+
+    def emit(kind, **kwargs):
+        events.put(StreamEvent(kind=kind, elapsed=time.perf_counter() - started_at, **kwargs))
+
+    def on_step(step):
+        emit("step", text=_describe_step(step))
+
+    def on_task(output):
+        emit("task", source=str(output.agent), text=output.raw)
+
+    crew.step_callback = on_step
+    crew.task_callback = on_task
+
+    llm_ids = []
+    if stream_tokens:
+        with _token_listeners_lock:
+            for agent in crew.agents:
+                agent.llm.stream = True
+                _token_listeners[id(agent.llm)] = (
+                    lambda chunk, role=agent.role: emit("token", source=role, text=chunk)
+                )
+                llm_ids.append(id(agent.llm))
+
+    def run():
+        try:
+            emit("done", result=crew.kickoff(inputs=inputs))
+        except BaseException as e:
+            emit("error", error=e)
+        finally:
+            with _token_listeners_lock:
+                for llm_id in llm_ids:
+                    _token_listeners.pop(llm_id, None)
+            if on_exit:
+                on_exit()
+
+    threading.Thread(target=run, daemon=True).start()
+
+    deadline = started_at + timeout if timeout is not None else None
+    while True:
+        try:
+            event = events.get(timeout=max(0.0, deadline - time.perf_counter()) if deadline is not None else None)
+        except queue.Empty:
+            event = StreamEvent(kind="error", error=TimeoutError(f"일정 생성이 {timeout:g}초 안에 끝나지 않았습니다."),
+                                elapsed=time.perf_counter() - started_at)
+        yield event
+        if event.kind in ("done", "error"):
+            break
@@ -0,0 +1,513 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from locations import get_location_index, haversine_km
+
+# 스텁 응답을 만들 때 쓰는 고정 데이터 (항공사, 호텔 브랜드, 장소 유형, 리뷰, 환율표)
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "upstream.json")
+
+# 경로별 지연/오류 설정
+# - latency / jitter: 응답 지연(초)과 무작위 편차(±초)
+# - error_rate / error_status / retry_after: 이 확률로 오류 응답, Retry-After 헤더(초, None 이면 생략)
+# - hang_rate / hang: 이 확률로 hang 초 동안 응답을 미룸 (클라이언트 읽기 타임아웃 재현)
+ROUTES = ["token", "flight", "hotel_list", "hotel_offers", "place_search", "place_details", "exchange"]
+
+PROFILES = {
+    "fast": {},
+    "realistic": {
+        "token": {"latency": 0.15, "jitter": 0.05},
+        "flight": {"latency": 1.2, "jitter": 0.4},
+        "hotel_list": {"latency": 0.5, "jitter": 0.15},
+        "hotel_offers": {"latency": 0.35, "jitter": 0.15},
+        "place_search": {"latency": 0.25, "jitter": 0.1},
+        "place_details": {"latency": 0.2, "jitter": 0.08},
+        "exchange": {"latency": 0.1, "jitter": 0.03}
+    },
+    "slow": {
+        "token": {"latency": 0.6, "jitter": 0.2},
+        "flight": {"latency": 4.8, "jitter": 1.6},
+        "hotel_list": {"latency": 2.0, "jitter": 0.6},
+        "hotel_offers": {"latency": 1.4, "jitter": 0.6},
+        "place_search": {"latency": 1.0, "jitter": 0.4},
+        "place_details": {"latency": 0.8, "jitter": 0.3},
+        "exchange": {"latency": 0.4, "jitter": 0.1}
+    },
+    "flaky": {
+        "token": {"latency": 0.15, "error_rate": 0.1, "error_status": 503, "retry_after": 0.2},
+        "flight": {"latency": 1.2, "jitter": 0.4, "error_rate": 0.15, "error_status": 503, "retry_after": 0.5},
+        "hotel_list": {"latency": 0.5, "error_rate": 0.1, "error_status": 500},
+        "hotel_offers": {"latency": 0.35, "jitter": 0.15, "error_rate": 0.15, "error_status": 429,
+                         "retry_after": 0.3, "hang_rate": 0.05, "hang": 5.0},
+        "place_search": {"latency": 0.25, "error_rate": 0.1, "error_status": 503},
+        "place_details": {"latency": 0.2, "error_rate": 0.1, "error_status": 503, "hang_rate": 0.05, "hang": 5.0},
+        "exchange": {"latency": 0.1, "error_rate": 0.2, "error_status": 502}
+    }
+}
+
+_ROUTE_DEFAULTS = {"latency": 0.0, "jitter": 0.0, "error_rate": 0.0, "error_status": 503, "retry_after": None,
+                   "hang_rate": 0.0, "hang": 5.0}
+
+
+# 프로필 이름(PROFILES) 또는 JSON 파일 경로를 경로별 설정으로 변환
+def load_profile(profile):
+    if isinstance(profile, dict):
+        routes = profile
+    elif profile in PROFILES:
+        routes = PROFILES[profile]
+    elif profile and os.path.exists(profile):
+        with open(profile, encoding="utf-8") as f:
+            routes = json.load(f)
+    else:
+        raise ValueError(f"알 수 없는 스텁 프로필입니다: {profile}")
+
+    return {route: {**_ROUTE_DEFAULTS, **routes.get(route, {})} for route in ROUTES}
+
+
+# 같은 요청에는 항상 같은 응답이 나오도록 요청 값으로 난수 시드를 만듦
+def _rng(*parts):
+    return random.Random(zlib.crc32("|".join(str(part) for part in parts).encode("utf-8")))
+
+
+def _iso_duration(minutes):
+    hours, minutes = divmod(int(minutes), 60)
+    return f"PT{hours}H{minutes}M" if minutes else f"PT{hours}H"
+
+
+# Amadeus, Google Places, ExchangeRate-API 의 응답 형식을 흉내 내는 결정적 응답 생성기
+class UpstreamFixtures:
+    def __init__(self, path=FIXTURES_PATH):
+        with open(path, encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.locations = get_location_index()
+
+    # 코드(도시/공항) -> (위도, 경도, 도시 영문명, 국가 코드)
+    def _place(self, code):
+        match = self.locations.lookup(code)
+        place = match.airport or match.city
+        if match.city is None:
+            return place.lat, place.lon, place.name_en, ""
+        return place.lat, place.lon, match.city.name_en, match.city.country
+
+    def _brand(self, chain):
+        return next((brand for brand in self.data["hotel_brands"] if brand["chain"] == chain), self.data["hotel_brands"][0])
+
+    # hotelId(체인 2자 + 도시 코드 3자 + 번호)만으로 이름을 정해 목록/오퍼 응답의 호텔 이름이 같도록 함
+    def _hotel_name(self, hotel_id):
+        try:
+            city_name = self._place(hotel_id[2:5])[2]
+        except ValueError:
+            city_name = hotel_id[2:5]
+        area = _rng("hotel-area", hotel_id).choice(self.data["hotel_areas"])
+        return f"{self._brand(hotel_id[:2])['name']} {city_name.upper()} {area}"
+
+    # place_id 에 장소 유형 번호를 넣어 주변 검색/세부 정보 응답의 이름과 영업시간이 같도록 함
+    def _place_type(self, place_id):
+        parts = place_id.split("-")
+        index = int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else 0
+        return self.data["place_types"][index % len(self.data["place_types"])]
+
+    def _place_name(self, place_id):
+        prefix = _rng("place-name", place_id).choice(["중앙", "구시가지", "항구", "역앞", "강변", "언덕"])
+        return f"{prefix} {self._place_type(place_id)['suffix']}"
+
+    def token(self, counter):
+        return 200, {"type": "amadeusOAuth2Token", "access_token": f"stub-token-{counter}",
+                     "token_type": "Bearer", "expires_in": 1799, "state": "approved"}
+
+    def flight_offers(self, params):
+        origin = params["originLocationCode"].upper()
+        destination = params["destinationLocationCode"].upper()
+        departure_date = params["departureDate"]
+        return_date = params.get("returnDate")
+        adults = int(params.get("adults", 1))
+        rng = _rng("flight", origin, destination, departure_date, return_date, adults)
+
+        try:
+            origin_lat, origin_lon, *_ = self._place(origin)
+            destination_lat, destination_lon, *_ = self._place(destination)
+        except ValueError:
+            return 400, {"errors": [{"status": 400, "code": 477, "title": "INVALID FORMAT",
+                                     "detail": "invalid location code"}]}
+
+        distance = haversine_km(origin_lat, origin_lon, destination_lat, destination_lon)
+        if distance < 500:
+            carriers = self.data["carriers"]["domestic_kr"]
+        elif distance < 3000:
+            carriers = self.data["carriers"]["short_haul"]
+        else:
+            carriers = self.data["carriers"]["long_haul"]
+
+        offers = []
+        for _ in range(int(params.get("max", 10))):
+            carrier = rng.choice(carriers)
+            stops = 0 if distance < 3000 or rng.random() < 0.5 else 1
+            outbound = self._itinerary(rng, carrier, origin, destination, departure_date, distance, stops)
+            itineraries = [outbound]
+            if return_date:
+                itineraries.append(self._itinerary(rng, carrier, destination, origin, return_date, distance, stops))
+
+            fare = (40000 + distance * rng.uniform(90, 160)) * (1.85 if return_date else 1.0) * (0.85 if stops else 1.0)
+            offers.append({
+                "type": "flight-offer",
+                "itineraries": itineraries,
+                "price": {"currency": params.get("currencyCode", "KRW"), "total": f"{round(fare * adults, -2):.2f}"}
+            })
+        return 200, {"meta": {"count": len(offers)}, "data": offers}
+
+    def _itinerary(self, rng, carrier, origin, destination, day, distance, stops):
+        departure_at = datetime.fromisoformat(day) + timedelta(hours=rng.randint(6, 21), minutes=rng.choice([0, 15, 30, 45]))
+        flight_minutes = int(distance / 800 * 60) + 30
+        if not stops:
+            arrival_at = departure_at + timedelta(minutes=flight_minutes)
+            segments = [self._segment(rng, carrier, origin, destination, departure_at, arrival_at)]
+            return {"duration": _iso_duration(flight_minutes), "segments": segments}
+
+        first_leg = flight_minutes // 2
+        layover = rng.choice([75, 95, 130, 185])
+        hub = "ICN" if origin != "ICN" and destination != "ICN" else "HKG"
+        connect_at = departure_at + timedelta(minutes=first_leg)
+        second_departure = connect_at + timedelta(minutes=layover)
+        arrival_at = second_departure + timedelta(minutes=flight_minutes - first_leg + 40)
+        segments = [
+            self._segment(rng, carrier, origin, hub, departure_at, connect_at),
+            self._segment(rng, carrier, hub, destination, second_departure, arrival_at)
+        ]
+        return {"duration": _iso_duration((arrival_at - departure_at).total_seconds() // 60), "segments": segments}
+
+    def _segment(self, rng, carrier, origin, destination, departure_at, arrival_at):
+        return {
+            "carrierCode": carrier,
+            "number": str(rng.randint(100, 1999)),
+            "departure": {"iataCode": origin, "at": departure_at.isoformat()},
+            "arrival": {"iataCode": destination, "at": arrival_at.isoformat()}
+        }
+
+    def hotels_by_city(self, params):
+        city_code = params["cityCode"].upper()
+        try:
+            city_lat, city_lon, _, country = self._place(city_code)
+        except ValueError:
+            return 400, {"errors": [{"status": 400, "code": 895, "title": "NOTHING FOUND FOR REQUESTED CITY"}]}
+
+        ratings = set(params["ratings"].split(",")) if params.get("ratings") else None
+        chains = set(params["chainCodes"].upper().split(",")) if params.get("chainCodes") else None
+        amenities = set(params["amenities"].upper().split(",")) if params.get("amenities") else None
+
+        rng = _rng("hotels", city_code)
+        hotels = []
+        for number in range(40):
+            brand = rng.choice(self.data["hotel_brands"])
+            hotel_id = f"{brand['chain']}{city_code}{number:03d}"
+            lat = city_lat + rng.uniform(-0.06, 0.06)
+            lon = city_lon + rng.uniform(-0.06, 0.06)
+            rating = str(rng.choice([2, 3, 3, 4, 4, 5]))
+            hotel_amenities = set(rng.sample(self.data["hotel_amenities"], 4))
+
+            if ratings and rating not in ratings:
+                continue
+            if chains and brand["chain"] not in chains:
+                continue
+            if amenities and not amenities <= hotel_amenities:
+                continue
+
+            hotels.append({
+                "chainCode": brand["chain"],
+                "iataCode": city_code,
+                "dupeId": 700000000 + zlib.crc32(f"{city_code}{number}".encode()) % 100000000,
+                "name": self._hotel_name(hotel_id),
+                "hotelId": hotel_id,
+                "rating": rating,
+                "geoCode": {"latitude": round(lat, 5), "longitude": round(lon, 5)},
+                "address": {"countryCode": country},
+                "distance": {"value": round(haversine_km(city_lat, city_lon, lat, lon), 2), "unit": "KM"},
+                "lastUpdate": "2025-04-01T00:00:00"
+            })
+        return 200, {"data": hotels, "meta": {"count": len(hotels)}}
+
+    # 호텔마다 고정적으로 약 1/4 은 객실이 없음 (단건 조회는 400, 여러 건 조회는 해당 호텔만 빠짐)
+    def hotel_offers(self, params):
+        hotel_ids = [hotel_id for hotel_id in params["hotelIds"].split(",") if hotel_id]
+        check_in = date.fromisoformat(params["checkInDate"])
+        check_out = date.fromisoformat(params["checkOutDate"])
+        nights = max((check_out - check_in).days, 1)
+        adults = int(params.get("adults", 1))
+
+        offers = []
+        for hotel_id in hotel_ids:
+            if zlib.crc32(hotel_id.encode()) % 4 == 0:
+                continue
+
+            rng = _rng("hotel-offer", hotel_id, check_in, check_out, adults)
+            nightly = rng.uniform(60000, 260000) * (1 + 0.3 * (adults - 1))
+            offers.append({
+                "type": "hotel-offers",
+                "hotel": {"hotelId": hotel_id, "chainCode": hotel_id[:2], "name": self._hotel_name(hotel_id)},
+                "available": True,
+                "offers": [{
+                    "id": f"OFFER{zlib.crc32(hotel_id.encode()) % 1000000:06d}",
+                    "checkInDate": params["checkInDate"],
+                    "checkOutDate": params["checkOutDate"],
+                    "room": {"description": {"text": rng.choice(self.data["room_descriptions"]), "lang": "EN"}},
+                    "guests": {"adults": adults},
+                    "price": {"currency": "KRW", "total": f"{round(nightly * nights, -2):.2f}"}
+                }]
+            })
+
+        if len(hotel_ids) == 1 and not offers:
+            return 400, {"errors": [{"status": 400, "code": 3664, "title": "NO ROOMS AVAILABLE AT REQUESTED PROPERTY"}]}
+        return 200, {"data": offers}
+
+    def place_search(self, params):
+        query = params.get("query", "")
+        try:
+            match = self.locations.lookup(query)
+            place = match.airport or match.city
+            lat, lon = place.lat, place.lon
+        except ValueError:
+            rng = _rng("textsearch", query)
+            lat, lon = 34.6937 + rng.uniform(-0.05, 0.05), 135.5023 + rng.uniform(-0.05, 0.05)
+
+        return 200, {"status": "OK", "results": [{
+            "name": query,
+            "place_id": f"stub-{zlib.crc32(query.encode()):08x}",
+            "geometry": {"location": {"lat": round(lat, 6), "lng": round(lon, 6)}}
+        }]}
+
+    def place_nearby(self, params):
+        location = params.get("location", "0,0")
+        rng = _rng("nearby", location, params.get("radius"), params.get("type"))
+        lat, lon = (float(value) for value in location.split(","))
+
+        results = []
+        for number, type_index in enumerate(rng.sample(range(len(self.data["place_types"])), 6)):
+            place_id = f"stub-{type_index}-{zlib.crc32(f'{location}|{number}'.encode()):08x}"
+            results.append({
+                "place_id": place_id,
+                "name": self._place_name(place_id),
+                "rating": round(rng.uniform(3.6, 4.9), 1),
+                "vicinity": f"{lat + rng.uniform(-0.01, 0.01):.4f}, {lon + rng.uniform(-0.01, 0.01):.4f} 부근",
+                "geometry": {"location": {"lat": lat, "lng": lon}}
+            })
+        return 200, {"status": "OK", "results": results}
+
+    def place_details(self, params):
+        place_id = params.get("place_id", "")
+        rng = _rng("details", place_id)
+        place_type = self._place_type(place_id)
+
+        result = {
+            "name": self._place_name(place_id),
+            "rating": round(rng.uniform(3.6, 4.9), 1),
+            "formatted_address": f"Stub-ro {rng.randint(1, 300)}",
+            "formatted_phone_number": f"0{rng.randint(10, 99)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+            "opening_hours": {"weekday_text": [f"{day}: {place_type['hours']}" for day in self.data["weekdays"]]},
+            "website": f"https://example.com/{place_id}",
+            "reviews": rng.sample(self.data["reviews"], 3)
+        }
+        fields = params.get("fields")
+        if fields:
+            result = {name: value for name, value in result.items() if name in fields.split(",")}
+        return 200, {"status": "OK", "result": result}
+
+    def exchange_rates(self, base):
+        table = self.data["exchange_rates"]
+        rates = table["conversion_rates"]
+        base = base.upper()
+        if base not in rates:
+            return 200, {"result": "error", "error-type": "unsupported-code"}
+
+        return 200, {
+            "result": "success",
+            "base_code": base,
+            "time_last_update_utc": table["time_last_update_utc"],
+            "time_last_update_unix": table["time_last_update_unix"],
+            "conversion_rates": {currency: rate / rates[base] for currency, rate in rates.items()}
+        }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 커넥션 재사용 측정을 위해 HTTP/1.1 로 응답
+    disable_nagle_algorithm = True  # 헤더와 본문을 따로 보낼 때 생기는 지연(delayed ACK, 약 40ms) 방지
+
+    def do_GET(self):
+        self.server.stub.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.stub.handle(self, "POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 네 개 업스트림 API(Amadeus 인증/항공/호텔, Google Places, ExchangeRate-API)를 한 포트에서 흉내 내는 로컬 서버
+# 경로만으로 어느 API 인지 구분하므로, HttpClient 의 upstream_override 로 모든 요청을 이 서버로 보내면 됩니다.
+class StubServer:
+    def __init__(self, host="127.0.0.1", port=0, profile="fast", seed=0, fixtures_path=FIXTURES_PATH):
+        self.host = host
+        self.port = port
+        self.profile = load_profile(profile)
+        self.fixtures = UpstreamFixtures(fixtures_path)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._token_counter = 0
+        self._stats = {}
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # 경로별 요청 수, 주입한 오류/지연 수, 최대 동시 요청 수
+    def stats(self):
+        with self._lock:
+            return {route: dict(counters) for route, counters in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+
+    def _route(self, method, path):
+        if method == "POST" and path == "/v1/security/oauth2/token":
+            return "token"
+        if path == "/v2/shopping/flight-offers":
+            return "flight"
+        if path == "/v1/reference-data/locations/hotels/by-city":
+            return "hotel_list"
+        if path == "/v3/shopping/hotel-offers":
+            return "hotel_offers"
+        if path in ("/maps/api/place/textsearch/json", "/maps/api/place/nearbysearch/json"):
+            return "place_search"
+        if path == "/maps/api/place/details/json":
+            return "place_details"
+        if path.startswith("/v6/") and "/latest/" in path:
+            return "exchange"
+        return None
+
+    def _build(self, route, path, params):
+        if route == "token":
+            with self._lock:
+                self._token_counter += 1
+                counter = self._token_counter
+            return self.fixtures.token(counter)
+        if route == "flight":
+            return self.fixtures.flight_offers(params)
+        if route == "hotel_list":
+            return self.fixtures.hotels_by_city(params)
+        if route == "hotel_offers":
+            return self.fixtures.hotel_offers(params)
+        if route == "place_search":
+            if path.endswith("textsearch/json"):
+                return self.fixtures.place_search(params)
+            return self.fixtures.place_nearby(params)
+        if route == "place_details":
+            return self.fixtures.place_details(params)
+        return self.fixtures.exchange_rates(path.rsplit("/", 1)[-1])
+
+    def _count(self, route, name, value=1):
+        counters = self._stats.setdefault(route, {"requests": 0, "errors": 0, "hangs": 0,
+                                                  "in_flight": 0, "max_in_flight": 0})
+        counters[name] += value
+        if name == "in_flight":
+            counters["max_in_flight"] = max(counters["max_in_flight"], counters["in_flight"])
+
+    def handle(self, handler, method):
+        parts = urlsplit(handler.path)
+        params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        if method == "POST":
+            length = int(handler.headers.get("Content-Length") or 0)
+            params.update({name: values[-1] for name, values in
+                           parse_qs(handler.rfile.read(length).decode("utf-8")).items()})
+
+        route = self._route(method, parts.path)
+        if route is None:
+            self._send(handler, 404, {"error": f"stub route not found: {method} {parts.path}"})
+            return
+
+        settings = self.profile[route]
+        with self._lock:
+            self._count(route, "requests")
+            self._count(route, "in_flight")
+            delay = max(0.0, settings["latency"] + self._random.uniform(-settings["jitter"], settings["jitter"]))
+            hang = self._random.random() < settings["hang_rate"]
+            error = self._random.random() < settings["error_rate"]
+            if hang:
+                self._count(route, "hangs")
+            elif error:
+                self._count(route, "errors")
+
+        try:
+            time.sleep(settings["hang"] if hang else delay)
+            if error and not hang:
+                headers = {}
+                if settings["retry_after"] is not None:
+                    headers["Retry-After"] = f"{settings['retry_after']:g}"
+                self._send(handler, settings["error_status"], {"errors": [{"status": settings["error_status"],
+                                                                          "title": "STUB INJECTED ERROR"}]}, headers)
+                return
+
+            status, body = self._build(route, parts.path, params)
+            self._send(handler, status, body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._lock:
+                self._count(route, "in_flight", -1)
+
+    def _send(self, handler, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Amadeus / Google Places / ExchangeRate-API 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", default="realistic", help=f"{', '.join(PROFILES)} 또는 JSON 파일 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.profile, args.seed).start()
+    print(f"스텁 서버 실행 중: {server.url} (프로필: {args.profile})")
+    print(f"HTTP_UPSTREAM_OVERRIDE={server.url} 로 도구 요청을 이 서버로 보낼 수 있습니다.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
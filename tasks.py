@@ -1,39 +1,129 @@
-from crewai import Task
-from agents import coordinator_agent, travel_info_agent, local_recommendation_agent
-
-
-# 1단계: 기본 여행 정보 작성 (travel_info_agent)
-initial_travel_plan_task = Task(
-    description=
-        "다음 고객의 요청을 바탕으로 항공편(왕복), 숙소를 포함한 여행 일정을 작성합니다. "
-        "요청: {content}",
-    expected_output="한국어로 작성된 일자별 기본 여행 일정과 비용 초안 (항공편(왕복), 숙소 포함)",
-    agent=travel_info_agent,
-)
-
-# 2단계: 현지 추천 정보 및 예산 추가 (local_recommendation_agent)
-local_recommendation_task = Task(
-    description=(
-        "1단계에서 작성된 일자별 기본 여행 일정과 비용을 검토한 후, "
-        "여행 일정에서 아침/점심/저녁 식사와 간식으로 즐길 수 있는 "
-        "현지에서 인기있는 맛집과 메뉴를 추가하고(가격 포함), 가볼만한 명소를 추천합니다.(비용 포함) "
-        "또한, 환율을 고려한 여행 경비 예산을 상세히 작성합니다. "
-        "항목별 예산이 명확히 정리되어야 합니다."
-    ),
-    expected_output="한국어로 작성된 상세 예산표와 현지 맛집과 명소가 포함된 업데이트된 일자별 여행 일정",
-    agent=local_recommendation_agent,
-    context=[initial_travel_plan_task]  # 1단계 결과 참조
-)
-
-# 3단계: 전체 일정 최종 정리 (coordinator_agent)
-final_coordinator_task = Task(
-    description=(
-        "앞선 모든 단계의 결과를 종합하여 최종적인 여행 일정을 깔끔하게 정리하고, "
-        "고객에게 제시할 수 있도록 일자별 여행 일정과 예산을 명확하고 보기 쉽게 만듭니다."
-    ),
-    expected_output="한국어로 작성된 고객에게 전달할 최종 여행 일정 계획서(항공편 상세, 숙소 상세, 전체 비용, 일자별 일정표, 상세 예산표, 추가 정보)",
-    agent=coordinator_agent,
-    context=[local_recommendation_task]  # 2단계 결과 참조
-)
+import threading
 
+# 태스크도 에이전트처럼 처음 사용할 때 한 번만 만듭니다. (모듈 속성으로 접근하면 get_tasks() 호출)
+_tasks = None
+_tasks_lock = threading.Lock()
 
+
+def _build_tasks():
+    from crewai import Task
+    from agents import (
+        coordinator_agent, travel_info_agent, local_recommendation_agent,
+        flight_info_agent, hotel_info_agent
+    )
+
+
+    # 1단계: 기본 여행 정보 작성 (travel_info_agent)
+    initial_travel_plan_task = Task(
+        description=
+            "다음 고객의 요청을 바탕으로 항공편(왕복), 숙소를 포함한 여행 일정을 작성합니다. "
+            "요청: {content}",
+        expected_output="한국어로 작성된 일자별 기본 여행 일정과 비용 초안 (항공편(왕복), 숙소 포함)",
+        agent=travel_info_agent,
+    )
+
+    # 2단계: 현지 추천 정보 및 예산 추가 (local_recommendation_agent)
+    local_recommendation_task = Task(
+        description=(
+            "1단계에서 작성된 일자별 기본 여행 일정과 비용을 검토한 후, "
+            "여행 일정에서 아침/점심/저녁 식사와 간식으로 즐길 수 있는 "
+            "현지에서 인기있는 맛집과 메뉴를 추가하고(가격 포함), 가볼만한 명소를 추천합니다.(비용 포함) "
+            "또한, 환율을 고려한 여행 경비 예산을 상세히 작성합니다. "
+            "항공편, 숙소, 식사, 명소, 교통 비용을 모두 모아 예산 계산 도구를 한 번 호출하고 "
+            "(고객이 말한 총예산도 함께 입력), 도구가 계산한 예산표와 합계를 그대로 사용합니다. "
+            "항목별 예산이 명확히 정리되어야 합니다."
+        ),
+        expected_output="한국어로 작성된 상세 예산표와 현지 맛집과 명소가 포함된 업데이트된 일자별 여행 일정",
+        agent=local_recommendation_agent,
+        context=[initial_travel_plan_task]  # 1단계 결과 참조
+    )
+
+    # 3단계: 전체 일정 최종 정리 (coordinator_agent)
+    final_coordinator_task = Task(
+        description=(
+            "앞선 모든 단계의 결과를 종합하여 최종적인 여행 일정을 깔끔하게 정리하고, "
+            "고객에게 제시할 수 있도록 일자별 여행 일정과 예산을 명확하고 보기 쉽게 만듭니다."
+        ),
+        expected_output="한국어로 작성된 고객에게 전달할 최종 여행 일정 계획서(항공편 상세, 숙소 상세, 전체 비용, 일자별 일정표, 상세 예산표, 추가 정보)",
+        agent=coordinator_agent,
+        context=[local_recommendation_task]  # 2단계 결과 참조
+    )
+
+
+    # 병렬 모드: 항공편, 숙소, 현지 추천은 서로의 결과가 필요 없으므로 동시에 실행하고,
+    # 최종 정리 단계만 세 결과를 모두 기다립니다.
+
+    # 병렬 1: 항공편 조회 (flight_info_agent)
+    flight_search_task = Task(
+        description=
+            "다음 고객의 요청에서 출발지, 목적지, 여행 일정을 파악하여 왕복 항공편을 조회하고 "
+            "가격과 시간대를 고려한 추천 항공편을 정리합니다. "
+            "요청: {content}",
+        expected_output="한국어로 작성된 추천 왕복 항공편 목록 (항공사, 편명, 출발/도착 시간, 가격)",
+        agent=flight_info_agent,
+        async_execution=True
+    )
+
+    # 병렬 2: 숙소 조회 (hotel_info_agent)
+    hotel_search_task = Task(
+        description=
+            "다음 고객의 요청에서 목적지와 숙박 일정을 파악하여 숙박 가능한 숙소를 조회하고 "
+            "예산을 고려한 추천 숙소를 정리합니다. "
+            "요청: {content}",
+        expected_output="한국어로 작성된 추천 숙소 목록 (숙소명, 객실 정보, 총 숙박 가격)",
+        agent=hotel_info_agent,
+        async_execution=True
+    )
+
+    # 병렬 3: 현지 맛집/명소 조사 (local_recommendation_agent)
+    local_research_task = Task(
+        description=
+            "다음 고객의 요청에서 목적지와 여행 기간을 파악하여, "
+            "아침/점심/저녁 식사와 간식으로 즐길 수 있는 현지에서 인기있는 맛집과 메뉴(가격 포함), "
+            "가볼만한 명소(비용 포함)를 조사합니다. 금액은 환율을 고려해 원화로도 함께 표기합니다. "
+            "요청: {content}",
+        expected_output="한국어로 작성된 현지 맛집과 명소 추천 목록 (원화 환산 비용 포함)",
+        agent=local_recommendation_agent,
+        async_execution=True
+    )
+
+    # 최종 정리: 세 결과를 모두 받아 일정과 예산을 완성 (coordinator_agent)
+    parallel_coordinator_task = Task(
+        description=(
+            "항공편, 숙소, 현지 맛집과 명소 조사 결과를 종합하여 고객의 요청에 맞는 일자별 여행 일정을 구성하고, "
+            "항목별 예산표를 작성하여 최종 여행 일정 계획서로 깔끔하게 정리합니다. "
+            "예산표는 모든 비용 항목과 고객이 말한 총예산을 예산 계산 도구에 한 번에 입력해 계산한 결과를 사용합니다. "
+            "요청: {content}"
+        ),
+        expected_output="한국어로 작성된 고객에게 전달할 최종 여행 일정 계획서(항공편 상세, 숙소 상세, 전체 비용, 일자별 일정표, 상세 예산표, 추가 정보)",
+        agent=coordinator_agent,
+        context=[flight_search_task, hotel_search_task, local_research_task]  # 병렬 단계 결과 모두 참조
+    )
+
+    return {
+        "initial_travel_plan_task": initial_travel_plan_task,
+        "local_recommendation_task": local_recommendation_task,
+        "final_coordinator_task": final_coordinator_task,
+        "flight_search_task": flight_search_task,
+        "hotel_search_task": hotel_search_task,
+        "local_research_task": local_research_task,
+        "parallel_coordinator_task": parallel_coordinator_task,
+    }
+
+
+# 이름 -> 태스크 (프로세스당 한 번 생성)
+def get_tasks():
+    global _tasks
+    if _tasks is None:
+        with _tasks_lock:
+            if _tasks is None:
+                _tasks = _build_tasks()
+    return _tasks
+
+
+def __getattr__(name):
+    if name.endswith("_task"):
+        tasks = get_tasks()
+        if name in tasks:
+            return tasks[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
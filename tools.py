@@ -1,88 +1,141 @@
-import time
+from datetime import date, timedelta
 from crewai.tools import BaseTool
-from typing import Type, List, Dict
-from pydantic import BaseModel, Field, PrivateAttr
-import requests
+from typing import Type, List, Optional
+from pydantic import BaseModel, Field
 import os
-from dotenv import load_dotenv
+from config import load_config
+
+from amadeus_auth import aget_amadeus_token, get_amadeus_token
+from async_http import async_http_get, run_coroutine
+from http_client import http_get
+from locations import get_airport_code, get_city_code, get_location_index
+from hotel_filter import get_no_offer_tracker, rank_hotels
+from concurrency import gather_bounded, map_bounded, chunked
+import hotel_offers
+from budget import BudgetItem, compute_budget, parse_amount, render_budget
+from exchange_rates import get_rate_cache
+from output_shaper import DEFAULT_TOKEN_BUDGET, render_table, shape_flights, shape_hotels, shape_places
+from records import FlightOffer, HotelOffer, Place
+from response_cache import get_response_cache
+from tracing import traced_tool
+
+load_config()
+
+
+def _async_tools_enabled():
+    return os.getenv("TOOLS_ASYNC", "").lower() in ("1", "true", "yes")
+
+
+# _run(동기)과 _arun(asyncio) 두 가지 구현을 가진 도구
+# CrewAI 는 에이전트의 도구를 항상 동기로 호출하므로, async_io 가 켜져 있으면 에이전트에 넘기는 도구가
+# _arun 을 공용 이벤트 루프에서 실행하게 합니다. HTTP 대기와 호텔 오퍼/장소 세부 정보 팬아웃이
+# 스레드를 점유하지 않아, 한 프로세스에서 여러 일정을 동시에 만들어도 스레드가 늘지 않습니다.
+# - TOOLS_ASYNC=1 이면 기본으로 켜짐
+# - async_timeout: 도구 호출 1건의 최대 시간(초), 넘으면 진행 중인 요청을 취소
+class AsyncCapableTool(BaseTool):
+    async_io: bool = Field(default_factory=_async_tools_enabled)
+    async_timeout: Optional[float] = None
+
+    def to_structured_tool(self):
+        tool = super().to_structured_tool()
+        if self.async_io:
+            tool.func = lambda **kwargs: run_coroutine(self._arun(**kwargs), self.async_timeout)
+        return tool
 
-load_dotenv()
 
 # FlightSearchTool
 class FlightSearchInput(BaseModel):
-    origin_city: str = Field(..., description="출발 도시명(한글), 예: '인천'")
-    destination_city: str = Field(..., description="도착 도시명(한글), 예: '오사카'")
+    origin_city: str = Field(..., description="출발 도시명 또는 공항(한글/영문/IATA 코드), 예: '인천'")
+    destination_city: str = Field(..., description="도착 도시명 또는 공항(한글/영문/IATA 코드), 예: '오사카'")
     departure_date: str = Field(..., description="출발일자(YYYY-MM-DD)")
+    return_date: Optional[str] = Field(None, description="왕복일 때 귀국일자(YYYY-MM-DD). 입력하면 가는편과 오는편을 한 번에 조회")
     adults: int = Field(1, description="성인 탑승객 수")
+    force_refresh: bool = Field(False, description="True이면 캐시를 사용하지 않고 최신 가격을 다시 조회")
 
 
-class FlightSearchTool(BaseTool):
+class FlightSearchTool(AsyncCapableTool):
     name: str = "항공편 검색 도구"
-    description: str = "도시명과 날짜를 입력하면 해당 날짜의 항공편을 조회합니다."
+    description: str = (
+        "도시명과 날짜를 입력하면 해당 날짜의 항공편을 조회합니다. "
+        "귀국일을 함께 입력하면 가는편과 오는편이 묶인 왕복 항공편을 총 가격이 낮은 순으로 조회합니다."
+    )
     args_schema: Type[BaseModel] = FlightSearchInput
 
-    _amadeus_token: dict = {"access_token": None, "expires_at": 0}
+    output_token_budget: int = DEFAULT_TOKEN_BUDGET  # 결과 표의 토큰 예산 (0 이면 원본 목록 반환)
+    top_n: int = 5  # 결과 표에 포함할 최대 항공편 수
 
     def get_amadeus_token(self):
-        if self._amadeus_token["access_token"] and time.time() < self._amadeus_token["expires_at"]:
-            return self._amadeus_token["access_token"]
-
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        data = {
-            'grant_type': 'client_credentials',
-            'client_id': os.getenv('AMADEUS_CLIENT_ID'),
-            'client_secret': os.getenv('AMADEUS_CLIENT_SECRET')
-        }
-
-        response = requests.post(url, data=data)
-        if response.status_code != 200:
-            raise Exception("Amadeus 토큰 발급 실패", response.text)
-
-        token_data = response.json()
-        self._amadeus_token["access_token"] = token_data["access_token"]
-        self._amadeus_token["expires_at"] = time.time() + token_data["expires_in"] - 60
+        return get_amadeus_token()
 
-        return self._amadeus_token["access_token"]
+    async def aget_amadeus_token(self):
+        return await aget_amadeus_token()
 
+    # 한글/영문 도시명, 공항명, IATA 코드를 항공편 검색용 코드로 변환 (공항이 없는 도시는 가까운 공항)
     def get_city_code(self, city_name):
-        city_codes = {
-            "서울": "SEL", "부산": "PUS", "제주": "CJU", "대구": "TAE", "인천": "ICN",
-            "오사카": "OSA", "도쿄": "TYO", "후쿠오카": "FUK", "삿포로": "SPK", "나고야": "NGO",
-            "오키나와": "OKA", "교토": "UKY", "요코하마": "YOK", "히로시마": "HIJ",
-            "베이징": "BJS", "상하이": "SHA", "광저우": "CAN", "선전": "SZX", "칭다오": "TAO",
-            "홍콩": "HKG", "마카오": "MFM", "시안": "SIA",
-            "타이베이": "TPE", "가오슝": "KHH",
-            "방콕": "BKK", "푸켓": "HKT", "치앙마이": "CNX",
-            "하노이": "HAN", "호치민": "SGN", "다낭": "DAD", "나트랑": "NHA",
-            "마닐라": "MNL", "세부": "CEB", "보라카이": "MPH",
-            "싱가포르": "SIN",
-            "쿠알라룸푸르": "KUL", "코타키나발루": "BKI", "페낭": "PEN",
-            "자카르타": "JKT", "발리": "DPS", "족자카르타": "JOG",
-            "델리": "DEL", "뭄바이": "BOM", "방갈로르": "BLR"
+        return get_airport_code(city_name)
+
+    @traced_tool
+    def _run(self, origin_city: str, destination_city: str, departure_date: str, return_date: Optional[str] = None,
+             adults: int = 1, force_refresh: bool = False):
+        params = self.cache_params(origin_city, destination_city, departure_date, return_date, adults)
+        flights = get_response_cache().get_or_fetch(
+            "flight", params, lambda: self.search_flights(**params), bypass=force_refresh
+        )
+        return self.shape(flights)
+
+    @traced_tool
+    async def _arun(self, origin_city: str, destination_city: str, departure_date: str,
+                    return_date: Optional[str] = None, adults: int = 1, force_refresh: bool = False):
+        params = self.cache_params(origin_city, destination_city, departure_date, return_date, adults)
+        flights = await get_response_cache().aget_or_fetch(
+            "flight", params, lambda: self.asearch_flights(**params), bypass=force_refresh
+        )
+        return self.shape(flights)
+
+    @staticmethod
+    def cache_params(origin_city, destination_city, departure_date, return_date=None, adults=1):
+        params = {
+            "origin_city": origin_city,
+            "destination_city": destination_city,
+            "departure_date": departure_date,
+            "adults": adults
         }
-
-        code = city_codes.get(city_name)
-        if not code:
-            raise ValueError(f"'{city_name}'의 도시 코드를 찾을 수 없습니다.")
-        return code
-
-    def _run(self, origin_city: str, destination_city: str, departure_date: str, adults: int = 1):
-        origin_code = self.get_city_code(origin_city)
-        destination_code = self.get_city_code(destination_city)
-
+        if return_date:
+            params["return_date"] = return_date
+        return params
+
+    def shape(self, flights):
+        if not self.output_token_budget:
+            return flights
+        return shape_flights(flights, self.output_token_budget, self.top_n)
+
+    def search_flights(self, origin_city, destination_city, departure_date, adults=1, return_date=None):
+        url, params = self.flight_offers_request(origin_city, destination_city, departure_date, adults, return_date)
+        response = http_get(url, headers={"Authorization": f"Bearer {self.get_amadeus_token()}"}, params=params)
+        return self.parse_flight_offers(response)
+
+    async def asearch_flights(self, origin_city, destination_city, departure_date, adults=1, return_date=None):
+        url, params = self.flight_offers_request(origin_city, destination_city, departure_date, adults, return_date)
+        response = await async_http_get(url, headers={"Authorization": f"Bearer {await self.aget_amadeus_token()}"},
+                                        params=params)
+        return self.parse_flight_offers(response)
+
+    def flight_offers_request(self, origin_city, destination_city, departure_date, adults=1, return_date=None):
         url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-        headers = {"Authorization": f"Bearer {self.get_amadeus_token()}"}
         params = {
-            "originLocationCode": origin_code,
-            "destinationLocationCode": destination_code,
+            "originLocationCode": self.get_city_code(origin_city),
+            "destinationLocationCode": self.get_city_code(destination_city),
             "departureDate": departure_date,
             "adults": adults,
             "currencyCode": "KRW",
             "max": 10
         }
+        if return_date:
+            params["returnDate"] = return_date
+        return url, params
 
-        response = requests.get(url, headers=headers, params=params)
-
+    @staticmethod
+    def parse_flight_offers(response):
         if response.status_code != 200:
             raise Exception("항공편 조회 실패", response.text)
 
@@ -90,22 +143,118 @@ class FlightSearchTool(BaseTool):
         if "data" not in flight_data or len(flight_data["data"]) == 0:
             return []
 
-        flights = []
-        for offer in flight_data["data"]:
-            flight_info = {
-                "가격": offer["price"]["total"],
-                "통화": offer["price"]["currency"],
-                "출발지": origin_code,
-                "목적지": destination_code,
-                "출발일": departure_date,
-                "항공사": offer["itineraries"][0]["segments"][0]["carrierCode"],
-                "편명": offer["itineraries"][0]["segments"][0]["number"],
-                "출발시간": offer["itineraries"][0]["segments"][0]["departure"]["at"],
-                "도착시간": offer["itineraries"][0]["segments"][-1]["arrival"]["at"]
+        offers = sorted((FlightOffer.from_api(offer) for offer in flight_data["data"]), key=lambda offer: offer.price)
+        return [offer.to_compact() for offer in offers]
+
+
+# FlexibleFlightSearchTool
+class FlexibleFlightSearchInput(BaseModel):
+    origin_city: str = Field(..., description="출발 도시명 또는 공항(한글/영문/IATA 코드), 예: '인천'")
+    destination_city: str = Field(..., description="도착 도시명 또는 공항(한글/영문/IATA 코드), 예: '오사카'")
+    departure_date_from: str = Field(..., description="출발 가능 기간 시작일(YYYY-MM-DD)")
+    departure_date_to: str = Field(..., description="출발 가능 기간 종료일(YYYY-MM-DD)")
+    return_date_from: Optional[str] = Field(None, description="왕복일 때 귀국 가능 기간 시작일(YYYY-MM-DD)")
+    return_date_to: Optional[str] = Field(None, description="왕복일 때 귀국 가능 기간 종료일(YYYY-MM-DD)")
+    adults: int = Field(1, description="성인 탑승객 수")
+
+
+class FlexibleFlightSearchTool(FlightSearchTool):
+    name: str = "유연 날짜 항공편 검색 도구"
+    description: str = (
+        "출발(및 귀국) 가능 기간을 입력하면 기간 내 모든 날짜의 항공편을 한 번에 조회하여 "
+        "날짜별 최저가표와 가장 저렴한 항공편을 알려줍니다. "
+        "'가장 싼 날'을 찾을 때 날짜마다 항공편 검색 도구를 반복 호출하는 대신 사용하세요."
+    )
+    args_schema: Type[BaseModel] = FlexibleFlightSearchInput
+
+    max_workers: int = 5  # 동시에 진행할 날짜별 조회 요청 수
+    max_combinations: int = 31  # 한 번에 조회할 수 있는 (출발일, 귀국일) 조합 수 상한
+    top_offers: int = 3  # 결과에 포함할 최저가 항공편 수
+
+    @traced_tool
+    def _run(self, origin_city: str, destination_city: str, departure_date_from: str, departure_date_to: str,
+             return_date_from: Optional[str] = None, return_date_to: Optional[str] = None, adults: int = 1):
+        date_pairs = self.date_combinations(departure_date_from, departure_date_to, return_date_from, return_date_to)
+
+        def search(date_pair):
+            params = self.cache_params(origin_city, destination_city, *date_pair, adults)
+            return get_response_cache().get_or_fetch("flight", params, lambda: self.search_flights(**params))
+
+        return self.summarize(date_pairs, map_bounded(search, date_pairs, max_workers=self.max_workers))
+
+    @traced_tool
+    async def _arun(self, origin_city: str, destination_city: str, departure_date_from: str, departure_date_to: str,
+                    return_date_from: Optional[str] = None, return_date_to: Optional[str] = None, adults: int = 1):
+        date_pairs = self.date_combinations(departure_date_from, departure_date_to, return_date_from, return_date_to)
+
+        async def search(date_pair):
+            params = self.cache_params(origin_city, destination_city, *date_pair, adults)
+            return await get_response_cache().aget_or_fetch("flight", params, lambda: self.asearch_flights(**params))
+
+        return self.summarize(date_pairs, await gather_bounded(search, date_pairs, max_workers=self.max_workers))
+
+    # 날짜 조합별 조회 결과(실패는 None)로 날짜별 최저가표와 최저가 항공편 표를 만듦
+    def summarize(self, date_pairs, results):
+        price_table = []
+        all_offers = []
+        for (departure_date, return_date), flights in zip(date_pairs, results):
+            row = {"출발일": departure_date}
+            if return_date:
+                row["귀국일"] = return_date
+
+            if flights is None:
+                row["최저가"] = "조회 실패"
+            elif not flights:
+                row["최저가"] = "항공편 없음"
+            else:
+                cheapest = min(flights, key=lambda flight: flight["가격"])
+                row["최저가"] = cheapest["가격"]
+                row["통화"] = cheapest["통화"]
+                all_offers.extend({**flight, "출발일": departure_date} for flight in flights)
+            price_table.append(row)
+
+        all_offers.sort(key=lambda flight: flight["가격"])
+        if not self.output_token_budget:
+            return {
+                "날짜별 최저가": price_table,
+                "최저가 항공편": all_offers[:self.top_offers]
             }
-            flights.append(flight_info)
 
-        return flights
+        # 예산의 절반은 날짜별 최저가표, 나머지는 최저가 항공편 표에 사용
+        round_trip = any("귀국일" in row for row in price_table)
+        header = ["출발일"] + (["귀국일"] if round_trip else []) + ["최저가", "통화"]
+        rows = [
+            [row["출발일"]] + ([row.get("귀국일", "")] if round_trip else [])
+            + [f"{row['최저가']:,.0f}" if isinstance(row["최저가"], float) else row["최저가"], row.get("통화", "")]
+            for row in price_table
+        ]
+        return "\n\n".join([
+            render_table(header, rows, self.output_token_budget // 2, title="[날짜별 최저가]"),
+            shape_flights(all_offers, self.output_token_budget // 2, self.top_offers, title="[최저가 항공편]")
+        ])
+
+    # 출발 기간 × 귀국 기간의 (출발일, 귀국일) 조합 (귀국일이 출발일보다 빠른 조합은 제외)
+    def date_combinations(self, departure_date_from, departure_date_to, return_date_from=None, return_date_to=None):
+        departure_dates = self.date_range(departure_date_from, departure_date_to)
+        if return_date_from:
+            return_dates = self.date_range(return_date_from, return_date_to or return_date_from)
+            date_pairs = [(dep, ret) for dep in departure_dates for ret in return_dates if ret >= dep]
+        else:
+            date_pairs = [(dep, None) for dep in departure_dates]
+
+        if not date_pairs:
+            raise ValueError("조회할 수 있는 날짜 조합이 없습니다. 기간을 확인해 주세요.")
+        if len(date_pairs) > self.max_combinations:
+            raise ValueError(
+                f"날짜 조합이 너무 많습니다({len(date_pairs)}개). 최대 {self.max_combinations}개까지 조회할 수 있으니 기간을 줄여 주세요."
+            )
+        return date_pairs
+
+    @staticmethod
+    def date_range(date_from, date_to):
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+        return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
 
 
 # HotelSearchTool
@@ -114,126 +263,308 @@ class HotelSearchInput(BaseModel):
     check_in_date: str = Field(..., description="체크인 날짜(YYYY-MM-DD)")
     check_out_date: str = Field(..., description="체크아웃 날짜(YYYY-MM-DD)")
     adults: int = Field(1, description="성인 인원 수")
-
-class HotelSearchTool(BaseTool):
+    near: Optional[str] = Field(None, description="이 장소에서 가까운 호텔부터 조회(랜드마크/지역명), 예: '도톤보리'")
+    max_distance_km: Optional[float] = Field(None, description="near(없으면 도시 중심)에서 이 거리(km) 이내의 호텔만 조회")
+    min_rating: Optional[int] = Field(None, description="최소 성급(1~5)")
+    chain_codes: Optional[List[str]] = Field(None, description="호텔 체인 코드 목록(예: ['HI', 'MC'])")
+    amenities: Optional[List[str]] = Field(None, description="필수 편의시설 코드 목록(예: ['WIFI', 'SWIMMING_POOL'])")
+    force_refresh: bool = Field(False, description="True이면 캐시를 사용하지 않고 최신 가격을 다시 조회")
+
+class HotelSearchTool(AsyncCapableTool):
     name: str = "숙소 검색 도구"
     description: str = "도시 이름과 숙박 일정으로 숙박 가능한 호텔 목록과 가격 정보를 조회합니다."
     args_schema: Type[BaseModel] = HotelSearchInput
 
-    _amadeus_token: Dict[str, any] = PrivateAttr()
+    # 호텔별 오퍼 조회 동시성 설정
+    max_workers: int = 5  # 동시에 진행할 오퍼 조회 요청 수
+    offer_timeout: float = 10.0  # 오퍼 조회 요청 1건당 타임아웃(초)
+    batch_size: int = 0  # 1 이상이면 hotelIds 를 batch_size 개씩 묶어 한 번에 조회
+    max_results: Optional[int] = None  # 가격이 확인된 호텔이 이만큼 모이면 나머지 조회 중단
 
-    def __init__(self):
-        super().__init__()
-        self._amadeus_token = {"access_token": None, "expires_at": 0}
+    output_token_budget: int = DEFAULT_TOKEN_BUDGET  # 결과 표의 토큰 예산 (0 이면 원본 목록 반환)
+    top_n: int = 5  # 결과 표에 포함할 최대 숙소 수
 
     def get_amadeus_token(self):
-        if self._amadeus_token["access_token"] and time.time() < self._amadeus_token["expires_at"]:
-            return self._amadeus_token["access_token"]
-
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        response = requests.post(url, data={
-            'grant_type': 'client_credentials',
-            'client_id': os.getenv('AMADEUS_CLIENT_ID'),
-            'client_secret': os.getenv('AMADEUS_CLIENT_SECRET')
-        })
-
-        if response.status_code != 200:
-            raise Exception("Amadeus 토큰 발급 실패", response.text)
-
-        token_data = response.json()
-        self._amadeus_token["access_token"] = token_data["access_token"]
-        self._amadeus_token["expires_at"] = time.time() + token_data["expires_in"] - 60
+        return get_amadeus_token()
 
-        return self._amadeus_token["access_token"]
+    async def aget_amadeus_token(self):
+        return await aget_amadeus_token()
 
+    # 한글/영문 도시명, 공항명, IATA 코드를 호텔 검색용 도시 코드로 변환
     def get_city_code(self, city_name):
-        city_codes = {
-            "서울": "SEL", "부산": "PUS", "제주": "CJU", "인천": "ICN", "대구": "TAE",
-            "오사카": "OSA", "도쿄": "TYO", "후쿠오카": "FUK", "삿포로": "SPK", "교토": "UKY",
-            "홍콩": "HKG", "타이베이": "TPE", "방콕": "BKK", "싱가포르": "SIN",
-            "하노이": "HAN", "호치민": "SGN", "다낭": "DAD"
+        return get_city_code(city_name)
+
+    # 성급/체인/편의시설 조건은 by-city API 에서 먼저 거르고, 거리 정렬은 rank_hotels 에서 로컬로 처리
+    def search_hotels_by_city(self, city_code, min_rating=None, chain_codes=None, amenities=None):
+        return hotel_offers.search_hotels_by_city(city_code, min_rating, chain_codes, amenities,
+                                                  token=self.get_amadeus_token())
+
+    async def asearch_hotels_by_city(self, city_code, min_rating=None, chain_codes=None, amenities=None):
+        url, params = self.hotels_by_city_request(city_code, min_rating, chain_codes, amenities)
+        response = await async_http_get(url, headers={"Authorization": f"Bearer {await self.aget_amadeus_token()}"},
+                                        params=params)
+        return hotel_offers.parse_hotels_by_city(response)
+
+    # 요청 만들기/응답 해석은 crewai 없이도 쓸 수 있도록 hotel_offers 모듈에 있음
+    hotels_by_city_request = staticmethod(hotel_offers.hotels_by_city_request)
+    hotel_offers_request = staticmethod(hotel_offers.hotel_offers_request)
+    parse_hotel_offer = staticmethod(hotel_offers.parse_hotel_offer)
+    parse_hotel_offers_batch = staticmethod(hotel_offers.parse_hotel_offers_batch)
+
+    # 랜드마크/지역명을 (위도, 경도)로 변환: Google 텍스트 검색, 실패하면 도시/공항 색인, 그래도 없으면 None
+    def resolve_point(self, near):
+        try:
+            return tuple(get_response_cache().get_or_fetch(
+                "geocode", {"query": near}, lambda: list(NearbyPlacesTool().get_location_by_name(near))
+            ))
+        except Exception:
+            return self.index_point(near)
+
+    async def aresolve_point(self, near):
+        async def geocode():
+            return list(await NearbyPlacesTool().aget_location_by_name(near))
+
+        try:
+            return tuple(await get_response_cache().aget_or_fetch("geocode", {"query": near}, geocode))
+        except Exception:
+            return self.index_point(near)
+
+    @staticmethod
+    def index_point(near):
+        try:
+            match = get_location_index().lookup(near)
+        except ValueError:
+            return None
+        place = match.airport or match.city
+        return None if match.fuzzy else (place.lat, place.lon)
+
+    def search_hotel_offers(self, hotel_id, check_in_date, check_out_date, adults=1, timeout=None):
+        return hotel_offers.search_hotel_offers(hotel_id, check_in_date, check_out_date, adults, timeout,
+                                                token=self.get_amadeus_token())
+
+    async def asearch_hotel_offers(self, hotel_id, check_in_date, check_out_date, adults=1, timeout=None):
+        url, params = self.hotel_offers_request([hotel_id], check_in_date, check_out_date, adults)
+        response = await async_http_get(url, headers={"Authorization": f"Bearer {await self.aget_amadeus_token()}"},
+                                        params=params, timeout=timeout)
+        return await get_no_offer_tracker().run_async(self.parse_hotel_offer, hotel_id, response)
+
+    # 여러 호텔의 오퍼를 한 번의 요청으로 조회 (hotelId -> 오퍼)
+    def search_hotel_offers_batch(self, hotel_ids, check_in_date, check_out_date, adults=1, timeout=None):
+        return hotel_offers.search_hotel_offers_batch(hotel_ids, check_in_date, check_out_date, adults, timeout,
+                                                      token=self.get_amadeus_token())
+
+    async def asearch_hotel_offers_batch(self, hotel_ids, check_in_date, check_out_date, adults=1, timeout=None):
+        url, params = self.hotel_offers_request(hotel_ids, check_in_date, check_out_date, adults)
+        response = await async_http_get(url, headers={"Authorization": f"Bearer {await self.aget_amadeus_token()}"},
+                                        params=params, timeout=timeout)
+        return await get_no_offer_tracker().run_async(self.parse_hotel_offers_batch, hotel_ids, response)
+
+    # 호텔 목록의 오퍼를 병렬로 조회하여 hotel_ids 순서대로 반환 (오퍼가 없으면 None)
+    def fetch_hotel_offers(self, hotel_ids, check_in_date, check_out_date, adults=1):
+        return hotel_offers.fetch_hotel_offers(
+            hotel_ids, check_in_date, check_out_date, adults, max_workers=self.max_workers,
+            offer_timeout=self.offer_timeout, batch_size=self.batch_size, max_results=self.max_results,
+            search_offer=self.search_hotel_offers, search_batch=self.search_hotel_offers_batch
+        )
+
+    # fetch_hotel_offers 의 asyncio 버전 (max_results 가 차면 아직 진행 중인 조회는 취소)
+    async def afetch_hotel_offers(self, hotel_ids, check_in_date, check_out_date, adults=1):
+        if self.batch_size > 0:
+            batches = await gather_bounded(
+                lambda ids: self.asearch_hotel_offers_batch(ids, check_in_date, check_out_date, adults,
+                                                            self.offer_timeout),
+                chunked(hotel_ids, self.batch_size),
+                max_workers=self.max_workers
+            )
+            return self.merge_batches(hotel_ids, batches)
+
+        return await gather_bounded(
+            lambda hotel_id: self.asearch_hotel_offers(hotel_id, check_in_date, check_out_date, adults,
+                                                       self.offer_timeout),
+            hotel_ids,
+            max_workers=self.max_workers,
+            limit=self.max_results
+        )
+
+    # 묶음 조회 결과를 hotel_ids 순서의 목록으로 (max_results 를 넘는 오퍼는 None)
+    def merge_batches(self, hotel_ids, batches):
+        return hotel_offers.merge_batches(hotel_ids, batches, self.max_results)
+
+    @traced_tool
+    def _run(self, city_name: str, check_in_date: str, check_out_date: str, adults: int = 1, max_hotels: int = 10,
+             near: Optional[str] = None, max_distance_km: Optional[float] = None, min_rating: Optional[int] = None,
+             chain_codes: Optional[List[str]] = None, amenities: Optional[List[str]] = None,
+             force_refresh: bool = False):
+        params = self.cache_params(city_name, check_in_date, check_out_date, adults, max_hotels, near,
+                                   max_distance_km, min_rating, chain_codes, amenities)
+        hotels = get_response_cache().get_or_fetch(
+            "hotel", params, lambda: self.search_hotels(**params), bypass=force_refresh
+        )
+        return self.shape(hotels)
+
+    @traced_tool
+    async def _arun(self, city_name: str, check_in_date: str, check_out_date: str, adults: int = 1,
+                    max_hotels: int = 10, near: Optional[str] = None, max_distance_km: Optional[float] = None,
+                    min_rating: Optional[int] = None, chain_codes: Optional[List[str]] = None,
+                    amenities: Optional[List[str]] = None, force_refresh: bool = False):
+        params = self.cache_params(city_name, check_in_date, check_out_date, adults, max_hotels, near,
+                                   max_distance_km, min_rating, chain_codes, amenities)
+        hotels = await get_response_cache().aget_or_fetch(
+            "hotel", params, lambda: self.asearch_hotels(**params), bypass=force_refresh
+        )
+        return self.shape(hotels)
+
+    @staticmethod
+    def cache_params(city_name, check_in_date, check_out_date, adults=1, max_hotels=10, near=None,
+                     max_distance_km=None, min_rating=None, chain_codes=None, amenities=None):
+        params = {
+            "city_name": city_name,
+            "check_in_date": check_in_date,
+            "check_out_date": check_out_date,
+            "adults": adults,
+            "max_hotels": max_hotels
         }
+        filters = {
+            "near": near,
+            "max_distance_km": max_distance_km,
+            "min_rating": min_rating,
+            "chain_codes": sorted(chain_codes) if chain_codes else None,
+            "amenities": sorted(amenities) if amenities else None
+        }
+        params.update({name: value for name, value in filters.items() if value})
+        return params
 
-        code = city_codes.get(city_name)
-        if not code:
-            raise ValueError(f"'{city_name}'의 도시 코드를 찾을 수 없습니다.")
-
-        return code
-
-    def search_hotels_by_city(self, city_code):
-        url = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
-        headers = {"Authorization": f"Bearer {self.get_amadeus_token()}"}
-        response = requests.get(url, headers=headers, params={"cityCode": city_code})
-
-        if response.status_code != 200:
-            return []
+    def shape(self, hotels):
+        if not self.output_token_budget:
+            return hotels
+        return shape_hotels(hotels, self.output_token_budget, self.top_n)
 
-        return response.json().get("data", [])
+    # by-city 목록을 조건/거리로 정렬하고, 오퍼가 반복해서 없던 호텔은 빼고 상위 max_hotels 개만 오퍼 조회
+    def search_hotels(self, city_name, check_in_date, check_out_date, adults=1, max_hotels=10, near=None,
+                      max_distance_km=None, min_rating=None, chain_codes=None, amenities=None):
+        city_code = self.get_city_code(city_name)
+        city_hotels = self.search_hotels_by_city(city_code, min_rating, chain_codes, amenities)
 
-    def search_hotel_offers(self, hotel_id, check_in_date, check_out_date, adults=1):
-        url = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
-        headers = {"Authorization": f"Bearer {self.get_amadeus_token()}"}
-        response = requests.get(url, headers=headers, params={
-            "hotelIds": hotel_id,
-            "checkInDate": check_in_date,
-            "checkOutDate": check_out_date,
-            "adults": adults
-        })
+        point = self.resolve_point(near) if near else None
+        lat, lon = point or (None, None)
+        city_hotels = rank_hotels(city_hotels, lat, lon, max_distance_km, min_rating, chain_codes)
 
-        if response.status_code != 200:
-            return None
+        hotel_ids = get_no_offer_tracker().filter([hotel["hotelId"] for hotel in city_hotels], limit=max_hotels)
+        hotel_offers = self.fetch_hotel_offers(hotel_ids, check_in_date, check_out_date, adults)
+        return [HotelOffer.from_api(hotel_offer).to_compact() for hotel_offer in hotel_offers if hotel_offer]
 
-        data = response.json()
-        if "data" in data and data["data"]:
-            return data["data"][0]
-        return None
-
-    def _run(self, city_name: str, check_in_date: str, check_out_date: str, adults: int = 1, max_hotels: int = 10):
+    async def asearch_hotels(self, city_name, check_in_date, check_out_date, adults=1, max_hotels=10, near=None,
+                             max_distance_km=None, min_rating=None, chain_codes=None, amenities=None):
         city_code = self.get_city_code(city_name)
-        city_hotels = self.search_hotels_by_city(city_code)
-        available_hotels = []
+        city_hotels = await self.asearch_hotels_by_city(city_code, min_rating, chain_codes, amenities)
 
-        for hotel in city_hotels[:max_hotels]:
-            hotel_offer = self.search_hotel_offers(hotel["hotelId"], check_in_date, check_out_date, adults)
-            if hotel_offer:
-                hotel_info = {
-                    "hotel_name": hotel_offer["hotel"]["name"],
-                    "check_in": check_in_date,
-                    "check_out": check_out_date,
-                    "room_description": hotel_offer["offers"][0]["room"]["description"]["text"],
-                    "total_price": hotel_offer["offers"][0]["price"]["total"],
-                    "currency": hotel_offer["offers"][0]["price"]["currency"]
-                }
-                available_hotels.append(hotel_info)
+        point = await self.aresolve_point(near) if near else None
+        lat, lon = point or (None, None)
+        city_hotels = rank_hotels(city_hotels, lat, lon, max_distance_km, min_rating, chain_codes)
 
-        return available_hotels
+        hotel_ids = await get_no_offer_tracker().afilter([hotel["hotelId"] for hotel in city_hotels], limit=max_hotels)
+        hotel_offers = await self.afetch_hotel_offers(hotel_ids, check_in_date, check_out_date, adults)
+        return [HotelOffer.from_api(hotel_offer).to_compact() for hotel_offer in hotel_offers if hotel_offer]
 
 
 # NearbyPlacesTool
+# Place Details 에서 조회하는 기본 필드 (필드 수만큼 과금되므로 필요한 것만 지정)
+PLACE_DETAIL_FIELDS = ["name", "rating", "formatted_address", "formatted_phone_number", "opening_hours", "website", "reviews"]
+
 class NearbyPlacesInput(BaseModel):
     place_name: str = Field(..., description="검색하고자 하는 장소명")
     radius: int = Field(1000, description="검색 반경(미터 단위)")
+    force_refresh: bool = Field(False, description="True이면 캐시를 사용하지 않고 다시 조회")
 
-class NearbyPlacesTool(BaseTool):
+class NearbyPlacesTool(AsyncCapableTool):
     name: str = "인근 장소 검색 도구"
     description: str = "특정 장소명으로 인근의 가볼 만한 곳들(관광지, 맛집 등)의 상세 정보를 추천합니다."
     args_schema: Type[BaseModel] = NearbyPlacesInput
 
-    def _run(self, place_name: str, radius: int = 1000) -> List[dict]:
+    max_workers: int = 5  # 동시에 진행할 세부 정보 조회 요청 수
+    detail_fields: List[str] = Field(default_factory=lambda: list(PLACE_DETAIL_FIELDS))  # 결과에 포함할 필드
+
+    output_token_budget: int = DEFAULT_TOKEN_BUDGET  # 결과 표의 토큰 예산 (0 이면 원본 목록 반환)
+    top_n: int = 5  # 결과 표에 포함할 최대 장소 수
+
+    @traced_tool
+    def _run(self, place_name: str, radius: int = 1000, force_refresh: bool = False):
+        params = {"place_name": place_name, "radius": radius}
+        places = get_response_cache().get_or_fetch(
+            "places", {**params, "fields": sorted(self.detail_fields)}, lambda: self.search_places(**params),
+            bypass=force_refresh
+        )
+        return self.shape(places)
+
+    @traced_tool
+    async def _arun(self, place_name: str, radius: int = 1000, force_refresh: bool = False):
+        params = {"place_name": place_name, "radius": radius}
+        places = await get_response_cache().aget_or_fetch(
+            "places", {**params, "fields": sorted(self.detail_fields)}, lambda: self.asearch_places(**params),
+            bypass=force_refresh
+        )
+        return self.shape(places)
+
+    def shape(self, places):
+        if not self.output_token_budget:
+            return places
+        return shape_places(places, self.output_token_budget, self.top_n)
+
+    def search_places(self, place_name, radius=1000):
         location = self.get_location_by_name(place_name)
         nearby_places = self.find_nearby_places(location, radius)
-        detailed_places = [self.get_place_details(place["place_id"]) for place in nearby_places]
-        return detailed_places
+        detailed_places = map_bounded(self.complete_place, nearby_places, max_workers=self.max_workers)
+        return [place for place in detailed_places if place]
+
+    async def asearch_places(self, place_name, radius=1000):
+        location = await self.aget_location_by_name(place_name)
+        nearby_places = await self.afind_nearby_places(location, radius)
+        detailed_places = await gather_bounded(self.acomplete_place, nearby_places, max_workers=self.max_workers)
+        return [place for place in detailed_places if place]
+
+    # 주변 검색 결과에 이미 있는 이름/평점/주소는 재사용하고, 부족한 필드만 세부 정보로 조회
+    def complete_place(self, nearby_place):
+        result, missing_fields = self.known_fields(nearby_place)
+        if missing_fields:
+            result.update(self.get_place_details(nearby_place["place_id"], missing_fields))
+
+        return Place.from_api(result).to_compact()
+
+    async def acomplete_place(self, nearby_place):
+        result, missing_fields = self.known_fields(nearby_place)
+        if missing_fields:
+            result.update(await self.aget_place_details(nearby_place["place_id"], missing_fields))
+
+        return Place.from_api(result).to_compact()
+
+    # (주변 검색 결과로 채운 필드, 세부 정보로 조회해야 하는 필드 목록)
+    def known_fields(self, nearby_place):
+        result = {
+            "name": nearby_place.get("name"),
+            "rating": nearby_place.get("rating"),
+            "formatted_address": nearby_place.get("vicinity")
+        }
+        return result, [field for field in self.detail_fields if result.get(field) is None]
 
     def get_location_by_name(self, place_name: str):
+        url, params = self.text_search_request(place_name)
+        return self.parse_location(http_get(url, params=params).json())
+
+    async def aget_location_by_name(self, place_name: str):
+        url, params = self.text_search_request(place_name)
+        return self.parse_location((await async_http_get(url, params=params)).json())
+
+    @staticmethod
+    def text_search_request(place_name):
         url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-        params = {
+        return url, {
             "query": place_name,
             "language": "ko",
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
 
+    @staticmethod
+    def parse_location(response):
         if response["status"] != "OK":
             raise Exception(f"장소 검색 실패: {response['status']}")
 
@@ -241,49 +572,55 @@ class NearbyPlacesTool(BaseTool):
         return location["lat"], location["lng"]
 
     def find_nearby_places(self, location, radius):
+        url, params = self.nearby_search_request(location, radius)
+        return self.parse_nearby_places(http_get(url, params=params).json())
+
+    async def afind_nearby_places(self, location, radius):
+        url, params = self.nearby_search_request(location, radius)
+        return self.parse_nearby_places((await async_http_get(url, params=params)).json())
+
+    @staticmethod
+    def nearby_search_request(location, radius):
         lat, lng = location
         url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
+        return url, {
             "location": f"{lat},{lng}",
             "radius": radius,
             "type": "tourist_attraction",
             "language": "ko",
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
 
+    @staticmethod
+    def parse_nearby_places(response):
         if response["status"] != "OK":
             raise Exception(f"주변 장소 검색 실패: {response['status']}")
 
         return response["results"][:5]  # 최대 5개의 추천장소
 
-    def get_place_details(self, place_id):
+    def get_place_details(self, place_id, fields=None):
+        url, params = self.place_details_request(place_id, fields)
+        return self.parse_place_details(http_get(url, params=params).json())
+
+    async def aget_place_details(self, place_id, fields=None):
+        url, params = self.place_details_request(place_id, fields)
+        return self.parse_place_details((await async_http_get(url, params=params)).json())
+
+    def place_details_request(self, place_id, fields=None):
         url = "https://maps.googleapis.com/maps/api/place/details/json"
-        params = {
+        return url, {
             "place_id": place_id,
             "language": "ko",
-            "fields": "name,rating,formatted_address,formatted_phone_number,opening_hours,website,reviews",
+            "fields": ",".join(fields or self.detail_fields),
             "key": os.getenv("GOOGLE_API_KEY")
         }
-        response = requests.get(url, params=params).json()
 
+    @staticmethod
+    def parse_place_details(response):
         if response["status"] != "OK":
             raise Exception(f"세부 정보 조회 실패: {response['status']}")
 
-        result = response["result"]
-
-        return {
-            "이름": result.get("name"),
-            "주소": result.get("formatted_address"),
-            "전화번호": result.get("formatted_phone_number", "정보 없음"),
-            "웹사이트": result.get("website", "정보 없음"),
-            "영업시간": result.get("opening_hours", {}).get("weekday_text", "정보 없음"),
-            "평점": result.get("rating", "정보 없음"),
-            "리뷰": [{
-                "내용": review.get("text"),
-                "평점": review.get("rating")
-            } for review in result.get("reviews", [])[:3]]  # 최대 3개 리뷰
-        }
+        return response["result"]
 
 
 # ExchangeRateTool
@@ -292,32 +629,105 @@ class ExchangeRateInput(BaseModel):
     to_currency: str = Field(..., description="변환할 대상 통화의 코드 (예: KRW)")
     amount: float = Field(..., description="변환할 금액")
 
-class ExchangeRateTool(BaseTool):
+class ExchangeRateTool(AsyncCapableTool):
     name: str = "환율 도구"
     description: str = "특정 금액을 한 통화에서 다른 통화로 변환하는 툴입니다."
     args_schema: type[BaseModel] = ExchangeRateInput
 
+    @traced_tool
     def _run(self, from_currency: str, to_currency: str, amount: float):
-        api_key = os.getenv('EXCHANGE_RATE_API_KEY')
-        url = f"https://v6.exchangerate-api.com/v6/{api_key}/pair/{from_currency}/{to_currency}/{amount}"
-
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception("환율 정보 조회 실패", response.text)
+        return get_rate_cache().convert(from_currency, to_currency, amount)
 
-        data = response.json()
+    @traced_tool
+    async def _arun(self, from_currency: str, to_currency: str, amount: float):
+        return await get_rate_cache().aconvert(from_currency, to_currency, amount)
 
-        if data['result'] != "success":
-            raise Exception("환율 조회에 실패했습니다", data.get('error-type', 'unknown error'))
 
-        converted_amount = data['conversion_result']
+# ExchangeRateBatchTool
+class ConversionItem(BaseModel):
+    from_currency: str = Field(..., description="원본 통화의 코드 (예: JPY)")
+    to_currency: str = Field(..., description="변환할 대상 통화의 코드 (예: KRW)")
+    amount: float = Field(..., description="변환할 금액")
 
-        return {
-            "from_currency": from_currency,
-            "to_currency": to_currency,
-            "original_amount": amount,
-            "converted_amount": converted_amount,
-            "conversion_rate": data["conversion_rate"]
-        }
-        
-        
\ No newline at end of file
+class ExchangeRateBatchInput(BaseModel):
+    conversions: List[ConversionItem] = Field(..., description="변환할 금액/통화 목록")
+
+class ExchangeRateBatchTool(AsyncCapableTool):
+    name: str = "환율 일괄 변환 도구"
+    description: str = "여러 금액을 한 번에 환산합니다. 예산표처럼 항목이 많을 때 환율 도구를 반복 호출하는 대신 사용하세요."
+    args_schema: type[BaseModel] = ExchangeRateBatchInput
+
+    @traced_tool
+    def _run(self, conversions: List[ConversionItem]):
+        return get_rate_cache().convert_many([
+            item.model_dump() if isinstance(item, BaseModel) else item for item in conversions
+        ])
+
+    @traced_tool
+    async def _arun(self, conversions: List[ConversionItem]):
+        return await get_rate_cache().aconvert_many([
+            item.model_dump() if isinstance(item, BaseModel) else item for item in conversions
+        ])
+
+
+# BudgetCalculatorTool
+class BudgetItemInput(BaseModel):
+    category: str = Field(..., description="항목 구분 (항공, 숙소, 교통, 식비, 관광, 쇼핑, 기타 중 하나)")
+    name: str = Field(..., description="내용 (예: '이치란 라멘 점심', '유니버설 스튜디오 입장권')")
+    amount: float = Field(..., description="단가 (currency 에 적은 통화 기준)")
+    currency: Optional[str] = Field(None, description="금액의 통화 코드 (예: JPY). 비우면 여행 도시의 통화")
+    quantity: float = Field(1, description="수량/인원/횟수 (비용 = amount x quantity)")
+    day: Optional[int] = Field(None, description="여행 n일차 (1부터). 항공권/숙박처럼 여행 전체 비용이면 비움")
+
+class BudgetCalculatorInput(BaseModel):
+    items: List[BudgetItemInput] = Field(..., description="예산에 넣을 모든 항목 (항공, 숙소, 식사, 명소, 교통 등)")
+    budget: Optional[str] = Field(None, description="고객이 말한 총예산 (예: '80만 원', '1500 USD')")
+    currency: str = Field("KRW", description="예산표를 계산할 통화 코드")
+    city_name: Optional[str] = Field(None, description="여행 도시 이름. 통화를 적지 않은 항목은 이 도시의 통화로 계산")
+
+class BudgetCalculatorTool(AsyncCapableTool):
+    name: str = "예산 계산 도구"
+    description: str = (
+        "항공권, 숙소, 식사, 명소 입장료, 교통비 등 예산 항목을 한 번에 입력하면 환율을 적용해 "
+        "상세 예산표, 일자별/항목별 합계, 총액과 예산 대비 남은 금액을 계산합니다. "
+        "금액을 직접 환산하거나 더하지 말고 모든 항목을 모아 이 도구를 한 번 호출하세요."
+    )
+    args_schema: type[BaseModel] = BudgetCalculatorInput
+
+    @traced_tool
+    def _run(self, items: List[BudgetItemInput], budget: Optional[str] = None, currency: str = "KRW",
+             city_name: Optional[str] = None):
+        cache = get_rate_cache()
+        return self.calculate(cache.get_table(), cache.stale, items, budget, currency, city_name)
+
+    @traced_tool
+    async def _arun(self, items: List[BudgetItemInput], budget: Optional[str] = None, currency: str = "KRW",
+                    city_name: Optional[str] = None):
+        cache = get_rate_cache()
+        return self.calculate(await cache.aget_table(), cache.stale, items, budget, currency, city_name)
+
+    # 환율표 한 장으로 예산표 계산 (항목 통화가 없으면 city_name 도시의 통화, 그것도 없으면 currency)
+    @staticmethod
+    def calculate(table, stale, items, budget=None, currency="KRW", city_name=None):
+        currency = currency.upper()
+        local_currency = currency
+        if city_name:
+            # city_name 은 기본 통화를 정하는 데만 쓰므로, 모르는 도시여도 계산은 currency 기준으로 계속함
+            try:
+                city = get_location_index().lookup(city_name).city
+            except ValueError:
+                city = None
+            local_currency = (city and city.currency) or currency
+
+        budget_items = []
+        for item in items:
+            item = item.model_dump() if isinstance(item, BaseModel) else dict(item)
+            item["currency"] = (item.get("currency") or local_currency).upper()
+            budget_items.append(BudgetItem(**item))
+
+        limit = None
+        if budget:
+            amount, budget_currency = parse_amount(budget, default_currency=currency)
+            limit = table.convert(amount, budget_currency, currency)
+
+        return render_budget(compute_budget(budget_items, table, currency=currency, limit=limit, stale=stale))
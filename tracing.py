@@ -0,0 +1,356 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+# 트레이스에 기록하는 구간 종류
+# kickoff(crew 실행 전체) > task > agent > llm / tool > http
+SPAN_KINDS = ["kickoff", "task", "agent", "llm", "tool", "http"]
+
+_current_span = ContextVar("current_span", default=None)
+
+
+# 측정 구간 하나 (OpenTelemetry span 과 같은 구조)
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    kind: str
+    name: str
+    start_ns: int
+    started: float  # perf_counter, 구간 길이 계산용
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: dict = field(default_factory=dict)
+    trace: Optional["Trace"] = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self):
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    # 캐시 적중 횟수처럼 한 구간 안에서 여러 번 늘어나는 값
+    def add(self, name, value=1):
+        self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def fail(self, error):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def to_dict(self):
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration_ms, 3) if self.end_ns is not None else None,
+            "status": {"code": "ERROR" if self.status == "error" else "OK", "message": self.error},
+            "attributes": self.attributes,
+        }
+
+
+# 추적 대상이 없을 때(kickoff 밖에서 도구를 직접 호출하는 경우 등) 돌려주는 빈 구간
+class _NoopSpan:
+    trace = None
+    attributes = {}
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name, value=1):
+        pass
+
+    def fail(self, error):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# kickoff 1회의 구간 모음
+class Trace:
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+        self.root = None
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if span.parent_id is None:
+                self.root = span
+
+    def children(self, span):
+        with self._lock:
+            return [child for child in self.spans if child.parent_id == span.span_id]
+
+    # 임계 경로: 각 구간에서 끝에서부터 "가장 늦게 끝난 하위 구간 -> 그 구간이 시작되기 전에 끝난 하위 구간" 을
+    # 거슬러 올라가며 상위 구간의 종료를 결정한 구간들을 찾고, 찾은 구간마다 같은 방식으로 내려감
+    # 반환: [(깊이, 구간), ...] 시작 순서
+    def critical_path(self, span=None, depth=0):
+        span = span or self.root
+        if span is None:
+            return []
+
+        finished = [child for child in self.children(span) if child.end_ns is not None]
+        chain = []
+        cursor = span.end_ns or max((child.end_ns for child in finished), default=0)
+        while True:
+            candidates = [child for child in finished if child.end_ns <= cursor and child not in chain]
+            if not candidates:
+                break
+            child = max(candidates, key=lambda item: item.end_ns)
+            chain.append(child)
+            cursor = child.start_ns
+
+        path = [(depth, span)]
+        for child in reversed(chain):
+            path.extend(self.critical_path(child, depth + 1))
+        return path
+
+    # 종류별 횟수/누적 시간, 가장 느린 호출, 임계 경로, 오류 수
+    def summary(self, top_n=5):
+        with self._lock:
+            spans = [span for span in self.spans if span.end_ns is not None]
+
+        kinds = {}
+        for span in spans:
+            stats = kinds.setdefault(span.kind, {"count": 0, "total_ms": 0.0, "errors": 0})
+            stats["count"] += 1
+            stats["total_ms"] += span.duration_ms
+            stats["errors"] += span.status == "error"
+        for stats in kinds.values():
+            stats["total_ms"] = round(stats["total_ms"], 1)
+
+        slowest = sorted((span for span in spans if span.kind in ("llm", "tool", "http")),
+                         key=lambda span: span.duration_ms, reverse=True)[:top_n]
+        cache = {"hits": 0, "misses": 0}
+        for span in spans:
+            cache["hits"] += span.attributes.get("cache_hits", 0)
+            cache["misses"] += span.attributes.get("cache_misses", 0)
+
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name if self.root else None,
+            "duration_ms": round(self.root.duration_ms, 1) if self.root and self.root.end_ns else None,
+            "status": self.root.status if self.root else None,
+            "kinds": kinds,
+            "cache": cache,
+            "tokens": {
+                "prompt": sum(span.attributes.get("prompt_tokens", 0) for span in spans if span.kind == "llm"),
+                "completion": sum(span.attributes.get("completion_tokens", 0) for span in spans if span.kind == "llm"),
+            },
+            "critical_path": [
+                {"depth": depth, "kind": span.kind, "name": span.name, "duration_ms": round(span.duration_ms or 0, 1)}
+                for depth, span in self.critical_path()
+            ],
+            "slowest": [
+                {"kind": span.kind, "name": span.name, "duration_ms": round(span.duration_ms, 1),
+                 "status": span.status}
+                for span in slowest
+            ],
+        }
+
+    def to_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n" for span in self.spans)
+
+    # OTLP/JSON 형식 (OpenTelemetry Collector 의 /v1/traces 로 그대로 보낼 수 있음)
+    def to_otlp(self, service_name="travel-coordinator"):
+        def value(item):
+            if isinstance(item, bool):
+                return {"boolValue": item}
+            if isinstance(item, int):
+                return {"intValue": str(item)}
+            if isinstance(item, float):
+                return {"doubleValue": item}
+            return {"stringValue": item if isinstance(item, str) else json.dumps(item, ensure_ascii=False, default=str)}
+
+        with self._lock:
+            spans = list(self.spans)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 3 if span.kind == "http" else 1,  # SPAN_KIND_CLIENT / SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                    "attributes": [{"key": "span.kind", "value": {"stringValue": span.kind}}] + [
+                        {"key": key, "value": value(item)} for key, item in span.attributes.items()
+                    ],
+                    "status": {"code": 2, "message": span.error} if span.status == "error" else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+
+# 구간 생성/종료와 완료된 트레이스 보관
+# - TRACING_ENABLED: 0 이면 아무 것도 기록하지 않음 (기본 1)
+# - TRACE_EXPORT_PATH: kickoff 가 끝날 때마다 구간을 JSONL 로 이어 쓸 파일
+# - TRACE_HISTORY: 메모리에 보관할 최근 트레이스 수 (기본 20)
+class Tracer:
+    def __init__(self, enabled=True, export_path=None, history=20):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._finished = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def start_span(self, kind, name, parent=None, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = parent or _current_span.get()
+        if parent is None or parent is NOOP_SPAN:
+            if kind != "kickoff":
+                return NOOP_SPAN
+            trace = Trace(uuid.uuid4().hex)
+            parent_id = None
+        else:
+            trace = parent.trace
+            parent_id = parent.span_id
+
+        span = Span(trace.trace_id, uuid.uuid4().hex[:16], parent_id, kind, name,
+                    time.time_ns(), time.perf_counter(), attributes=attributes, trace=trace)
+        trace.add(span)
+        return span
+
+    def end_span(self, span, error=None):
+        if span is NOOP_SPAN or span.end_ns is not None:
+            return
+        if error is not None:
+            span.fail(error)
+        span.end_ns = span.start_ns + int((time.perf_counter() - span.started) * 1e9)
+        if span.parent_id is None:
+            self._finish(span.trace)
+
+    def _finish(self, trace):
+        with self._lock:
+            self._finished.append(trace)
+        if self.export_path:
+            with self._lock, open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(trace.to_jsonl())
+
+    def recent(self):
+        with self._lock:
+            return list(self._finished)
+
+    def last_trace(self):
+        with self._lock:
+            return self._finished[-1] if self._finished else None
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(
+                    enabled=os.getenv("TRACING_ENABLED", "1").lower() not in ("0", "false", "no"),
+                    export_path=os.getenv("TRACE_EXPORT_PATH") or None,
+                    history=int(os.getenv("TRACE_HISTORY", 20))
+                )
+    return _tracer
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+# 현재 스레드(컨텍스트)의 상위 구간을 바꾸고 이전 값을 돌려줌
+def set_current_span(span):
+    previous = _current_span.get()
+    _current_span.set(None if span is NOOP_SPAN else span)
+    return previous
+
+
+# with span("http", "GET api.example.com/path") as s: ... s.set(status=200)
+# 블록 안에서 만든 구간은 이 구간의 하위 구간이 되며, 예외가 나면 오류로 기록하고 다시 던집니다.
+@contextmanager
+def span(kind, name, **attributes):
+    tracer = get_tracer()
+    current = tracer.start_span(kind, name, **attributes)
+    token = _current_span.set(current) if current is not NOOP_SPAN else None
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        if token is not None:
+            _current_span.reset(token)
+        tracer.end_span(current)
+
+
+# 도구의 _run / _arun 에 붙이는 데코레이터: 도구 이름으로 구간을 만들고 결과 크기를 기록
+def traced_tool(func):
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            with span("tool", self.name, args=json.dumps(kwargs, ensure_ascii=False, default=str)) as tool_span:
+                result = await func(self, *args, **kwargs)
+                _record_result(tool_span, result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with span("tool", self.name, args=json.dumps(kwargs, ensure_ascii=False, default=str)) as tool_span:
+            result = func(self, *args, **kwargs)
+            _record_result(tool_span, result)
+            return result
+    return wrapper
+
+
+def _record_result(tool_span, result):
+    tool_span.set(result_bytes=len(str(result).encode("utf-8")))
+    if isinstance(result, (list, dict)):
+        tool_span.set(result_items=len(result))
+
+
+# 트레이스 요약을 사람이 읽기 쉬운 문자열로
+def format_summary(summary, min_ms=1.0):
+    lines = [f"[트레이스 {summary['trace_id'][:8]}] {summary['name']} - {summary['duration_ms']}ms ({summary['status']})"]
+    for kind in SPAN_KINDS:
+        stats = summary["kinds"].get(kind)
+        if stats:
+            errors = f", 오류 {stats['errors']}" if stats["errors"] else ""
+            lines.append(f"  {kind:<7} {stats['count']:>4}회  누적 {stats['total_ms']:>10.1f}ms{errors}")
+    lines.append(f"  캐시 적중 {summary['cache']['hits']} / 미스 {summary['cache']['misses']}, "
+                 f"LLM 토큰(추정) 입력 {summary['tokens']['prompt']} / 출력 {summary['tokens']['completion']}")
+    lines.append(f"  임계 경로 ({min_ms}ms 미만 구간 생략):")
+    for step in summary["critical_path"]:
+        if step["duration_ms"] >= min_ms:
+            indent = "  " * step["depth"]
+            lines.append(f"    {step['duration_ms']:>10.1f}ms  {indent}{step['kind']}: {step['name']}")
+    lines.append("  가장 느린 호출:")
+    for call in summary["slowest"]:
+        status = "" if call["status"] == "ok" else f" ({call['status']})"
+        lines.append(f"    {call['kind']:<7} {call['duration_ms']:>10.1f}ms  {call['name']}{status}")
+    return "\n".join(lines)